@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Acquisition backend module
+Registry of the ways an edition can be fetched. Backends are registered by
+dotted path and only imported the first time they are used, so entry points
+that never download (health check, onboarding, the GUI) do not pay for
+Playwright, aiohttp or bs4 at start-up.
+"""
+
+import importlib
+import logging
+import threading
+import config
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_BACKEND = 'sync'
+
+_backends = {}
+_lock = threading.Lock()
+
+
+def register(name, target):
+    """
+    Register backend `name` as `target`: a callable, or a 'module:attribute'
+    string imported on first use. The callable takes the keyword arguments of
+    website.acquire_edition and returns its result dict.
+    """
+    with _lock:
+        _backends[name] = target
+
+
+def available():
+    """Names of the registered backends."""
+    with _lock:
+        return sorted(_backends)
+
+
+def get(name=None):
+    """
+    The acquire function for backend `name` (default: `acquisition.backend`
+    from config), importing its module if needed.
+
+    Raises:
+        ValueError: if no backend of that name is registered.
+    """
+    if name is None:
+        name = config.config.get(('acquisition', 'backend'), DEFAULT_BACKEND)
+    with _lock:
+        target = _backends.get(name)
+    if target is None:
+        raise ValueError(f"Unknown acquisition backend {name!r}; choose one of {', '.join(available())}")
+    if callable(target):
+        return target
+    # Looked up on every call (the module is cached by the import system), so patched attributes are honoured
+    module_name, attribute = target.split(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def acquire_edition(**kwargs):
+    """Fetch an edition with the configured backend; see website.acquire_edition."""
+    return get()(**kwargs)
+
+
+register('sync', 'website:acquire_edition')
+register('async', 'async_website:acquire_edition_sync')
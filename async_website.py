@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+Asyncio acquisition backend
+Coroutine counterparts of the login and download functions in website.py,
+built on aiohttp and Playwright's async API. Waits (rate limiting, retry
+backoff, Retry-After) are cooperative, so many editions and probes can run
+in one event loop, and a cancelled download keeps its partial file for
+the next attempt to resume. The `*_sync` wrappers let synchronous callers
+such as main.main use this backend unchanged.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+from bs4 import BeautifulSoup
+import config
+import browser_pool
+import downloader
+import rate_limit
+import session_cache
+import validation
+import website
+
+# aiohttp (optional dependency)
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Playwright (optional dependency); the async driver API is imported on first login
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_CONNECT_TIMEOUT = 10 # Seconds, as in website.py's (connect, read) timeouts
+DEFAULT_READ_TIMEOUT = 30
+
+
+def _timeout(connect=DEFAULT_CONNECT_TIMEOUT, read=DEFAULT_READ_TIMEOUT):
+    return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+
+def create_session(publication=None):
+    """
+    An aiohttp session for acquisition. Cookies are sent explicitly with each
+    request (see `_cookie_header`), so the session itself keeps none.
+    """
+    site = website._site(publication)
+    pool_maxsize = int(config.config.get(('http', 'pool_maxsize'), 8))
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit_per_host=pool_maxsize),
+        headers={'User-Agent': site.user_agent},
+        cookie_jar=aiohttp.DummyCookieJar(),
+        timeout=_timeout(),
+    )
+
+
+@asynccontextmanager
+async def _session_scope(session=None, publication=None):
+    # Use the caller's session, or open one for the duration of the call
+    if session is not None:
+        yield session
+        return
+    async with create_session(publication) as owned:
+        yield owned
+
+
+def _cookie_header(cookies, url):
+    """Cookie header value for `url` from Playwright-style cookie dicts (domain-matched)."""
+    host = (urlparse(url).hostname or '').lower()
+    pairs = []
+    for cookie in cookies or []:
+        domain = (cookie.get('domain') or '').lstrip('.').lower()
+        if not domain or host == domain or host.endswith('.' + domain):
+            pairs.append(f"{cookie['name']}={cookie['value']}")
+    return '; '.join(pairs)
+
+
+def _auth_headers(headers, cookies, url):
+    headers = dict(headers)
+    cookie = _cookie_header(cookies, url)
+    if cookie:
+        headers['Cookie'] = cookie
+    return headers
+
+
+def _cookies_from_jar(jar):
+    """Convert an aiohttp cookie jar into Playwright-style cookie dicts."""
+    cookies = []
+    for morsel in jar:
+        cookies.append({
+            'name': morsel.key,
+            'value': morsel.value,
+            'domain': morsel['domain'],
+            'path': morsel['path'] or '/',
+            'expires': -1,
+            'secure': bool(morsel['secure']),
+            'httpOnly': bool(morsel['httponly']),
+        })
+    return cookies
+
+
+# --- Login ---
+async def _probe_session(session, cookies, probe_url, publication=None):
+    """Async `website._probe_session`: are the cached cookies still accepted?"""
+    site = website._site(publication)
+    if not probe_url:
+        return False
+    try:
+        async with session.get(probe_url, headers=_auth_headers({}, cookies, probe_url),
+                               timeout=_timeout(5, 15)) as response:
+            if response.status >= 400:
+                logger.info("Session probe returned status %d.", response.status)
+                return False
+            if website._bounced_to_login(probe_url, str(response.url), site):
+                logger.info("Session probe was redirected to the login page.")
+                return False
+            if site.login_success_selector and 'html' in response.headers.get('Content-Type', '').lower():
+                if BeautifulSoup(await response.text(), 'html.parser').select_one(site.login_success_selector) is None:
+                    logger.info("Session probe page lacks login success element: %s", site.login_success_selector)
+                    return False
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning("Session probe request to %s failed: %s", probe_url, e)
+        return False
+    return True
+
+
+async def _login_with_form(session, login_url, username, password, stats=None, publication=None):
+    """
+    Async `website._login_with_requests`: post the login form without a browser.
+    The login runs in its own cookie jar on the shared connection pool.
+    """
+    logger.info("Attempting form-POST login without a browser.")
+    site = website._site(publication)
+    async with aiohttp.ClientSession(connector=session.connector, connector_owner=False,
+                                     headers={'User-Agent': site.user_agent},
+                                     cookie_jar=aiohttp.CookieJar(unsafe=True), timeout=_timeout()) as login_session:
+        try:
+            async with login_session.get(login_url) as page:
+                page.raise_for_status()
+                submission = website._prepare_form_login(await page.text(), str(page.url), username, password, site)
+            if submission is None:
+                return None
+            method, action, data, headers = submission
+            if method == 'get':
+                request = login_session.get(action, params=data, headers=headers)
+            else:
+                request = login_session.post(action, data=data, headers=headers)
+            async with request as response:
+                if response.status >= 400:
+                    logger.info("Form login returned status %d.", response.status)
+                    return None
+                if not website._form_login_confirmed(await response.text(), str(response.url), site):
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning("Form login request failed: %s", e)
+            return None
+        cookies = _cookies_from_jar(login_session.cookie_jar)
+    if not cookies:
+        logger.info("Form login set no cookies.")
+        return None
+    logger.info("Form login successful; extracted %d cookies.", len(cookies))
+    return cookies
+
+
+async def _login_with_browser(session, login_url, username, password, stats=None, publication=None):
+    """
+    Async `website._get_session_cookies`: log in with Playwright's async API,
+    blocking the requests the site profile doesn't need.
+    """
+    site = website._site(publication)
+    logger.info("Attempting to log in via Playwright (async) to get session cookies.")
+    if not browser_pool.PLAYWRIGHT_AVAILABLE:
+        logger.error("Playwright not available for login. Install with: pip install playwright")
+        return None
+    stats = stats if stats is not None else {}
+    profile = browser_pool.site_profile(login_url)
+    blocker = browser_pool.RequestBlocker.from_profile(profile)
+    timeout = int(profile['selector_timeout_ms'])
+    headless = config.config.get(('browser', 'headless'), True) in (True, 1, '1', 'true', 'True')
+    from playwright.async_api import async_playwright
+    try:
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=headless)
+            try:
+                context = await browser.new_context()
+                await blocker.install_async(context)
+                page = await context.new_page()
+                await page.goto(login_url, wait_until=profile['wait_until'])
+                try:
+                    await page.wait_for_selector(site.username_selector, state='visible', timeout=timeout)
+                except browser_pool.PlaywrightTimeoutError:
+                    logger.error("Username field not found with selector: %s", site.username_selector)
+                    return None
+                await page.fill(site.username_selector, username)
+                if await page.locator(site.password_selector).count() == 0:
+                    logger.error("Password field not found with selector: %s", site.password_selector)
+                    return None
+                await page.fill(site.password_selector, password)
+                if await page.locator(site.submit_selector).count() == 0:
+                    logger.error("Submit button not found with selector: %s", site.submit_selector)
+                    return None
+                await page.click(site.submit_selector)
+
+                login_success = False
+                if site.login_success_selector:
+                    try:
+                        await page.wait_for_selector(site.login_success_selector, timeout=30000)
+                        login_success = True
+                    except browser_pool.PlaywrightTimeoutError:
+                        logger.warning("Login success element not found: %s", site.login_success_selector)
+                if not login_success and site.login_success_url:
+                    try:
+                        await page.wait_for_url(site.login_success_url, timeout=30000)
+                        login_success = True
+                    except browser_pool.PlaywrightTimeoutError:
+                        logger.warning("Login success URL pattern not matched: %s", site.login_success_url)
+                if not login_success:
+                    try:
+                        await page.wait_for_selector(site.password_selector, state='detached', timeout=timeout)
+                    except browser_pool.PlaywrightTimeoutError:
+                        logger.warning("Login form still present after %d ms.", timeout)
+                    errors = page.locator(website.LOGIN_ERROR_SELECTOR)
+                    if await errors.count() > 0:
+                        logger.error("Login error detected: %s", await errors.first.text_content())
+                        return None
+                    if await page.locator(site.password_selector).count() > 0:
+                        logger.error("Login form is still shown; login could not be confirmed.")
+                        return None
+                cookies = await context.cookies()
+                logger.info("Successfully extracted %d cookies.", len(cookies))
+                return cookies
+            finally:
+                await browser.close()
+    except browser_pool.PlaywrightTimeoutError:
+        logger.error("Playwright timed out during login process. Check selectors and network conditions.")
+    except browser_pool.PlaywrightError as e:
+        logger.error("A Playwright error occurred during login: %s", e)
+    finally:
+        stats.update(blocking=blocker.enabled, blocked_requests=blocker.blocked, allowed_requests=blocker.allowed)
+    return None
+
+
+# Login strategies in escalation order of cost
+LOGIN_STRATEGIES = {
+    'requests': _login_with_form,
+    'playwright': _login_with_browser,
+}
+
+
+async def login(session, base_url, username, password, report=None, publication=None):
+    """
+    Async `website.login`: reuse cached cookies the probe still accepts, else
+    try the form POST and then the browser, per the site's login_strategy.
+    `report`, if given, receives the winning 'strategy' and every attempt.
+    """
+    site = website._site(publication)
+    report = report if report is not None else {}
+    report.setdefault('strategy', None)
+    report.setdefault('attempts', [])
+    logger.info("Step 1: Logging in to get session cookies.")
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    cookies = session_cache.load_cookies(username, password, site.login_url, path=site.session_cache_path)
+    if cookies:
+        accepted = await _probe_session(session, cookies, site.session_probe_url or base_url, publication=site)
+        report['attempts'].append({'strategy': 'cache', 'success': accepted, 'seconds': round(loop.time() - start, 3)})
+        if accepted:
+            logger.info("Reusing cached session cookies; skipping browser login.")
+            report['strategy'] = 'cache'
+            return cookies
+        logger.info("Cached session was rejected; logging in again.")
+        session_cache.clear(path=site.session_cache_path)
+    for strategy in website._login_strategies(site):
+        attempt = {'strategy': strategy}
+        start = loop.time()
+        cookies = await LOGIN_STRATEGIES[strategy](session, site.login_url, username, password, stats=attempt, publication=site)
+        attempt.update(success=bool(cookies), seconds=round(loop.time() - start, 3))
+        report['attempts'].append(attempt)
+        if cookies:
+            logger.info("Logged in using the %s strategy in %.2fs.", strategy, attempt['seconds'])
+            report['strategy'] = strategy
+            session_cache.save_cookies(cookies, username, password, site.login_url, path=site.session_cache_path)
+            return cookies
+    return None
+
+
+# --- Download ---
+def _chunk_size():
+    return int(config.config.get(('download', 'chunk_size_kb'), downloader.DEFAULT_CHUNK_SIZE // 1024)) * 1024
+
+
+async def _stream_to_file(response, final_path, temp_path, resume_state, url, validator=None):
+    """Async `downloader.stream_response_to_file` for an aiohttp response."""
+    with downloader.open_writer(response, response.status, final_path, temp_path=temp_path,
+                                resume_state=resume_state, url=url, validator=validator) as writer:
+        try:
+            async for chunk in response.content.iter_chunked(_chunk_size()):
+                writer.write(chunk)
+        except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise downloader.DownloadError(f"Transfer interrupted after {writer.size} bytes: {e}", resumable=True) from e
+        sha256 = writer.commit()
+    logger.info("Wrote %d bytes to %s (sha256 %s)", writer.size, final_path, sha256)
+    return writer.size, sha256
+
+
+async def download_edition(session, base_url, cookies, save_path, target_date=None, dry_run=False, force_download=False,
+                           download_url=None, accept_formats=None, publication=None):
+    """
+    Async `website.download_edition`: same arguments (plus the aiohttp
+    session), same conditional requests, resume, retries and per-host rate
+    limiting, but every wait yields to the event loop.
+
+    Returns:
+        tuple: A success flag (bool) and the file format (str) or error message (str).
+    """
+    site = website._site(publication)
+    if target_date is None:
+        target_date = datetime.now().strftime('%Y-%m-%d')
+    formats = accept_formats or website.EDITION_FORMATS
+    existing_format = next((ext for ext in formats if os.path.exists(f"{save_path}.{ext}")), None)
+    if existing_format and not force_download:
+        logger.info("Newspaper file already exists: %s.%s", save_path, existing_format)
+        return True, existing_format
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+
+    logger.info("Step 2: Downloading the newspaper for date: %s%s", target_date,
+                " (force download)" if force_download and existing_format else "")
+    if download_url is None:
+        download_url = urljoin(base_url, site.download_path.format(date=target_date))
+    request_headers = {'User-Agent': site.user_agent}
+    if accept_formats:
+        request_headers['Accept'] = website._accept_header(accept_formats)
+    validator_headers = downloader.conditional_headers(f"{save_path}.{existing_format}") if existing_format else {}
+    max_retries = max(1, int(config.config.get(('rate_limit', 'max_retries'), 3))) # At least the first attempt
+    policy = rate_limit.for_url(download_url)
+    partial_path = downloader.part_path(save_path)
+    retry_delay = 0
+
+    for attempt in range(max_retries):
+        if retry_delay:
+            await asyncio.sleep(retry_delay)
+            retry_delay = 0
+        try:
+            await policy.acquire_async()
+        except rate_limit.CircuitOpenError as e:
+            logger.error("Not requesting the newspaper: %s", e)
+            return False, str(e)
+        try:
+            resume_state = None if dry_run else downloader.load_resume_state(partial_path, download_url)
+            if resume_state:
+                logger.info("Found %d bytes of an earlier partial download; requesting the rest.", resume_state['offset'])
+            headers = {**request_headers, **(downloader.resume_headers(resume_state) if resume_state else validator_headers)}
+            async with session.get(download_url, headers=_auth_headers(headers, cookies, download_url)) as response:
+                policy.record(response.status)
+                if response.status == 304 and existing_format and not resume_state:
+                    logger.info("Newspaper unchanged on server (304); keeping %s.%s", save_path, existing_format)
+                    return True, existing_format
+                if response.status in (200, 206):
+                    content_type = response.headers.get('Content-Type') or (resume_state or {}).get('content_type') or ''
+                    file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
+                    if accept_formats and file_format not in accept_formats:
+                        logger.info("Edition is only available as %s, not %s.", file_format, '/'.join(accept_formats))
+                        return False, f"Format not available: got {file_format}"
+                    if dry_run:
+                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
+                        return True, file_format
+                    final_path = f"{save_path}.{file_format}"
+                    try:
+                        size, sha256 = await _stream_to_file(response, final_path, partial_path, resume_state, download_url,
+                                                             validation.validator_for(file_format, content_type))
+                    except downloader.DownloadError as e:
+                        if attempt < max_retries - 1:
+                            retry_delay = policy.backoff(0 if e.resumable else attempt)
+                            logger.warning("%s. Retrying in %.1f seconds (attempt %d of %d)...",
+                                           e, retry_delay, attempt + 1, max_retries)
+                            continue
+                        logger.error("Download failed after %d attempts: %s", max_retries, e)
+                        return False, str(e)
+                    logger.info("Newspaper downloaded successfully: %s (%d bytes, sha256 %s)", final_path, size, sha256)
+                    downloader.record_download(final_path, response, download_url, size, sha256)
+                    return True, file_format
+                if response.status == 416 and resume_state:
+                    logger.warning("Server rejected the resume range; discarding the partial download.")
+                    downloader.discard_partial(partial_path)
+                    if attempt < max_retries - 1:
+                        continue
+                elif response.status in (429, 503, 502, 504) and attempt < max_retries - 1:
+                    retry_delay = policy.retry_delay(response, attempt)
+                    logger.warning("Received status code %d. Retrying in %.1f seconds (attempt %d of %d)...",
+                                   response.status, retry_delay, attempt + 1, max_retries)
+                    continue
+                logger.error("Failed to download newspaper. Status code: %d", response.status)
+                return False, f"Error {response.status}: {await response.text(errors='replace')}"
+        except asyncio.TimeoutError:
+            policy.record_error()
+            if attempt < max_retries - 1:
+                retry_delay = policy.backoff(attempt)
+                logger.warning("Request timed out. Retrying in %.1f seconds (attempt %d of %d)...",
+                               retry_delay, attempt + 1, max_retries)
+            else:
+                logger.error("Download failed after %d attempts due to timeout", max_retries)
+                return False, "Request timed out repeatedly"
+        except aiohttp.ClientError as e:
+            policy.record_error()
+            logger.error("Request error during download attempt: %s", e)
+            return False, f"Request error: {str(e)}"
+        except OSError as e:
+            logger.error("OS error during download attempt: %s", e)
+            return False, f"OS error: {str(e)}"
+        finally:
+            policy.release()
+    return False, "Download failed"
+
+
+async def acquire_edition(base_url, username, password, save_path, target_date=None, formats=website.EDITION_FORMATS,
+                          dry_run=False, force_download=False, cookies=None, publication=None, session=None):
+    """
+    Async `website.acquire_edition`: log in once and fetch the edition in the
+    first available format. Returns the same result dict.
+    """
+    site = website._site(publication)
+    if target_date is None:
+        target_date = datetime.now().strftime('%Y-%m-%d')
+    result = {'success': False, 'format': None, 'path': None, 'error': None, 'login_seconds': 0.0, 'probes': [],
+              'sha256': None, 'changed': True, 'login': {}}
+    # A local copy needs neither a login nor a request, unless it fails validation
+    if not force_download:
+        for fmt in formats:
+            if os.path.exists(f"{save_path}.{fmt}"):
+                valid, reason = validation.validate_file(f"{save_path}.{fmt}", fmt)
+                if not valid:
+                    logger.warning("Discarding invalid local copy %s.%s: %s", save_path, fmt, reason)
+                    os.remove(f"{save_path}.{fmt}")
+                    continue
+                logger.info("Newspaper file already exists: %s.%s", save_path, fmt)
+                result.update(success=True, format=fmt, path=f"{save_path}.{fmt}")
+                return website._with_content_state(result)
+
+    async with _session_scope(session, site) as session:
+        loop = asyncio.get_running_loop()
+        if cookies is None:
+            start = loop.time()
+            cookies = await login(session, base_url, username, password, report=result['login'], publication=site)
+            result['login_seconds'] = round(loop.time() - start, 3)
+            if not cookies:
+                result['error'] = "Failed to obtain cookies."
+                return result
+        for probe_formats, url in website._edition_probes(base_url, target_date, formats, publication=site):
+            start = loop.time()
+            success, detail = await download_edition(session, base_url, cookies, save_path, target_date=target_date,
+                                                     dry_run=dry_run, force_download=force_download, download_url=url,
+                                                     accept_formats=probe_formats, publication=site)
+            probe = {'formats': list(probe_formats), 'url': url, 'success': success,
+                     'seconds': round(loop.time() - start, 3)}
+            if not success:
+                probe['error'] = detail
+            result['probes'].append(probe)
+            if success:
+                result.update(success=True, format=detail, path=f"{save_path}.{detail}")
+                if detail == 'html' and not dry_run and os.path.exists(result['path']):
+                    # Asset fetching uses the threaded requests session
+                    await asyncio.to_thread(website._package, result, url, cookies, site)
+                return website._with_content_state(result)
+            result['error'] = detail
+    return result
+
+
+async def acquire_editions(base_url, username, password, editions, formats=website.EDITION_FORMATS,
+                           dry_run=False, force_download=False, publication=None, session=None):
+    """
+    Fetch several editions concurrently in one event loop after a single login.
+
+    Args:
+        editions (dict): Maps 'YYYY-MM-DD' dates to save paths (without extension).
+
+    Returns:
+        dict: The `acquire_edition` result for each date.
+    """
+    site = website._site(publication)
+    async with _session_scope(session, site) as session:
+        report = {}
+        cookies = await login(session, base_url, username, password, report=report, publication=site)
+        if not cookies:
+            return {day: {'success': False, 'error': "Failed to obtain cookies.", 'login': report} for day in editions}
+        results = await asyncio.gather(*(
+            acquire_edition(base_url, username, password, path, target_date=day, formats=formats, dry_run=dry_run,
+                            force_download=force_download, cookies=cookies, publication=site, session=session)
+            for day, path in editions.items()))
+    return dict(zip(editions, results))
+
+
+async def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False,
+                             force_download=False, publication=None):
+    """Async `website.login_and_download`: log in and download the edition for the given date."""
+    async with _session_scope(None, publication) as session:
+        cookies = await login(session, base_url, username, password, publication=publication)
+        if not cookies:
+            return False, "Failed to obtain cookies."
+        return await download_edition(session, base_url, cookies, save_path, target_date=target_date,
+                                      dry_run=dry_run, force_download=force_download, publication=publication)
+
+
+# --- Sync wrappers ---
+def run_sync(coroutine):
+    """
+    Run a coroutine to completion from synchronous code. If the calling thread
+    already runs an event loop, the coroutine gets a fresh loop on a helper thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    outcome = {}
+
+    def runner():
+        try:
+            outcome['result'] = asyncio.run(coroutine)
+        except BaseException as e:
+            outcome['error'] = e
+    thread = threading.Thread(target=runner, name='async-acquisition')
+    thread.start()
+    thread.join()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+def acquire_edition_sync(*args, **kwargs):
+    """Blocking `acquire_edition`; falls back to website.acquire_edition without aiohttp."""
+    if not AIOHTTP_AVAILABLE:
+        logger.warning("aiohttp is not installed; using the synchronous acquisition backend.")
+        return website.acquire_edition(*args, **kwargs)
+    return run_sync(acquire_edition(*args, **kwargs))
+
+
+def login_and_download_sync(*args, **kwargs):
+    """Blocking `login_and_download`; falls back to website.login_and_download without aiohttp."""
+    if not AIOHTTP_AVAILABLE:
+        logger.warning("aiohttp is not installed; using the synchronous acquisition backend.")
+        return website.login_and_download(*args, **kwargs)
+    return run_sync(login_and_download(*args, **kwargs))
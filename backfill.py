@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Backfill module
+Recovers a range of missed editions in one run: logs in once per title,
+downloads the dates concurrently (paced per host by the rate_limit module),
+then uploads and thumbnails them in parallel and writes a single summary
+report. Titles from a `publications:` list are stored under their own prefix.
+"""
+
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import config
+import acquisition
+import browser_pool
+import downloader
+import http_session
+import publications
+import storage
+import packager
+import main
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_WORKERS = 4 # Concurrent date downloads; requests per host are limited by rate_limit
+MAX_BACKFILL_DAYS = 62
+REPORT_FILE = 'backfill_report.json'
+
+
+def date_range(start_date, end_date):
+    """Inclusive list of dates from start_date to end_date."""
+    if end_date < start_date:
+        raise ValueError(f"Backfill end date {end_date} is before start date {start_date}")
+    days = (end_date - start_date).days + 1
+    if days > MAX_BACKFILL_DAYS:
+        raise ValueError(f"Backfill range of {days} days exceeds the {MAX_BACKFILL_DAYS} day limit")
+    return [start_date + timedelta(days=i) for i in range(days)]
+
+
+def _download_one(publication, cookies, download_dir, day, dry_run, force_download):
+    day_str = day.strftime(main.DATE_FORMAT)
+    save_path = os.path.join(download_dir, f"{day_str}_newspaper")
+    entry = {'publication': publication.name, 'date': day_str}
+    start = time.time()
+    try:
+        acquire = acquisition.get() # acquisition.backend: 'sync' or 'async'
+        edition = acquire(
+            base_url=publication.url, username=None, password=None, save_path=save_path, target_date=day_str,
+            dry_run=dry_run, force_download=force_download, cookies=cookies, publication=publication
+        )
+    except Exception as e:
+        logger.exception("Backfill download for %s failed: %s", day_str, e)
+        edition = {'success': False, 'error': str(e)}
+    entry['download_seconds'] = round(time.time() - start, 2)
+    if edition['success']:
+        entry.update(download='ok', format=edition['format'], path=edition['path'],
+                     changed=edition.get('changed', True))
+    else:
+        entry.update(download='failed', error=edition['error'])
+    return entry
+
+
+def _upload_one(entry, dry_run, prefix=''):
+    key = prefix + main.FILENAME_TEMPLATE.format(date=entry['date'], format=entry['format'])
+    try:
+        path, extra_args = packager.upload_source(entry['path'], entry['format'])
+        return bool(storage.upload_to_storage(path, key, dry_run=dry_run, extra_args=extra_args))
+    except Exception as e:
+        logger.exception("Backfill upload for %s failed: %s", entry['date'], e)
+        return False
+
+
+def _thumbnail_one(entry, download_dir, dry_run):
+    from thumbnail import generate_thumbnail
+    thumbnail_path = os.path.join(download_dir, main.THUMBNAIL_FILENAME_TEMPLATE.format(date=entry['date']))
+    try:
+        return bool(generate_thumbnail(entry['path'], thumbnail_path, file_format=entry['format'], dry_run=dry_run))
+    except Exception as e:
+        logger.exception("Backfill thumbnail for %s failed: %s", entry['date'], e)
+        return False
+
+
+def _backfill_publication(publication, days, entries, download_dir, dry_run, force_download, max_workers, progress):
+    """Log in to one title and download, upload and thumbnail its editions into `entries`."""
+    download_dir = publication.download_dir(download_dir)
+    os.makedirs(download_dir, exist_ok=True)
+    main.update_status('backfill', 'in_progress', f"Logging in to {publication.name} to backfill {len(days)} editions...",
+                       percent=progress())
+
+    # One login for the whole range (the sync login's cookies suit either acquisition backend)
+    import website
+    cookies = website.login(publication.url, publication.username, publication.password, publication=publication)
+    if not cookies:
+        for day in days:
+            entries[(publication.name, day.strftime(main.DATE_FORMAT))].update(download='failed', error='Failed to obtain cookies.')
+        progress(len(days))
+        return
+    # Downloads feed straight into a second pool for upload and thumbnail work
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='backfill-dl') as download_pool, \
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='backfill-post') as post_pool:
+        downloads = [
+            download_pool.submit(_download_one, publication, cookies, download_dir, day, dry_run, force_download)
+            for day in days
+        ]
+        post_tasks = []
+        for future in as_completed(downloads):
+            entry = future.result()
+            entries[(entry['publication'], entry['date'])].update(entry)
+            if entry['download'] == 'ok' and not entry['changed'] and not dry_run:
+                entry.update(upload='unchanged', thumbnail='unchanged')
+                entries[(entry['publication'], entry['date'])].update(entry)
+            elif entry['download'] == 'ok':
+                post_tasks.append((entry, 'upload', post_pool.submit(_upload_one, entry, dry_run, publication.storage_prefix)))
+                post_tasks.append((entry, 'thumbnail', post_pool.submit(_thumbnail_one, entry, download_dir, dry_run)))
+            main.update_status('backfill', 'in_progress', f"Downloaded {entry['date']} of {publication.name}...",
+                               percent=progress(1))
+        for entry, step, future in post_tasks:
+            entries[(entry['publication'], entry['date'])][step] = 'ok' if future.result() else 'failed'
+        # Fallback downloads and HTML thumbnails reuse their worker's browser until here
+        browser_pool.shutdown_worker_pools(download_pool, max_workers)
+        browser_pool.shutdown_worker_pools(post_pool, max_workers)
+    if not dry_run:
+        for (name, _), entry in entries.items():
+            if name == publication.name and entry.get('upload') == 'ok' and entry.get('thumbnail') == 'ok':
+                downloader.mark_published(entry['path'])
+
+
+def run_backfill(start_date, end_date, dry_run=False, force_download=False, max_workers=None, names=None):
+    """
+    Download, upload and thumbnail every edition from start_date to end_date
+    (inclusive) for each selected title (`names`; all configured titles by default).
+
+    Returns:
+        dict: Summary report with one entry per title and date; also written to backfill_report.json.
+
+    Raises:
+        ValueError: If the range is invalid or a named title is not configured.
+    """
+    days = date_range(start_date, end_date)
+    titles = publications.select(publications.load_publications(), names)
+    if max_workers is None:
+        max_workers = config.config.get(('backfill', 'max_workers'), DEFAULT_MAX_WORKERS)
+    max_workers = max(1, int(max_workers))
+    download_dir = config.config.get(('paths', 'download_dir'), 'downloads')
+    started = time.time()
+    logger.info("Backfilling %d editions from %s to %s for %s with %d workers.", len(days), days[0], days[-1],
+                ', '.join(p.name for p in titles), max_workers)
+    entries = {(p.name, day.strftime(main.DATE_FORMAT)): {'publication': p.name, 'date': day.strftime(main.DATE_FORMAT)}
+               for p in titles for day in days}
+    done = [0]
+
+    def progress(finished=0):
+        done[0] += finished
+        return int(done[0] * 80 / len(entries))
+
+    for publication in titles:
+        _backfill_publication(publication, days, entries, download_dir, dry_run, force_download, max_workers, progress)
+
+    report = {
+        'start': days[0].strftime(main.DATE_FORMAT),
+        'end': days[-1].strftime(main.DATE_FORMAT),
+        'dry_run': dry_run,
+        'elapsed_seconds': round(time.time() - started, 2),
+        'publications': [p.name for p in titles],
+        'downloaded': sum(1 for e in entries.values() if e.get('download') == 'ok'),
+        'failed': sum(1 for e in entries.values() if e.get('download') != 'ok' or 'failed' in (e.get('upload'), e.get('thumbnail'))),
+        'editions': [entries[k] for k in sorted(entries, key=lambda k: (k[1], k[0]))],
+        'http': http_session.log_connection_stats(),
+    }
+    try:
+        with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    except OSError as e:
+        logger.warning("Could not write backfill report: %s", e)
+    for entry in report['editions']:
+        logger.info("Backfill %s %s: download=%s upload=%s thumbnail=%s%s", entry['publication'], entry['date'], entry.get('download'),
+                    entry.get('upload', '-'), entry.get('thumbnail', '-'),
+                    f" ({entry['error']})" if entry.get('error') else '')
+    logger.info("Backfill finished in %.1fs: %d of %d editions downloaded, %d with problems.",
+                report['elapsed_seconds'], report['downloaded'], len(entries), report['failed'])
+    main.update_status('backfill', 'success' if report['failed'] == 0 else 'error',
+                       f"Backfill complete: {report['downloaded']} of {len(entries)} editions downloaded.", percent=100)
+    return report
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD command-line date."""
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
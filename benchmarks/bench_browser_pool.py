@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold Chromium launch per stage vs. the shared warm browser pool.
+
+Each "stage" (login, fallback download, HTML thumbnail) opens a page and loads
+a small local HTML document. The cold run launches a fresh browser for every
+stage, as the pipeline used to; the warm run takes contexts from one pool.
+
+Usage: python benchmarks/bench_browser_pool.py [--editions N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import browser_pool
+
+STAGES = ('login', 'download', 'thumbnail')
+
+
+def _stage_page(context, url):
+    page = context.new_page()
+    page.goto(url, wait_until='load')
+    page.close()
+
+
+def run_cold(url, editions):
+    from playwright.sync_api import sync_playwright
+    timings = {stage: [] for stage in STAGES}
+    for _ in range(editions):
+        for stage in STAGES:
+            start = time.perf_counter()
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=True)
+                context = browser.new_context()
+                _stage_page(context, url)
+                browser.close()
+            timings[stage].append(time.perf_counter() - start)
+    return timings
+
+
+def run_warm(url, editions):
+    pool = browser_pool.BrowserPool()
+    timings = {stage: [] for stage in STAGES}
+    try:
+        for _ in range(editions):
+            for stage in STAGES:
+                start = time.perf_counter()
+                with pool.context() as context:
+                    _stage_page(context, url)
+                timings[stage].append(time.perf_counter() - start)
+    finally:
+        pool.shutdown()
+    return timings
+
+
+def _report(label, timings):
+    print(f"{label}:")
+    for stage in STAGES:
+        samples = timings[stage]
+        print(f"  {stage:<10} first {samples[0] * 1000:8.1f} ms   mean {sum(samples) / len(samples) * 1000:8.1f} ms")
+    total = sum(sum(v) for v in timings.values())
+    print(f"  {'total':<10} {total:.2f} s")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--editions', type=int, default=3, help='Number of simulated editions per mode.')
+    args = parser.parse_args()
+    if not browser_pool.PLAYWRIGHT_AVAILABLE:
+        print("Playwright is not installed; nothing to benchmark.")
+        return 1
+    with tempfile.NamedTemporaryFile('w', suffix='.html', delete=False) as f:
+        f.write('<html><body><h1>Benchmark</h1></body></html>')
+        url = f"file://{f.name}"
+    try:
+        cold = _report('Cold launch per stage', run_cold(url, args.editions))
+        warm = _report('Warm browser pool', run_warm(url, args.editions))
+        print(f"Speed-up: {cold / warm:.1f}x")
+    finally:
+        os.unlink(f.name)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
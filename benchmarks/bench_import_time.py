@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold-start import time of the entry points.
+
+Imports each module in a fresh interpreter under `python -X importtime` and
+reports the median cumulative time over several runs, next to the budget
+measured when the heavy dependencies were made lazy (about 30 ms for
+run_newspaper and 170 ms for main). The test suite only checks which
+modules get loaded; wall-clock numbers belong here.
+
+Usage: python benchmarks/bench_import_time.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGETS_MS = {'run_newspaper': 250, 'main': 700} # A few times the measured cost
+
+
+def cumulative_ms(module):
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                               cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip() == module:
+            return int(cumulative) / 1000
+    raise RuntimeError(f"{module} not in -X importtime output")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per module.')
+    args = parser.parse_args()
+    over = 0
+    for module, budget in BUDGETS_MS.items():
+        median = statistics.median(cumulative_ms(module) for _ in range(args.runs))
+        over += median > budget
+        print(f"import {module:<14} {median:8.1f} ms (budget {budget} ms){'  OVER' if median > budget else ''}")
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Playwright login latency with and without request blocking.
+
+A local server serves a login page that pulls in slow images, a web font and
+an "analytics" script, the way publisher login pages do. The old path waited
+for network idle with nothing blocked; the new path aborts those requests via
+the site profile and waits on the login form selectors instead.
+
+Usage: python benchmarks/bench_login_blocking.py [--runs N] [--delay SECONDS]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import browser_pool
+import publications
+import website
+
+LOGIN_PAGE = """<html><head>
+<link rel="stylesheet" href="/static/site.css">
+<style>@font-face {{ font-family: Brand; src: url(/static/brand.woff2); }} body {{ font-family: Brand; }}</style>
+<script async src="/track/analytics.js"></script>
+</head><body>
+{images}
+<form action="/session" method="post">
+  <input id="username" name="username"><input id="password" name="password" type="password">
+  <button id="login-btn" type="submit">Log in</button>
+</form></body></html>"""
+
+
+def _handler(delay):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, content_type='text/html', headers=()):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/login':
+                images = ''.join(f'<img src="/static/ad{i}.png">' for i in range(8))
+                self._send(200, LOGIN_PAGE.format(images=images).encode())
+            elif self.path == '/account':
+                self._send(200, b'<a id="user-profile-link">Account</a>')
+            else:
+                time.sleep(delay) # Slow third-party asset
+                self._send(200, b'', content_type='application/octet-stream')
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self._send(303, b'', headers=[('Location', '/account'), ('Set-Cookie', 'sid=bench; Path=/')])
+    return Handler
+
+
+def run(login_url, runs, blocking):
+    profile = browser_pool.site_profile(login_url)
+    if blocking:
+        profile['block_url_patterns'] = list(profile['block_url_patterns']) + ['*/track/*']
+    else:
+        profile.update(block_resource_types=[], block_url_patterns=[], wait_until='networkidle')
+    site = publications.Publication('bench', login_url, selectors={
+        'username': '#username', 'password': '#password', 'submit': '#login-btn',
+        'login_success': '#user-profile-link', 'login_success_url': ''})
+    timings = []
+    with mock.patch.object(browser_pool, 'site_profile', return_value=profile):
+        for _ in range(runs):
+            stats = {}
+            start = time.perf_counter()
+            cookies = website._get_session_cookies(login_url, 'bench', 'bench', stats=stats, publication=site)
+            timings.append(time.perf_counter() - start)
+            if not cookies:
+                raise RuntimeError("Benchmark login failed")
+    return timings, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=3, help='Logins per mode.')
+    parser.add_argument('--delay', type=float, default=1.5, help='Seconds each slow asset takes to load.')
+    args = parser.parse_args()
+    if not browser_pool.PLAYWRIGHT_AVAILABLE:
+        print("Playwright is not installed; nothing to benchmark.")
+        return 1
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _handler(args.delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    login_url = f"http://127.0.0.1:{server.server_port}/login"
+    try:
+        with browser_pool.get_pool().context(): # Launch the browser outside the timed runs
+            pass
+        results = {}
+        for label, blocking in (('networkidle, no blocking', False), ('blocking + selector waits', True)):
+            timings, stats = run(login_url, args.runs, blocking)
+            results[label] = sum(timings) / len(timings)
+            print(f"{label:<28} mean {results[label] * 1000:8.1f} ms   blocked {stats.get('blocked_requests', 0)} requests")
+        before, after = results.values()
+        print(f"Saved {(before - after) * 1000:.0f} ms per login ({before / after:.1f}x faster)")
+    finally:
+        server.shutdown()
+        browser_pool.shutdown_pool()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: login and edition download against a replayed publisher.
+
+Serves a cassette recorded with `run_newspaper.py --record-http` (or a
+synthetic one) from replay.ReplayServer and runs website.acquire_edition
+against it, so throughput, retries and login strategies can be compared
+offline under the same latency, bandwidth and error rate every time.
+
+Usage: python benchmarks/bench_replay_acquisition.py [--cassette FILE [--publication NAME]]
+           [--synthetic-mb N] [--latency S] [--bandwidth-mb N] [--error-rate P] [--seed N] [--runs N]
+"""
+
+import argparse
+import base64
+import os
+import statistics
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import publications
+import rate_limit
+import replay
+import website
+
+ORIGIN = 'https://publisher.example'
+LOGIN_PAGE = b"""<html><body><form action="/session" method="post">
+  <input id="username" name="user"><input id="password" name="pass" type="password">
+  <button id="login-btn" type="submit">Log in</button></form></body></html>"""
+
+
+def _exchange(method, path, status, headers, body=b''):
+    return {'request': {'method': method, 'url': ORIGIN + path, 'headers': [], 'body': ''},
+            'response': {'status': status, 'headers': headers, 'body': base64.b64encode(body).decode('ascii')}}
+
+
+def synthetic_cassette(size_mb):
+    """A form login plus one PDF edition of `size_mb`."""
+    head = b'%PDF-1.4\n' + os.urandom(int(size_mb * 1024 * 1024))
+    pdf = head + b'xref\n0 1\n0000000000 65535 f \ntrailer\n<< /Size 1 >>\nstartxref\n%d\n%%%%EOF\n' % len(head)
+    return {'version': replay.CASSETTE_VERSION, 'interactions': [
+        _exchange('GET', '/login', 200, [['Content-Type', 'text/html']], LOGIN_PAGE),
+        _exchange('POST', '/session', 303, [['Location', ORIGIN + '/account'], ['Set-Cookie', 'sid=scrubbed1; Path=/']]),
+        _exchange('GET', '/account', 200, [['Content-Type', 'text/html']], b'<a id="user-profile-link">Me</a>'),
+        _exchange('GET', '/edition/2024-01-01', 200,
+                  [['Content-Type', 'application/pdf'], ['ETag', '"bench"'], ['Accept-Ranges', 'bytes']], pdf),
+    ]}
+
+
+def synthetic_publication():
+    return publications.Publication(
+        'bench', ORIGIN + '/', login_url=ORIGIN + '/login', login_strategy='requests',
+        session_probe_url=ORIGIN + '/account', download_path='edition/{date}',
+        selectors={'username': '#username', 'password': '#password', 'submit': '#login-btn',
+                   'login_success': '#user-profile-link', 'login_success_url': ''})
+
+
+def run_once(cassette, publication, target_date, options, directory):
+    server = replay.ReplayServer(cassette, **options)
+    with server:
+        site = replay.rebase(publication, server.url, cassette)
+        rate_limit.reset()
+        start = time.perf_counter()
+        result = website.acquire_edition(site.url, site.username or 'user', site.password or 'password',
+                                         os.path.join(directory, f"edition_{time.monotonic_ns()}"),
+                                         target_date=target_date, force_download=True, publication=site)
+        elapsed = time.perf_counter() - start
+    transfer = next((p['transfer'] for p in result['probes'] if p.get('transfer')), {})
+    return {'success': result['success'], 'seconds': elapsed, 'login_seconds': result['login_seconds'],
+            'strategy': result['login'].get('strategy'), 'mb_per_second': transfer.get('mb_per_second', 0.0),
+            'injected_errors': server.stats['injected_errors'], 'requests': server.stats['requests']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cassette', help='Cassette recorded with run_newspaper.py --record-http.')
+    parser.add_argument('--publication', help='Configured title the cassette was recorded for (default: newspaper block).')
+    parser.add_argument('--date', default='2024-01-01', help='Edition date the cassette contains.')
+    parser.add_argument('--synthetic-mb', type=float, default=16, help='Edition size when no cassette is given.')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds before every response.')
+    parser.add_argument('--bandwidth-mb', type=float, default=8.0, help='Per-connection cap in MB/s (0: none).')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 503.')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.cassette:
+        cassette = replay.load(args.cassette)
+        publication = publications.select(publications.load_publications(),
+                                          [args.publication] if args.publication else None)[0]
+    else:
+        cassette, publication = synthetic_cassette(args.synthetic_mb), synthetic_publication()
+    options = {'latency': args.latency, 'bandwidth': args.bandwidth_mb * 1e6 if args.bandwidth_mb else None,
+               'error_rate': args.error_rate, 'seed': args.seed}
+    values = {('rate_limit', 'requests_per_second'): 0, ('rate_limit', 'backoff_base_seconds'): 0.1}
+    get = website.config.config.get
+    with tempfile.TemporaryDirectory() as directory, \
+            mock.patch.object(website.config.config, 'get', side_effect=lambda key, default=None: values.get(key, get(key, default))), \
+            mock.patch.object(website.session_cache, 'load_cookies', return_value=None), \
+            mock.patch.object(website.session_cache, 'save_cookies'):
+        runs = [run_once(cassette, publication, args.date, options, directory) for _ in range(args.runs)]
+
+    for i, run in enumerate(runs, start=1):
+        print(f"run {i}: {'ok' if run['success'] else 'FAILED'}  {run['seconds']:6.2f} s  login {run['login_seconds']:5.2f} s "
+              f"({run['strategy']})  {run['mb_per_second']:6.2f} MB/s  {run['requests']} requests, "
+              f"{run['injected_errors']} injected errors")
+    print(f"median {statistics.median(r['seconds'] for r in runs):.2f} s, "
+          f"{statistics.median(r['mb_per_second'] for r in runs):.2f} MB/s")
+    return 0 if all(r['success'] for r in runs) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
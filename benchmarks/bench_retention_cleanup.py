@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: retention cleanup of a long-neglected bucket.
+
+Deletes N expired editions through a stand-in S3 client that answers every
+request after a fixed round-trip time, comparing one delete_object call per
+key (the old sweep) with storage.delete_many's batched, parallel
+delete_objects calls.
+
+Usage: python benchmarks/bench_retention_cleanup.py [--keys N] [--rtt-ms MS] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import manifest
+import storage
+
+
+class SlowBucket:
+    """Every request costs `rtt` seconds; delete_objects is charged a little more per key."""
+
+    def __init__(self, rtt):
+        self.rtt, self.requests = rtt, 0
+        self._lock = threading.Lock()
+
+    def _request(self, extra=0.0):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.rtt + extra)
+
+    def delete_object(self, Bucket, Key):
+        self._request()
+
+    def delete_objects(self, Bucket, Delete):
+        self._request(len(Delete['Objects']) * 0.00005)
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--keys', type=int, default=1000, help='Expired editions to delete.')
+    parser.add_argument('--rtt-ms', type=float, default=20.0, help='Round-trip time of one S3 request.')
+    parser.add_argument('--workers', type=int, default=storage.DEFAULT_DELETE_WORKERS)
+    args = parser.parse_args()
+    keys = [f"{2000 + i // 336}-{i // 28 % 12 + 1:02d}-{i % 28 + 1:02d}_newspaper.pdf" for i in range(args.keys)]
+
+    results = {}
+    for name in ('per key', 'batched'):
+        bucket = SlowBucket(args.rtt_ms / 1000)
+        with mock.patch.object(storage, '_get_s3_client', return_value=bucket), \
+                mock.patch.object(storage, '_get_bucket', return_value='bench'), \
+                mock.patch.object(manifest, 'is_enabled', return_value=False):
+            start = time.perf_counter()
+            if name == 'per key':
+                deleted = sum(storage.delete_from_storage(key) for key in keys)
+            else:
+                deleted = len(storage.delete_many(keys, max_workers=args.workers)[0])
+            results[name] = time.perf_counter() - start
+        print(f"{name:8s} {deleted} keys in {bucket.requests:5d} requests  {results[name]:7.2f} s")
+    print(f"{results['per key'] / results['batched']:.0f}x faster")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-stream vs segmented download of a large edition.
+
+A local server caps every connection at a fixed rate, the way a publisher
+CDN limits one TCP stream, and supports byte ranges with an ETag. The same
+file is fetched through website.download_edition as one stream and then as
+N concurrent segments.
+
+Usage: python benchmarks/bench_segmented_download.py [--size-mb N] [--rate-mb N] [--segments N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rate_limit
+import website
+
+
+def _handler(body, rate):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            start, end, status = 0, len(body) - 1, 200
+            spec = self.headers.get('Range')
+            if spec and self.headers.get('If-Range') == '"bench"':
+                start, end = (int(v) for v in spec.split('=')[1].split('-'))
+                status = 206
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/pdf')
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', '"bench"')
+            if status == 206:
+                self.send_header('Content-Range', f"bytes {start}-{end}/{len(body)}")
+            self.send_header('Content-Length', str(end - start + 1))
+            self.end_headers()
+            step = 64 * 1024
+            try:
+                for offset in range(start, end + 1, step):
+                    chunk = body[offset:min(offset + step, end + 1)]
+                    self.wfile.write(chunk)
+                    time.sleep(len(chunk) / rate) # Per-connection throttle
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+    return Handler
+
+
+def run(url, segments, directory):
+    values = {('download', 'segments'): segments, ('download', 'segment_min_mb'): 1,
+              ('rate_limit', 'requests_per_second'): 0, ('rate_limit', 'max_concurrent'): segments,
+              ('download', 'max_size_mb'): 4096}
+    save_path = os.path.join(directory, f"edition_{segments}")
+    stats = {}
+    with mock.patch.object(website.config.config, 'get', side_effect=lambda key, default=None: values.get(key, default)):
+        rate_limit.reset()
+        start = time.perf_counter()
+        success, detail = website.download_edition(url, [], save_path, target_date='2024-01-01', download_url=url,
+                                                   accept_formats=('pdf',), force_download=True, stats=stats)
+        elapsed = time.perf_counter() - start
+    if not success:
+        raise RuntimeError(f"Benchmark download failed: {detail}")
+    return elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-mb', type=int, default=32, help='Size of the edition served.')
+    parser.add_argument('--rate-mb', type=float, default=8.0, help='Per-connection cap in MB/s.')
+    parser.add_argument('--segments', type=int, default=4, help='Segments for the parallel run.')
+    args = parser.parse_args()
+    # A well-formed PDF around random bytes, so download validation passes
+    head = b'%PDF-1.4\n' + os.urandom(args.size_mb * 1024 * 1024)
+    body = head + b'xref\n0 1\n0000000000 65535 f \ntrailer\n<< /Size 1 >>\nstartxref\n%d\n%%%%EOF\n' % len(head)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _handler(body, args.rate_mb * 1e6))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/edition.pdf"
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            single, _ = run(url, 1, directory)
+            segmented, stats = run(url, args.segments, directory)
+    finally:
+        server.shutdown()
+    size_mb = len(body) / 1e6
+    print(f"single stream        {single:7.2f} s   {size_mb / single:7.2f} MB/s")
+    print(f"{args.segments} segments           {segmented:7.2f} s   {size_mb / segmented:7.2f} MB/s")
+    print(f"Throughput {single / segmented:.1f}x (reported speedup {stats.get('speedup')}x over "
+          f"{stats.get('stream_mb_per_second')} MB/s per stream)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
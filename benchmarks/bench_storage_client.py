@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call overhead of the S3 client in storage.py.
+
+Presigning a URL is local work, so the time per `get_file_url` call is
+almost all client overhead. Compares building a new client for every call
+(the old behaviour) with the shared cached client.
+
+Usage: python benchmarks/bench_storage_client.py [--calls N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage
+
+SETTINGS = {('storage', 'endpoint_url'): 'https://r2.example.com', ('storage', 'access_key_id'): 'bench',
+            ('storage', 'secret_access_key'): 'bench', ('storage', 'bucket'): 'bench'}
+
+
+def timed(calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        storage.get_file_url(f"2024-01-{i % 28 + 1:02d}_newspaper.pdf")
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=50, help='get_file_url calls per variant.')
+    args = parser.parse_args()
+    with mock.patch.object(storage.config.config, 'get', side_effect=lambda key, default=None: SETTINGS.get(key, default)):
+        storage.create_s3_client() # Warm the import and botocore's data loaders for both variants
+        with mock.patch.object(storage, '_get_s3_client', side_effect=lambda: storage.create_s3_client()):
+            per_call_new = timed(args.calls)
+        storage.reset_client()
+        per_call_cached = timed(args.calls)
+    print(f"new client per call   {per_call_new * 1000:8.2f} ms/call")
+    print(f"shared cached client  {per_call_cached * 1000:8.2f} ms/call")
+    print(f"{per_call_new / per_call_cached:.0f}x less overhead per call")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
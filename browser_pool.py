@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Shared Playwright browser pool
+Launches Chromium once per process and hands out isolated browser contexts,
+so login, fallback download and HTML thumbnails don't each pay a cold start.
+Per-site profiles decide which requests a context aborts (ads, analytics,
+images, fonts) and how long page loads are waited for.
+"""
+
+import atexit
+import fnmatch
+import logging
+import threading
+from contextlib import contextmanager
+from importlib.util import find_spec
+from urllib.parse import urlparse
+import config
+
+# Playwright is an optional dependency. Even its public error classes come
+# with the driver API (~100 ms to import), so they are loaded on first use:
+# `browser_pool.PlaywrightError` / `browser_pool.PlaywrightTimeoutError`.
+PLAYWRIGHT_AVAILABLE = find_spec('playwright') is not None
+
+
+class _MissingPlaywrightError(Exception):
+    pass
+
+
+class _MissingPlaywrightTimeoutError(_MissingPlaywrightError):
+    pass
+
+
+_errors = None
+
+
+def _playwright_errors():
+    """(Error, TimeoutError) from playwright.sync_api, or stand-ins when Playwright is not installed."""
+    global _errors
+    if _errors is None:
+        try:
+            from playwright.sync_api import Error, TimeoutError
+            _errors = (Error, TimeoutError)
+        except ImportError:
+            _errors = (_MissingPlaywrightError, _MissingPlaywrightTimeoutError)
+    return _errors
+
+
+def __getattr__(name):
+    if name == 'PlaywrightError':
+        return _playwright_errors()[0]
+    if name == 'PlaywrightTimeoutError':
+        return _playwright_errors()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONTEXT_USES = 50 # Relaunch the browser after this many contexts
+DEFAULT_BLOCK_RESOURCE_TYPES = ('image', 'media', 'font') # Never needed to log in or fetch an edition
+DEFAULT_WAIT_UNTIL = 'domcontentloaded' # Targeted selector waits take over from here
+DEFAULT_SELECTOR_TIMEOUT_MS = 15000
+
+
+def site_profile(url):
+    """
+    Return the browser profile for the site serving `url`: the `default` entry
+    of `browser.profiles` overlaid with the entry whose key matches the host
+    (or a parent domain of it). Blocking can be switched off globally with
+    `browser.block_requests: false`, e.g. to measure what it saves.
+    """
+    profile = {
+        'block_resource_types': list(DEFAULT_BLOCK_RESOURCE_TYPES),
+        'block_url_patterns': [],
+        'wait_until': DEFAULT_WAIT_UNTIL,
+        'selector_timeout_ms': DEFAULT_SELECTOR_TIMEOUT_MS,
+    }
+    profiles = config.config.get(('browser', 'profiles'), {}) or {}
+    profile.update(profiles.get('default') or {})
+    host = (urlparse(url).hostname or '').lower()
+    # Most specific (longest) matching domain wins
+    for name in sorted(profiles, key=len):
+        if name != 'default' and (host == name.lower() or host.endswith('.' + name.lower())):
+            profile.update(profiles[name] or {})
+    if config.config.get(('browser', 'block_requests'), True) in (False, 0, '0', 'false', 'False'):
+        profile['block_resource_types'] = []
+        profile['block_url_patterns'] = []
+    return profile
+
+
+class RequestBlocker:
+    """
+    Route handler that aborts requests by resource type (as reported by
+    Playwright: 'image', 'font', 'media', 'stylesheet', ...) or by URL glob
+    pattern, and counts what it blocked.
+    """
+
+    def __init__(self, resource_types=(), url_patterns=()):
+        self.resource_types = frozenset(t.lower() for t in resource_types or ())
+        self.url_patterns = tuple(url_patterns or ())
+        self.blocked = 0
+        self.allowed = 0
+
+    @classmethod
+    def from_profile(cls, profile):
+        return cls(profile.get('block_resource_types'), profile.get('block_url_patterns'))
+
+    @property
+    def enabled(self):
+        return bool(self.resource_types or self.url_patterns)
+
+    def should_block(self, resource_type, url):
+        if resource_type in self.resource_types:
+            return True
+        return any(fnmatch.fnmatch(url, pattern) for pattern in self.url_patterns)
+
+    def handle(self, route):
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked += 1
+            route.abort()
+        else:
+            self.allowed += 1
+            route.continue_()
+
+    def install(self, context):
+        """Attach to a browser context. Does nothing when there is nothing to block."""
+        if self.enabled:
+            context.route('**/*', self.handle)
+        return self
+
+    async def handle_async(self, route):
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked += 1
+            await route.abort()
+        else:
+            self.allowed += 1
+            await route.continue_()
+
+    async def install_async(self, context):
+        """`install()` for a context from Playwright's async API."""
+        if self.enabled:
+            await context.route('**/*', self.handle_async)
+        return self
+
+
+class BrowserPool:
+    """
+    Keeps one warm Chromium instance and hands out fresh contexts from it.
+
+    The browser is launched lazily on first use, relaunched after
+    `max_uses` contexts or when it crashes, and closed by `shutdown()`.
+    Playwright's sync API is bound to the thread that started it, so each
+    thread gets its own pool through `get_pool()` and must close it itself
+    with `shutdown_pool()`; executors close their workers' pools with
+    `shutdown_worker_pools()` once their tasks are done.
+    """
+
+    def __init__(self, max_uses=None, headless=None, launcher=None):
+        if max_uses is None:
+            max_uses = config.config.get(('browser', 'max_context_uses'), DEFAULT_MAX_CONTEXT_USES)
+        if headless is None:
+            headless = config.config.get(('browser', 'headless'), True)
+        self.max_uses = int(max_uses)
+        self.headless = headless in (True, 1, '1', 'true', 'True')
+        # launcher: callable returning (playwright, browser); lets tests avoid a real Chromium
+        self._launcher = launcher
+        self._playwright = None
+        self._browser = None
+        self._uses = 0
+        self._needs_recycle = False
+        self._lock = threading.RLock()
+        self.launches = 0
+
+    def _launch(self):
+        if self._launcher is not None:
+            self._playwright, self._browser = self._launcher()
+        else:
+            if not PLAYWRIGHT_AVAILABLE:
+                raise RuntimeError("Playwright not available. Install with: pip install playwright")
+            from playwright.sync_api import sync_playwright
+            self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch(headless=self.headless)
+        self._uses = 0
+        self._needs_recycle = False
+        self.launches += 1
+        logger.info("Launched pooled Chromium browser (launch #%d).", self.launches)
+
+    def _close_browser(self):
+        browser, pw = self._browser, self._playwright
+        self._browser = None
+        self._playwright = None
+        try:
+            if browser is not None and browser.is_connected():
+                browser.close()
+        except Exception as e:
+            logger.debug("Ignoring error while closing pooled browser: %s", e)
+        try:
+            if pw is not None:
+                pw.stop()
+        except Exception as e:
+            logger.debug("Ignoring error while stopping Playwright: %s", e)
+
+    def _ensure_browser(self):
+        if self._browser is not None:
+            if self._needs_recycle:
+                logger.info("Recycling pooled browser after a crash.")
+            elif not self._browser.is_connected():
+                logger.warning("Pooled browser disconnected; relaunching.")
+            elif self._uses >= self.max_uses:
+                logger.info("Recycling pooled browser after %d contexts.", self._uses)
+            else:
+                return self._browser
+            self._close_browser()
+        self._launch()
+        return self._browser
+
+    @contextmanager
+    def context(self, **context_options):
+        """
+        Yield an isolated browser context from the warm browser.
+
+        The context is always closed on exit. A Playwright error raised
+        inside the block marks the browser for relaunch on next use.
+        """
+        with self._lock:
+            browser = self._ensure_browser()
+            self._uses += 1
+            ctx = browser.new_context(**context_options)
+            try:
+                yield ctx
+            except _playwright_errors()[0]:
+                self._needs_recycle = True
+                raise
+            finally:
+                try:
+                    ctx.close()
+                except Exception as e:
+                    logger.debug("Ignoring error while closing browser context: %s", e)
+                    self._needs_recycle = True
+
+    def shutdown(self):
+        """Close the browser and stop Playwright. Safe to call more than once."""
+        with self._lock:
+            if self._browser is not None or self._playwright is not None:
+                logger.info("Shutting down pooled browser.")
+            self._close_browser()
+
+
+_local = threading.local()
+_pools = []
+_pools_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the calling thread's browser pool, creating it on first use."""
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        pool = BrowserPool()
+        _local.pool = pool
+        with _pools_lock:
+            _pools.append(pool)
+    return pool
+
+
+def shutdown_pool():
+    """Shut down the calling thread's browser pool, if any."""
+    pool = getattr(_local, 'pool', None)
+    if pool is not None:
+        pool.shutdown()
+        _local.pool = None
+        with _pools_lock:
+            if pool in _pools:
+                _pools.remove(pool)
+
+
+def shutdown_worker_pools(executor, workers, timeout=60):
+    """
+    Shut down the browser pools of an executor's worker threads, each on its
+    own thread, once all work submitted to it has finished.
+
+    One teardown task per worker is submitted, and each waits at a barrier
+    until all of them have started, so no thread can take two and every
+    worker thread (at most `workers`) runs exactly one.
+    """
+    own = getattr(_local, 'pool', None)
+    with _pools_lock:
+        if not any(pool is not own for pool in _pools):
+            return
+    barrier = threading.Barrier(workers, timeout=timeout)
+
+    def teardown():
+        shutdown_pool()
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            logger.debug("Browser pool teardown did not reach every worker thread.")
+
+    for future in [executor.submit(teardown) for _ in range(workers)]:
+        future.result()
+
+
+@atexit.register
+def _shutdown_all():
+    # atexit runs on the main thread, and a sync Playwright instance can only
+    # be closed from the thread that started it: pools left behind by other
+    # threads are dropped with the process instead.
+    shutdown_pool()
+    with _pools_lock:
+        leftover = len(_pools)
+        _pools.clear()
+    if leftover:
+        logger.debug("%d browser pool(s) of other threads were not shut down by their threads.", leftover)
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+Download writer module
+Streams HTTP response bodies to disk in fixed-size chunks and commits them
+atomically, so a killed run never leaves a truncated file at the final path.
+Interrupted transfers keep their partial file and validator so they can be
+resumed with an HTTP Range request. Finished downloads get a metadata sidecar
+(validators and content hash) used for conditional GETs.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import config
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_CHUNK_SIZE = 256 * 1024 # 256 KiB per read; bounds memory use and the bytes lost on an interruption
+DEFAULT_MAX_SIZE_MB = 1024 # Refuse anything larger than this
+PART_SUFFIX = '.part'
+STATE_SUFFIX = '.json' # Sidecar next to the .part file holding the resume validator
+META_SUFFIX = '.meta.json' # Sidecar next to a finished download: validators, hash, publish state
+DEFAULT_SEGMENTS = 4 # Concurrent byte ranges for a large download
+DEFAULT_SEGMENT_MIN_MB = 32 # Smaller files are fetched as one stream
+SEGMENT_ATTEMPTS = 2 # Tries per segment before the segmented download is given up
+
+
+class DownloadError(Exception):
+    """
+    Raised when a streamed download is incomplete, oversized or cannot be written.
+    `resumable` is True when the bytes written so far are good and can be resumed.
+    """
+    def __init__(self, message, resumable=False):
+        super().__init__(message)
+        self.resumable = resumable
+
+
+def _chunk_size():
+    return int(config.config.get(('download', 'chunk_size_kb'), DEFAULT_CHUNK_SIZE // 1024)) * 1024
+
+
+def _max_size():
+    return int(config.config.get(('download', 'max_size_mb'), DEFAULT_MAX_SIZE_MB)) * 1024 * 1024
+
+
+def part_path(final_path):
+    """Path of the temporary file a download is written to before commit."""
+    return f"{final_path}{PART_SUFFIX}"
+
+
+def _state_path(temp_path):
+    return f"{temp_path}{STATE_SUFFIX}"
+
+
+class AtomicFileWriter:
+    """
+    Write a file chunk by chunk to `<final_path>.part`, hashing and counting
+    bytes as they arrive, then move it into place with `os.replace`.
+
+    Use as a context manager: unless `commit()` ran, the temp file is removed,
+    or kept for a later resume when `keep_partial` is set and the failure was
+    an interruption rather than bad content.
+
+    An optional `validator` (see validation.py) sees every byte in order via
+    `feed()` and gets a final check in `commit()` before the file is moved.
+    """
+
+    def __init__(self, final_path, expected_size=None, max_size=None, temp_path=None,
+                 resume_from=0, keep_partial=False, validator=None):
+        self.final_path = final_path
+        self.temp_path = temp_path or part_path(final_path)
+        self.expected_size = expected_size
+        self.max_size = _max_size() if max_size is None else max_size
+        self.resume_from = resume_from
+        self.keep_partial = keep_partial
+        self.validator = validator
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._file = None
+        self._committed = False
+
+    def __enter__(self):
+        directory = os.path.dirname(self.final_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.resume_from:
+            self._file = open(self.temp_path, 'r+b')
+            # Re-hash the bytes we already have, then append after them
+            remaining = self.resume_from
+            while remaining:
+                chunk = self._file.read(min(remaining, DEFAULT_CHUNK_SIZE))
+                if not chunk:
+                    raise DownloadError("Partial file is shorter than its recorded size")
+                self._hash.update(chunk)
+                if self.validator is not None:
+                    self.validator.feed(chunk)
+                remaining -= len(chunk)
+            self._file.truncate(self.resume_from)
+            self.size = self.resume_from
+        else:
+            self._file = open(self.temp_path, 'wb')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._committed:
+            bad_content = isinstance(exc, DownloadError) and not exc.resumable
+            self.abort(keep=self.keep_partial and not bad_content)
+        return False
+
+    def write(self, chunk):
+        if not chunk:
+            return
+        self.size += len(chunk)
+        if self.max_size and self.size > self.max_size:
+            raise DownloadError(f"Download exceeds the {self.max_size} byte limit")
+        if self.expected_size is not None and self.size > self.expected_size:
+            raise DownloadError(f"Received more than the {self.expected_size} bytes announced")
+        if self.validator is not None:
+            self.validator.feed(chunk)
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def commit(self):
+        """Verify the size and content, flush to disk and move the file into place. Returns the SHA-256."""
+        if self.expected_size is not None and self.size != self.expected_size:
+            raise DownloadError(f"Truncated download: got {self.size} of {self.expected_size} bytes", resumable=True)
+        self._file.flush()
+        if self.validator is not None:
+            self.validator.finish(self.temp_path)
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_path, self.final_path)
+        self._committed = True
+        _remove(_state_path(self.temp_path))
+        return self.sha256
+
+    def abort(self, keep=False):
+        """Close the temp file and delete it (with its resume state) unless `keep`."""
+        if self._file is not None and not self._file.closed:
+            self._file.flush()
+            self._file.close()
+        if keep and self.size > 0:
+            logger.info("Keeping %d bytes in %s for a resumed download.", self.size, self.temp_path)
+            return
+        discard_partial(self.temp_path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def discard_partial(temp_path):
+    """Delete a partial download and its resume state."""
+    _remove(temp_path)
+    _remove(_state_path(temp_path))
+
+
+def _strong_etag(response):
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag # If-Range needs a strong validator
+    return None
+
+
+def load_resume_state(temp_path, url):
+    """
+    Return the resume state for a partial download of `url`, or None if there
+    is nothing to resume. The state holds the validator and the byte `offset`.
+    """
+    state_file = _state_path(temp_path)
+    if not (os.path.exists(temp_path) and os.path.exists(state_file)):
+        return None
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable resume state %s: %s", state_file, e)
+        return None
+    if state.get('url') != url or not (state.get('etag') or state.get('last_modified')):
+        return None
+    state['offset'] = os.path.getsize(temp_path)
+    if state['offset'] == 0:
+        return None
+    return state
+
+
+def resume_headers(state):
+    """Range/If-Range headers to resume from `state`, or {} for a full fetch."""
+    if not state:
+        return {}
+    return {
+        'Range': f"bytes={state['offset']}-",
+        'If-Range': state.get('etag') or state['last_modified'],
+    }
+
+
+def _save_resume_state(temp_path, url, response, total):
+    state = {
+        'url': url,
+        'etag': _strong_etag(response),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_type': response.headers.get('Content-Type'),
+        'total': total,
+    }
+    if not (state['etag'] or state['last_modified']):
+        return False # Without a validator a resume could splice two different files
+    try:
+        with open(_state_path(temp_path), 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        return True
+    except OSError as e:
+        logger.warning("Could not save resume state for %s: %s", temp_path, e)
+        return False
+
+
+def parse_content_range(value):
+    """Parse 'bytes START-END/TOTAL' into (start, end, total); total is None for '*'."""
+    match = re.match(r'^\s*bytes\s+(\d+)-(\d+)/(\d+|\*)\s*$', value or '')
+    if not match:
+        return None
+    start, end, total = match.groups()
+    return int(start), int(end), (None if total == '*' else int(total))
+
+
+def expected_length(response):
+    """Content-Length as an int, or None when unknown or when the body is content-encoded."""
+    if response.headers.get('Content-Encoding', 'identity').lower() not in ('', 'identity'):
+        return None # requests decodes gzip/deflate, so the byte count won't match
+    try:
+        return int(response.headers['Content-Length'])
+    except (KeyError, ValueError):
+        return None
+
+
+def open_writer(response, status_code, final_path, max_size=None, temp_path=None, resume_state=None, url=None,
+                validator=None):
+    """
+    Set up the AtomicFileWriter for a response body: appending to the partial
+    file when the server honoured the resume range (206), otherwise starting
+    afresh and saving resume state. Only `response.headers` is read, so any
+    HTTP client's response works; its status code is passed in separately.
+
+    Raises:
+        DownloadError: if a 206 response does not continue the partial file.
+    """
+    temp_path = temp_path or part_path(final_path)
+    resume_from = 0
+    expected_size = expected_length(response)
+    if status_code == 206:
+        content_range = parse_content_range(response.headers.get('Content-Range'))
+        if not resume_state or not content_range or content_range[0] != resume_state['offset']:
+            discard_partial(temp_path)
+            raise DownloadError("Server returned an unexpected byte range", resumable=True)
+        resume_from = content_range[0]
+        expected_size = content_range[2] if content_range[2] is not None else resume_state.get('total')
+        logger.info("Resuming download at byte %d of %s.", resume_from, expected_size or 'unknown')
+        keep_partial = True
+    else:
+        if resume_state:
+            logger.info("Server ignored the range request; downloading in full.")
+        keep_partial = _save_resume_state(temp_path, url, response, expected_size)
+    return AtomicFileWriter(final_path, expected_size=expected_size, max_size=max_size, temp_path=temp_path,
+                            resume_from=resume_from, keep_partial=keep_partial, validator=validator)
+
+
+def stream_response_to_file(response, final_path, chunk_size=None, max_size=None, temp_path=None, resume_state=None, url=None,
+                            validator=None):
+    """
+    Stream a `requests` response (opened with stream=True) to `final_path`.
+
+    Only one chunk is held in memory at a time. The body goes to a temp file,
+    is checked against Content-Length, and is then moved into place.
+
+    When the server supplied a validator, an interrupted transfer leaves its
+    temp file and resume state behind. If `resume_state` is given (from
+    `load_resume_state`) and the server answered 206, the body is appended
+    to the partial file. A 200 response means the server ignored the range,
+    so the file is fetched in full. `url` is the key the resume state is
+    stored under and defaults to the response URL. A `validator` checks the
+    content as it streams (see AtomicFileWriter).
+
+    Returns:
+        tuple: (size_in_bytes, sha256_hex)
+
+    Raises:
+        DownloadError: if the body is truncated, too large, fails validation, or the transfer was interrupted.
+    """
+    chunk_size = chunk_size or _chunk_size()
+    try:
+        with open_writer(response, response.status_code, final_path, max_size=max_size, temp_path=temp_path,
+                         resume_state=resume_state, url=url or response.url, validator=validator) as writer:
+            try:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    writer.write(chunk)
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                raise DownloadError(f"Transfer interrupted after {writer.size} bytes: {e}", resumable=True) from e
+            sha256 = writer.commit()
+    finally:
+        response.close()
+    logger.info("Wrote %d bytes to %s (sha256 %s)", writer.size, final_path, sha256)
+    return writer.size, sha256
+
+
+# --- Edition metadata sidecar ---
+def meta_path(final_path):
+    """Path of the metadata sidecar for a finished download."""
+    return f"{final_path}{META_SUFFIX}"
+
+
+def load_meta(final_path):
+    """Return the metadata recorded for `final_path`, or {} if there is none."""
+    try:
+        with open(meta_path(final_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable download metadata for %s: %s", final_path, e)
+        return {}
+
+
+def save_meta(final_path, **fields):
+    """Merge `fields` into the metadata sidecar of `final_path`."""
+    meta = load_meta(final_path)
+    meta.update(fields)
+    tmp_path = f"{meta_path(final_path)}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path(final_path))
+    except OSError as e:
+        logger.warning("Could not save download metadata for %s: %s", final_path, e)
+    return meta
+
+
+def record_download(final_path, response, url, size, sha256):
+    """Store the validators and content hash of a completed download."""
+    return save_meta(
+        final_path,
+        url=url,
+        etag=response.headers.get('ETag'),
+        last_modified=response.headers.get('Last-Modified'),
+        size=size,
+        sha256=sha256,
+    )
+
+
+def conditional_headers(final_path):
+    """If-None-Match/If-Modified-Since for re-fetching `final_path`, or {} if we have no validators."""
+    if not os.path.exists(final_path):
+        return {}
+    meta = load_meta(final_path)
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    return headers
+
+
+def file_sha256(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """SHA-256 of a file on disk, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_sha256(final_path):
+    """Recorded content hash of `final_path`, computing and storing it if missing."""
+    sha256 = load_meta(final_path).get('sha256')
+    if not sha256 and os.path.exists(final_path):
+        sha256 = file_sha256(final_path)
+        save_meta(final_path, sha256=sha256, size=os.path.getsize(final_path))
+    return sha256
+
+
+def is_published(final_path):
+    """True if this exact content was already uploaded and thumbnailed."""
+    meta = load_meta(final_path)
+    return bool(meta.get('sha256')) and meta.get('published_sha256') == meta['sha256']
+
+
+def mark_published(final_path):
+    """Record that the current content of `final_path` went through upload and thumbnail."""
+    sha256 = content_sha256(final_path)
+    if sha256:
+        save_meta(final_path, published_sha256=sha256)
+
+
+# --- Segmented download ---
+def segment_count(total):
+    """
+    How many ranges to split a body of `total` bytes into: `download.segments`
+    for files of at least `download.segment_min_mb`, otherwise 1 (one stream).
+    """
+    segments = int(config.config.get(('download', 'segments'), DEFAULT_SEGMENTS))
+    min_size = float(config.config.get(('download', 'segment_min_mb'), DEFAULT_SEGMENT_MIN_MB)) * 1024 * 1024
+    if segments <= 1 or not total or total < min_size:
+        return 1
+    return segments
+
+
+def supports_segments(response):
+    """True if `response` can be fetched in byte ranges that are guaranteed to be of the same file."""
+    if response.headers.get('Accept-Ranges', '').lower() != 'bytes':
+        return False
+    # If-Range needs a validator, or the segments could come from two versions of the edition
+    return expected_length(response) is not None and bool(_strong_etag(response) or response.headers.get('Last-Modified'))
+
+
+def range_validator(response):
+    """The If-Range value for segment requests following `response`."""
+    return _strong_etag(response) or response.headers.get('Last-Modified')
+
+
+def plan_segments(total, count):
+    """Split `total` bytes into `count` contiguous (start, end) ranges, ends inclusive."""
+    count = max(1, min(count, total))
+    size, extra = divmod(total, count)
+    ranges, start = [], 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0) - 1
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+
+def _preallocate(path, total):
+    with open(path, 'wb') as f:
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(f.fileno(), 0, total)
+                return
+            except OSError:
+                pass # Not supported by this filesystem
+        f.truncate(total)
+
+
+def _write_range(response, path, start, length, chunk_size, abort):
+    """Write the first `length` bytes of `response` at offset `start` of `path`; returns the bytes written."""
+    written = 0
+    with open(path, 'r+b') as f:
+        f.seek(start)
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if abort.is_set():
+                    raise DownloadError("Aborted because another segment failed")
+                chunk = chunk[:length - written]
+                f.write(chunk)
+                written += len(chunk)
+                if written >= length:
+                    break
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+            raise DownloadError(f"Segment interrupted after {written} bytes: {e}") from e
+    if written != length:
+        raise DownloadError(f"Truncated segment: got {written} of {length} bytes")
+    return written
+
+
+def download_segmented(fetch_range, final_path, total, first_response=None, segments=DEFAULT_SEGMENTS,
+                       chunk_size=None, max_size=None, temp_path=None, validator=None):
+    """
+    Fetch a `total`-byte body as several concurrent byte ranges written
+    straight into their place in a preallocated temp file, then move that
+    file into place: no per-segment files and no concatenation.
+
+    `fetch_range(start, end)` must return a streamed response for that range
+    (conditional on the validator via If-Range). `first_response`, an already
+    open response for the whole body, serves the first segment so its request
+    isn't wasted. Every segment must come back as a 206 with the exact
+    Content-Range and length asked for; a segment that fails is retried once.
+    Segments arrive out of order, so a `validator` checks the assembled file.
+
+    Returns:
+        tuple: (size_in_bytes, sha256_hex, stats) where stats holds 'segments',
+        'seconds', 'mb_per_second', 'stream_mb_per_second' (mean per-connection
+        rate, i.e. about what one stream achieves) and 'speedup'.
+
+    Raises:
+        DownloadError: if any segment cannot be fetched; nothing is left behind.
+    """
+    chunk_size = chunk_size or _chunk_size()
+    max_size = _max_size() if max_size is None else max_size
+    if max_size and total > max_size:
+        raise DownloadError(f"Download exceeds the {max_size} byte limit")
+    temp_path = temp_path or part_path(final_path)
+    ranges = plan_segments(total, segments)
+    abort = threading.Event()
+    started = time.monotonic()
+
+    def fetch(index, start, end):
+        segment_started = time.monotonic()
+        last_error = None
+        for attempt in range(SEGMENT_ATTEMPTS):
+            if abort.is_set():
+                break
+            response = first_response if index == 0 and attempt == 0 and first_response is not None else None
+            try:
+                if response is None:
+                    response = fetch_range(start, end)
+                    content_range = parse_content_range(response.headers.get('Content-Range'))
+                    if response.status_code != 206 or content_range != (start, end, total):
+                        raise DownloadError(f"Expected bytes {start}-{end}/{total}, got status {response.status_code} "
+                                            f"with Content-Range {response.headers.get('Content-Range')!r}")
+                written = _write_range(response, temp_path, start, end - start + 1, chunk_size, abort)
+                return written, time.monotonic() - segment_started
+            except (DownloadError, requests.exceptions.RequestException) as e:
+                last_error = e
+                logger.warning("Segment %d (bytes %d-%d) failed on attempt %d: %s", index, start, end, attempt + 1, e)
+            finally:
+                if response is not None:
+                    response.close()
+        abort.set()
+        raise DownloadError(f"Segment {index} failed: {last_error}")
+
+    try:
+        _preallocate(temp_path, total)
+        with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix='segment') as pool:
+            futures = [pool.submit(fetch, i, start, end) for i, (start, end) in enumerate(ranges)]
+            results = [future.result() for future in futures]
+        with open(temp_path, 'r+b') as f:
+            os.fsync(f.fileno())
+        if validator is not None:
+            validator.check_file(temp_path, chunk_size)
+        sha256 = file_sha256(temp_path, chunk_size)
+        os.replace(temp_path, final_path)
+    except BaseException:
+        discard_partial(temp_path)
+        raise
+    finally:
+        if first_response is not None:
+            first_response.close()
+    _remove(_state_path(temp_path))
+
+    seconds = max(time.monotonic() - started, 1e-6)
+    stream_rate = sum(size / max(elapsed, 1e-6) for size, elapsed in results) / len(results)
+    stats = {
+        'segments': len(ranges),
+        'seconds': round(seconds, 3),
+        'mb_per_second': round(total / seconds / 1e6, 2),
+        'stream_mb_per_second': round(stream_rate / 1e6, 2),
+        'speedup': round((total / seconds) / stream_rate, 2) if stream_rate else None,
+    }
+    logger.info("Fetched %d bytes in %d segments in %.2fs (%.2f MB/s, %.1fx one stream).",
+                total, stats['segments'], seconds, stats['mb_per_second'], stats['speedup'] or 0)
+    return total, sha256, stats
@@ -12,8 +12,6 @@ from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
 from email.utils import formataddr
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content, Attachment, FileContent, FileName, FileType, Disposition
 import base64
 import config
 
@@ -33,13 +31,17 @@ def _is_valid_email(addr):
     return bool(re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", addr))
 
 # --- Main Email Sending Function ---
-def send_email(target_date, today_paper_url, past_papers, thumbnail_path=None, dry_run=False):
+def send_email(target_date, today_paper_url, past_papers, thumbnail_path=None, dry_run=False,
+               recipients=None, publication=None):
     """
     Send the daily newspaper email to all recipients.
+    `recipients` overrides email.recipients (a publication's own list); `publication`
+    is the title's name, available to the subject and body templates.
     """
     # Load config
     sender = config.config.get(('email', 'sender'))
-    recipients = config.config.get(('email', 'recipients'), [])
+    if recipients is None:
+        recipients = config.config.get(('email', 'recipients'), [])
     subject_template = config.config.get(('email', 'subject_template'), 'Your Daily Newspaper - {{ date }}')
     template_name = config.config.get(('email', 'template'), 'email_template.html')
     delivery_method = config.config.get(('email', 'delivery_method'), 'smtp')
@@ -56,14 +58,16 @@ def send_email(target_date, today_paper_url, past_papers, thumbnail_path=None, d
     # Render subject and body
     env = _get_jinja_env()
     template = env.get_template(template_name)
-    subject = env.from_string(subject_template).render(date=target_date.strftime('%Y-%m-%d'), recipient=recipient_name)
+    subject = env.from_string(subject_template).render(date=target_date.strftime('%Y-%m-%d'), recipient=recipient_name,
+                                                        publication=publication)
     html_body = template.render(
         date=target_date.strftime('%Y-%m-%d'),
         today_paper_url=today_paper_url,
         past_papers=past_papers,
         thumbnail_cid="thumbnail",
         recipient=recipient_name,
-        archive_summary=archive_summary
+        archive_summary=archive_summary,
+        publication=publication
     )
     # Prepare attachments
     thumbnail_data = None
@@ -123,6 +127,8 @@ def _send_via_sendgrid(sender, recipients, subject, html_body, thumbnail_data):
     if not api_key:
         logger.error("SendGrid API key not configured.")
         return False
+    from sendgrid import SendGridAPIClient # Only the SendGrid path pays for the import
+    from sendgrid.helpers.mail import Mail, Email, To, Content, Attachment, FileContent, FileName, FileType, Disposition
     message = Mail(
         from_email=Email(sender),
         to_emails=[To(r) for r in recipients],
@@ -176,4 +182,4 @@ def send_alert_email(subject, message):
         return True
     except Exception as e:
         logger.error("Failed to send alert email: %s", e)
-        return False
\ No newline at end of file
+        return False
\ No newline at end of file
@@ -6,16 +6,20 @@ Allows admin to monitor, trigger, and configure the newspaper delivery pipeline.
 import os
 import main
 import storage
+import manifest
 import email_sender
 import config
 from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify
-from datetime import datetime
+from datetime import datetime, date, timedelta
+from itertools import islice
 import threading
 import time
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'newspaper-emailer-secret')
 
+ARCHIVE_PAGE_SIZE = 100
+
 # --- Dashboard Route ---
 @app.route('/')
 def dashboard():
@@ -58,8 +62,13 @@ def manual_run():
 # --- Archive Browser Route ---
 @app.route('/archive')
 def archive():
-    files = storage.list_storage_files()
-    return render_template('archive.html', files=files)
+    # One page of keys at a time (?after=<last key shown>), optionally only the last ?days=N
+    after = request.args.get('after') or None
+    days = request.args.get('days', type=int)
+    since = date.today() - timedelta(days=days - 1) if days else None
+    files = list(islice(manifest.objects(since=since, start_after=after), ARCHIVE_PAGE_SIZE + 1))
+    next_after = files[ARCHIVE_PAGE_SIZE - 1]['key'] if len(files) > ARCHIVE_PAGE_SIZE else None
+    return render_template('archive.html', files=files[:ARCHIVE_PAGE_SIZE], days=days, next_after=next_after)
 
 @app.route('/archive/download/<filename>')
 def download_file(filename):
@@ -133,18 +142,29 @@ def test_alert():
     flash('Test alert sent.', 'info')
     return redirect(url_for('health'))
 
-@app.route('/progress')
-def progress():
+def _read_status(status_file):
     import json
-    status_file = 'pipeline_status.json'
     if os.path.exists(status_file):
         with open(status_file, 'r', encoding='utf-8') as f:
             try:
-                status = json.load(f)
+                return json.load(f)
             except Exception:
-                status = {'step': 'unknown', 'status': 'unknown', 'message': 'No progress info available.'}
-    else:
-        status = {'step': 'none', 'status': 'none', 'message': 'No process running.'}
+                return {'step': 'unknown', 'status': 'unknown', 'message': 'No progress info available.'}
+    return {'step': 'none', 'status': 'none', 'message': 'No process running.'}
+
+@app.route('/progress')
+def progress():
+    # Titles from a `publications:` list report to their own status file;
+    # ?publication=<name> picks one, otherwise they are listed alongside
+    import publications
+    try:
+        titles = publications.select(publications.load_publications(), request.args.getlist('publication'))
+    except ValueError as e:
+        return jsonify({'step': 'none', 'status': 'none', 'message': str(e)}), 404
+    if request.args.get('publication'):
+        return jsonify(_read_status(titles[0].status_path or main.STATUS_FILE))
+    status = _read_status(main.STATUS_FILE)
+    status['publications'] = {p.name: _read_status(p.status_path) for p in titles if p.status_path}
     return jsonify(status)
 
 # --- Scheduling State ---
@@ -154,6 +174,7 @@ schedule_state = {
     'end_date': None,
     'days': None,
     'time': '06:00',
+    'watch': False,  # Start at 'time' and run as soon as the edition is published
     'active': False,
     'next_run': None
 }
@@ -187,7 +208,12 @@ def schedule_runner():
         with schedule_lock:
             if not schedule_state['active']:
                 break
-        main.main(target_date_str=None, dry_run=False)
+        with schedule_lock:
+            watch = schedule_state.get('watch', False)
+        if watch:
+            main.run_when_released(target_date_str=None, dry_run=False)
+        else:
+            main.main(target_date_str=None, dry_run=False)
         with schedule_lock:
             if schedule_state['mode'] == 'x_days':
                 if schedule_state['days'] is not None:
@@ -210,6 +236,7 @@ def schedule():
         with schedule_lock:
             schedule_state['mode'] = mode
             schedule_state['time'] = run_time
+            schedule_state['watch'] = request.form.get('watch') == 'on'
             schedule_state['active'] = mode != 'manual'
             if mode == 'x_days':
                 schedule_state['days'] = int(days) if days else 1
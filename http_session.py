@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+HTTP session module
+Provides the shared keep-alive `requests` session used by the acquisition
+layer, with a tuned connection pool, connect/read retries and counters
+that show how often pooled connections are reused.
+"""
+
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import config
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_POOL_CONNECTIONS = 4 # Distinct hosts kept in the pool
+DEFAULT_POOL_MAXSIZE = 8 # Connections kept alive per host; at least the number of worker threads
+DEFAULT_MAX_RETRIES = 3 # Connect/read retries handled by the adapter
+DEFAULT_BACKOFF_FACTOR = 0.5 # urllib3 backoff: 0.5s, 1s, 2s, ...
+
+
+def _build_retry(max_retries, backoff_factor):
+    # Status retries (429/5xx) are left to the caller's rate_limit policy, which
+    # caps Retry-After, releases its host slot while waiting and feeds the breaker
+    return Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=0,
+        backoff_factor=backoff_factor,
+        allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}),
+        respect_retry_after_header=False, # Would otherwise still retry 429/503 with Retry-After
+        raise_on_status=False, # Hand the response back instead of raising
+    )
+
+
+def create_session(pool_connections=None, pool_maxsize=None, max_retries=None, backoff_factor=None, user_agent=None):
+    """
+    Build a `requests.Session` with a keep-alive connection pool and adapter-level
+    retries. Values not given come from the `http:` section of the config.
+    """
+    if pool_connections is None:
+        pool_connections = config.config.get(('http', 'pool_connections'), DEFAULT_POOL_CONNECTIONS)
+    if pool_maxsize is None:
+        pool_maxsize = config.config.get(('http', 'pool_maxsize'), DEFAULT_POOL_MAXSIZE)
+    if max_retries is None:
+        max_retries = config.config.get(('http', 'max_retries'), DEFAULT_MAX_RETRIES)
+    if backoff_factor is None:
+        backoff_factor = config.config.get(('http', 'backoff_factor'), DEFAULT_BACKOFF_FACTOR)
+    if user_agent is None:
+        user_agent = config.config.get(('newspaper', 'user_agent'))
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=int(pool_connections),
+        pool_maxsize=int(pool_maxsize),
+        max_retries=_build_retry(int(max_retries), float(backoff_factor)),
+        pool_block=False,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if user_agent:
+        session.headers['User-Agent'] = user_agent
+    session.headers['Connection'] = 'keep-alive'
+    logger.debug("Created HTTP session (pool_connections=%s, pool_maxsize=%s, max_retries=%s).",
+                 pool_connections, pool_maxsize, max_retries)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide acquisition session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def isolated_session():
+    """
+    A new session with its own cookie jar that shares the pooled adapters (and
+    so the keep-alive connections) of the shared session. Used for logins,
+    whose cookies must not leak into other requests.
+    """
+    shared = get_session()
+    session = requests.Session()
+    for prefix, adapter in shared.adapters.items():
+        session.mount(prefix, adapter)
+    session.headers.update(shared.headers)
+    return session
+
+
+def close_session():
+    """Close the shared session and its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def connection_stats(session=None):
+    """
+    Per-session connection counters, summed over the pooled hosts:
+    'requests' sent, new 'connections' opened, and 'reused' (requests that
+    went over an already-open connection).
+    """
+    session = session or _session
+    stats = {'requests': 0, 'connections': 0, 'reused': 0, 'hosts': 0}
+    if session is None:
+        return stats
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats['hosts'] += 1
+            stats['requests'] += pool.num_requests
+            stats['connections'] += pool.num_connections
+    stats['reused'] = max(0, stats['requests'] - stats['connections'])
+    return stats
+
+
+def log_connection_stats(session=None):
+    stats = connection_stats(session)
+    logger.info("HTTP connection pool: %d requests over %d connections (%d reused) to %d hosts.",
+                stats['requests'], stats['connections'], stats['reused'], stats['hosts'])
+    return stats
@@ -5,11 +5,15 @@ import json
 from datetime import date, timedelta, datetime
 import time
 
-# Import project modules
-import website
+# Import project modules (the acquisition backends, Playwright and bs4 load on first use)
+import acquisition
+import downloader
+import http_session
 import storage
+import manifest
 import email_sender
 import config
+import publications
 
 # Logging setup - BasicConfig might be called upstream in run_newspaper.py
 # Ensure logger works even if run standalone (though not intended)
@@ -34,9 +38,11 @@ THUMBNAIL_FILENAME_TEMPLATE = "{date}_thumbnail.jpg"
 STATUS_FILE = 'pipeline_status.json'
 
 # --- Enhanced Status Update ---
-def update_status(step, status, message=None, percent=None, eta=None, explainer=None):
+def update_status(step, status, message=None, percent=None, eta=None, explainer=None, publication=None):
     """
-    Enhanced status update for UI polling.
+    Enhanced status update for UI polling. Titles from a `publications:` list
+    each write their own file (`publication.status_path`), so concurrent runs
+    don't overwrite each other's progress.
     percent: int (0-100), progress percent
     eta: str, estimated time remaining (e.g. 'about 1 minute')
     explainer: str, optional friendly explanation for slow steps
@@ -51,85 +57,80 @@ def update_status(step, status, message=None, percent=None, eta=None, explainer=
         'explainer': explainer
     }
     try:
-        with open(STATUS_FILE, 'w', encoding='utf-8') as f:
+        with open(getattr(publication, 'status_path', None) or STATUS_FILE, 'w', encoding='utf-8') as f:
             json.dump(status_obj, f)
     except Exception as e:
         logger.warning(f"Could not write status file: {e}")
 
+def describe_eta(seconds):
+    """Friendly ETA for the status page, e.g. 'about 20 seconds' or 'about 2 minutes'."""
+    if seconds is None:
+        return None
+    if seconds < 60:
+        return f"about {max(5, int(round(seconds / 5.0)) * 5)} seconds"
+    minutes = int(round(seconds / 60.0))
+    return 'about 1 minute' if minutes == 1 else f"about {minutes} minutes"
+
+def _upload_progress(start_percent, end_percent, publication=None):
+    """storage.upload_to_storage progress callback that reports the transfer on the status page."""
+    def report(sent, total, bytes_per_second, eta_seconds):
+        fraction = sent / total if total else 1.0
+        update_status('upload', 'in_progress',
+                      f"Uploading your newspaper to the cloud... {sent / 1e6:.1f} of {total / 1e6:.1f} MB "
+                      f"({bytes_per_second / 1e6:.1f} MB/s)",
+                      percent=int(start_percent + (end_percent - start_percent) * fraction),
+                      eta=describe_eta(eta_seconds), publication=publication)
+    return report
+
 # --- Last 7 Days At A Glance ---
-def get_last_7_days_status():
+def get_last_7_days_status(prefix=''):
+    """Whether an edition is stored for each of the last 7 days, for the title stored under `prefix`."""
     today = date.today()
     days = [today - timedelta(days=i) for i in range(7)]
     status = []
     for d in reversed(days):
-        fname_pdf = f"{d.strftime(DATE_FORMAT)}_newspaper.pdf"
-        fname_html = f"{d.strftime(DATE_FORMAT)}_newspaper.html"
-        found = False
-        for f in storage.list_storage_files():
-            if f == fname_pdf or f == fname_html:
-                found = True
-                break
+        names = {_in_namespace(obj['key'], prefix) for obj in manifest.lookup(d, prefix).values()}
+        found = any(FILENAME_TEMPLATE.format(date=d.strftime(DATE_FORMAT), format=fmt) in names for fmt in ('pdf', 'html'))
         status.append({'date': d.strftime(DATE_FORMAT), 'status': 'ready' if found else 'missing'})
     return status
 
-def update_status(step, status, message=None):
-    """
-    Write the current pipeline step and status to a status file for UI polling.
-    step: str, e.g. 'download', 'upload', 'thumbnail', 'email', 'draft'
-    status: str, one of 'pending', 'in_progress', 'success', 'error'
-    message: str, friendly message for the user
-    """
-    status_obj = {
-        'step': step,
-        'status': status,
-        'message': message or '',
-        'timestamp': datetime.now().isoformat()
-    }
-    try:
-        with open(STATUS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(status_obj, f)
-    except Exception as e:
-        logger.warning(f"Could not write status file: {e}")
-
 # --- Helper Functions ---
 
-def get_past_papers_from_storage(target_date: date, days=None):
+def _in_namespace(key, prefix=''):
+    """The file name part of storage `key` if it belongs to the title stored under `prefix`, else None."""
+    if prefix:
+        return key[len(prefix):] if key.startswith(prefix) else None
+    return None if '/' in key else key # Other titles live under their own prefix
+
+def get_past_papers_from_storage(target_date: date, days=None, prefix=''):
     """
     Get links to newspapers from the past 'days' up to target_date from cloud storage.
+    Only keys under `prefix` (a publication's storage prefix) are considered.
     """
     if days is None:
         days = RETENTION_DAYS # Use config value if not provided
     past_papers_links = []
     logger.info("Retrieving past %d paper links from storage up to %s.", days, target_date.strftime(DATE_FORMAT))
+    # Get links for the required number of days up to the target_date
+    cutoff_date = target_date - timedelta(days=days -1) # Inclusive date range
     try:
-        # Assuming storage.list_storage_files exists despite potential linter error
-        all_files = storage.list_storage_files() # pylint: disable=no-member
-        if not all_files:
-            logger.warning("No files found in cloud storage.")
-            return []
-
-        logger.info("Found %d files in storage. Filtering for the last %d days.", len(all_files), days)
-
-        # Filter and sort files based on date in filename
+        # Only the keys dated inside the window are read from the manifest
         dated_files = []
-        for filename in all_files:
-            try:
-                # Extract date part assuming format YYYY-MM-DD at the start
-                date_str = filename.split('_')[0]
-                file_date = datetime.strptime(date_str, DATE_FORMAT).date()
-                # Only consider actual newspaper files (ignore thumbnails etc.)
-                if "newspaper" in filename and (filename.endswith(".pdf") or filename.endswith(".html")):
-                    dated_files.append((file_date, filename))
-            except (ValueError, IndexError):
-                logger.warning("Could not parse date from filename: %s. Skipping.", filename)
-                continue # Skip files that don't match the expected naming convention
+        for obj in manifest.objects(prefix=prefix, since=cutoff_date, until=target_date):
+            key = obj['key']
+            filename = _in_namespace(key, prefix)
+            if filename is None:
+                continue
+            # Only consider actual newspaper files (ignore thumbnails etc.)
+            if "newspaper" in filename and (filename.endswith(".pdf") or filename.endswith(".html")):
+                dated_files.append((storage.key_date(key, prefix), key))
+        if not dated_files:
+            logger.warning("No newspapers found in cloud storage between %s and %s.", cutoff_date, target_date)
+            return []
 
         # Sort by date descending (most recent first)
         dated_files.sort(key=lambda x: x[0], reverse=True)
 
-        # Get links for the required number of days up to the target_date
-        cutoff_date = target_date - timedelta(days=days -1) # Inclusive date range
-
         for file_date, filename in dated_files:
             if file_date >= cutoff_date and file_date <= target_date: # Ensure we don't include future dates if running for the past
                 try:
@@ -162,46 +163,29 @@ def get_past_papers_from_storage(target_date: date, days=None):
         return []
 
 
-def cleanup_old_files(target_date: date, days_to_keep=None, dry_run: bool = False):
+def cleanup_old_files(target_date: date, days_to_keep=None, dry_run: bool = False, prefix=''):
     """
     Remove files older than 'days_to_keep' relative to target_date from cloud storage.
+    Only keys under `prefix` (a publication's storage prefix) are considered.
     """
     if days_to_keep is None:
         days_to_keep = RETENTION_DAYS # Use config value if not provided
     try:
-        # Assuming storage.list_storage_files exists
-        # pylint: disable=no-member ; Pylint struggles with lazy S3 client init in storage module
-        all_files = storage.list_storage_files()
-        if not all_files:
-            logger.info("No files found in storage, skipping cleanup.")
-            return # Nothing to clean
-
-        logger.info("Checking %d files for cleanup (older than %d days relative to %s).", len(all_files), days_to_keep, target_date.strftime(DATE_FORMAT))
         cutoff_date = target_date - timedelta(days=days_to_keep) # Files strictly older than this date
+        logger.info("Checking files for cleanup (older than %d days relative to %s).", days_to_keep, target_date.strftime(DATE_FORMAT))
 
-        deleted_count = 0
-        for filename in all_files:
-            try:
-                # Extract date part assuming format YYYY-MM-DD at the start
-                date_str = filename.split('_')[0]
-                file_date = datetime.strptime(date_str, DATE_FORMAT).date()
-
-                if file_date < cutoff_date:
-                    logger.info("Attempting to delete old file: %s (Date: %s)", filename, file_date)
-                    # Pass dry_run flag to storage.delete_from_storage
-                    # Assuming storage.delete_from_storage exists
-                    # pylint: disable=no-member ; Pylint struggles with lazy S3 client init in storage module
-                    if storage.delete_from_storage(filename, dry_run=dry_run):
-                        deleted_count += 1
-                        logger.info("Successfully deleted %s%s", filename, (" (Dry Run)" if dry_run else ""))
-                    else:
-                        # delete_from_storage should log its own errors/warnings
-                        pass # Already logged in delete_from_storage
-            except (ValueError, IndexError):
-                logger.warning("Could not parse date from filename for cleanup: %s. Skipping.", filename)
-                continue # Skip files that don't match the expected naming convention
+        # Only keys dated before the cutoff; deletions are written through to the manifest
+        expired = [obj['key'] for obj in manifest.objects(prefix=prefix, until=cutoff_date - timedelta(days=1))
+                   if _in_namespace(obj['key'], prefix) is not None]
+        if not expired:
+            logger.info("No files older than %s to clean up.", cutoff_date.strftime(DATE_FORMAT))
+            return
+        logger.info("Deleting %d old files (oldest: %s).", len(expired), expired[0])
+        # Batched delete_objects calls; delete_many logs each key it could not delete
+        deleted, errors = storage.delete_many(expired, dry_run=dry_run)
 
-        logger.info("Cleanup complete. %s %d old files.", ('Simulated deleting' if dry_run else 'Deleted'), deleted_count)
+        logger.info("Cleanup complete. %s %d old files%s.", ('Simulated deleting' if dry_run else 'Deleted'), len(deleted),
+                    f" ({len(errors)} failed)" if errors else '')
 
     except storage.ClientError as ce: # Catch specific storage errors
         logger.error("Storage client error during cleanup: %s", ce)
@@ -211,56 +195,126 @@ def cleanup_old_files(target_date: date, days_to_keep=None, dry_run: bool = Fals
 
 
 # --- Main Execution Logic ---
-def main(target_date_str: str | None = None, dry_run: bool = False, force_download: bool = False):
+def find_stored_edition(date_str, formats=('pdf', 'html'), prefix=''):
+    """
+    Pre-flight check: is the edition for `date_str` already in cloud storage?
+
+    Returns:
+        dict: storage.find_object() result plus 'format' for the first stored
+        format, or None if none is stored or storage cannot be reached (the
+        caller then falls back to logging in and downloading).
+    """
+    if not config.config.get(('storage', 'preflight'), True):
+        return None
+    for fmt in formats:
+        key = prefix + FILENAME_TEMPLATE.format(date=date_str, format=fmt)
+        try:
+            found = storage.find_object(key)
+        except Exception as e:
+            logger.warning("Storage pre-flight check failed (%s); downloading as usual.", e)
+            return None
+        if found:
+            found['format'] = fmt
+            return found
+    return None
+
+def _thumbnail_from_storage(stored, thumbnail_path, dry_run=False):
+    """Create the preview for an edition that is only in storage. Returns the thumbnail path or None."""
+    local_path = storage.download_to_temp(stored['key'])
+    if not local_path:
+        return None
     try:
-        update_status('start', 'in_progress', 'Starting the daily newspaper process...', percent=0, eta='about 2-3 minutes')
+        from thumbnail import generate_thumbnail
+        if generate_thumbnail(local_path, thumbnail_path, file_format=stored['format'], dry_run=dry_run):
+            return thumbnail_path
+        return None
+    except Exception as e:
+        logger.warning('Thumbnail generation failed: %s', e)
+        return None
+    finally:
+        try:
+            os.remove(local_path)
+        except OSError:
+            pass
+
+def main(target_date_str: str | None = None, dry_run: bool = False, force_download: bool = False, publication=None):
+    """
+    Run the pipeline for one title: `publication` (see publications.py), or
+    the single site described by the `newspaper:` config block.
+    """
+    try:
+        update_status('start', 'in_progress', 'Starting the daily newspaper process...', percent=0, eta='about 2-3 minutes', publication=publication)
         # Step 1: Validate configuration
-        update_status('config', 'in_progress', 'Checking your settings...', percent=5)
-        if not config.load():
-            update_status('config', 'error', 'Configuration validation failed. Please check your settings.', percent=0)
+        update_status('config', 'in_progress', 'Checking your settings...', percent=5, publication=publication)
+        if not config.config.load():
+            update_status('config', 'error', 'Configuration validation failed. Please check your settings.', percent=0, publication=publication)
             logger.critical("Configuration validation failed. Exiting.")
             return False
-        update_status('config', 'success', 'Settings look good!', percent=10)
+        update_status('config', 'success', 'Settings look good!', percent=10, publication=publication)
+        publication = publication or publications.legacy_publication()
 
         # Step 2: Determine target date
         target_date = date.today() if not target_date_str else datetime.strptime(target_date_str, '%Y-%m-%d').date()
-        update_status('date', 'success', f"Preparing your newspaper for {target_date.strftime('%A, %B %d, %Y')}", percent=15)
+        update_status('date', 'success', f"Preparing your newspaper for {target_date.strftime('%A, %B %d, %Y')}", percent=15, publication=publication)
 
         # Step 3: Ensure download directory exists
-        download_dir = config.config.get(('paths', 'download_dir'), 'downloads')
+        download_dir = publication.download_dir(config.config.get(('paths', 'download_dir'), 'downloads'))
         os.makedirs(download_dir, exist_ok=True)
 
-        # Step 4: Download newspaper
-        update_status('download', 'in_progress', 'Downloading today\'s newspaper...', percent=20, eta='about 1 minute')
-        formats = ['pdf', 'html']
-        newspaper_path = None
-        newspaper_filename = None
-        file_format = None
-        download_success = False
-        download_start = time.time()
-        for fmt in formats:
-            candidate_filename = f"{target_date.strftime('%Y-%m-%d')}_newspaper.{fmt}"
-            candidate_path = os.path.join(download_dir, candidate_filename)
-            success, detected_format = website.login_and_download(
-                base_url=config.config.get(('newspaper', 'url')),
-                username=config.config.get(('newspaper', 'username')),
-                password=config.config.get(('newspaper', 'password')),
-                save_path=candidate_path,
-                target_date=target_date_str,
-                dry_run=dry_run,
-                force_download=force_download
-            )
-            if success:
-                newspaper_path = candidate_path
-                newspaper_filename = candidate_filename
-                file_format = fmt
-                download_success = True
-                break
-            # If download is slow, show explainer
-            if time.time() - download_start > 60:
-                update_status('download', 'in_progress', 'Still downloading... This can take a few minutes if the newspaper site is busy.', percent=25, eta='a few more minutes', explainer='No action needed. Sometimes the newspaper site is slow. We\'ll keep trying.')
+        # Step 4: Download newspaper, unless a previous run already stored it
+        date_str = target_date.strftime('%Y-%m-%d')
+        thumbnail_path = os.path.join(download_dir, THUMBNAIL_FILENAME_TEMPLATE.format(date=date_str))
+        stored = None if force_download else find_stored_edition(date_str, prefix=publication.storage_prefix)
+        if stored:
+            # No login or download: the edition only needs its email
+            logger.info("Edition %s is already in storage (%s bytes); skipping login and download.", stored['key'], stored['size'])
+            update_status('download', 'success', 'Today\'s newspaper is already in the cloud.', percent=35, publication=publication)
+            update_status('upload', 'success', 'Already uploaded.', percent=55, publication=publication)
+            if not os.path.exists(thumbnail_path):
+                thumbnail_path = _thumbnail_from_storage(stored, thumbnail_path, dry_run=dry_run)
+            update_status('thumbnail', 'success' if thumbnail_path else 'error',
+                          'Preview image is ready.' if thumbnail_path else 'Could not create a preview image. The email will not include a thumbnail.',
+                          percent=75, publication=publication)
+            return _send_edition_email(target_date, stored['key'], thumbnail_path, publication, dry_run)
+
+        update_status('download', 'in_progress', 'Downloading today\'s newspaper...', percent=20, eta='about 1 minute', publication=publication)
+        # One login, then the edition in the first available format
+        acquire = acquisition.get() # acquisition.backend: 'sync' or 'async'
+        edition = acquire(
+            base_url=publication.url,
+            username=publication.username,
+            password=publication.password,
+            save_path=os.path.join(download_dir, f"{date_str}_newspaper"),
+            target_date=date_str,
+            formats=('pdf', 'html'),
+            dry_run=dry_run,
+            force_download=force_download,
+            publication=publication
+        )
+        for attempt in edition['login'].get('attempts', []):
+            logger.info("Login attempt %s: %s in %.2fs", attempt['strategy'], 'ok' if attempt['success'] else 'failed', attempt['seconds'])
+        if edition['login'].get('strategy'):
+            logger.info("Logged in via %s strategy.", edition['login']['strategy'])
+        for probe in edition['probes']:
+            logger.info("Download probe %s: %s in %.2fs", '/'.join(probe['formats']), 'ok' if probe['success'] else probe.get('error'), probe['seconds'])
+            transfer = probe.get('transfer')
+            if transfer and transfer.get('segments', 1) > 1:
+                logger.info("Transfer: %d bytes in %d segments at %.2f MB/s (%.1fx the %.2f MB/s of one stream).",
+                            transfer['bytes'], transfer['segments'], transfer['mb_per_second'],
+                            transfer['speedup'] or 0, transfer['stream_mb_per_second'])
+            elif transfer:
+                logger.info("Transfer: %d bytes at %.2f MB/s.", transfer['bytes'], transfer['mb_per_second'])
+        package = edition.get('package')
+        if package:
+            logger.info("Packaged HTML edition: %d of %d assets inlined in %.2fs; %d bytes gzipped to %d.",
+                        package['inlined'], package['assets'], package['seconds'], package['size'], package['compressed_size'])
+        http_session.log_connection_stats()
+        download_success = edition['success']
+        file_format = edition['format']
+        newspaper_path = edition['path']
+        newspaper_filename = publication.storage_prefix + FILENAME_TEMPLATE.format(date=date_str, format=file_format) if download_success else None
         if not download_success:
-            update_status('download', 'error', 'Could not download today\'s newspaper. Please check your subscription or try again later.', percent=0)
+            update_status('download', 'error', 'Could not download today\'s newspaper. Please check your subscription or try again later.', percent=0, publication=publication)
             logger.error("Failed to download newspaper for %s. Exiting.", target_date)
             email_sender.send_alert_email(
                 subject='Newspaper Download Failed',
@@ -268,57 +322,119 @@ def main(target_date_str: str | None = None, dry_run: bool = False, force_downlo
                 dry_run=dry_run
             )
             return False
-        update_status('download', 'success', 'Downloaded today\'s newspaper!', percent=35)
-
-        # Step 5: Upload to cloud storage
-        update_status('upload', 'in_progress', 'Uploading your newspaper to the cloud...', percent=40, eta='about 30 seconds')
-        try:
-            storage.upload_to_storage(newspaper_path, newspaper_filename, dry_run=dry_run)
-            update_status('upload', 'success', 'Upload complete!', percent=55)
-        except Exception as e:
-            update_status('upload', 'error', 'Upload failed. Please check your cloud storage settings.', percent=0)
-            logger.exception('Upload failed: %s', e)
-            return False
+        update_status('download', 'success', 'Downloaded today\'s newspaper!', percent=35, publication=publication)
+
+        if not edition['changed'] and not dry_run:
+            # Same bytes as the edition we already uploaded and thumbnailed
+            logger.info("Edition content unchanged (sha256 %s); skipping upload and thumbnail.", edition['sha256'])
+            update_status('upload', 'success', 'Already uploaded; the newspaper has not changed.', percent=55, publication=publication)
+            update_status('thumbnail', 'success', 'Preview image is already up to date.', percent=75, publication=publication)
+            if not os.path.exists(thumbnail_path):
+                thumbnail_path = None
+        else:
+            # Step 5: Upload to cloud storage
+            update_status('upload', 'in_progress', 'Uploading your newspaper to the cloud...', percent=40, publication=publication)
+            try:
+                # HTML editions go up as one gzip object with every asset inlined
+                import packager
+                upload_path, extra_args = packager.upload_source(newspaper_path, file_format)
+                uploaded = storage.upload_to_storage(upload_path, newspaper_filename, dry_run=dry_run, extra_args=extra_args,
+                                                     progress=_upload_progress(40, 55, publication))
+                if not uploaded:
+                    # upload_to_storage has logged why; a failed upload used to surface as an exception
+                    raise storage.ClientError(f"could not upload {newspaper_filename}")
+                update_status('upload', 'success', 'Upload complete!', percent=55, publication=publication)
+            except Exception as e:
+                update_status('upload', 'error', 'Upload failed. Please check your cloud storage settings.', percent=0, publication=publication)
+                logger.exception('Upload failed: %s', e)
+                return False
+
+            # Step 6: Generate thumbnail
+            update_status('thumbnail', 'in_progress', 'Creating a preview image of the front page...', percent=60, eta='about 20 seconds', publication=publication)
+            try:
+                from thumbnail import generate_thumbnail
+                if not generate_thumbnail(newspaper_path, thumbnail_path, file_format=file_format, dry_run=dry_run):
+                    raise RuntimeError(f"could not create {thumbnail_path}")
+                update_status('thumbnail', 'success', 'Preview image created!', percent=75, publication=publication)
+            except Exception as e:
+                update_status('thumbnail', 'error', 'Could not create a preview image. The email will not include a thumbnail.', percent=0, publication=publication)
+                logger.warning('Thumbnail generation failed: %s', e)
+                thumbnail_path = None
+
+            # Remember what was published so an identical re-download skips both steps
+            if uploaded and thumbnail_path and not dry_run:
+                downloader.mark_published(newspaper_path)
+
+        return _send_edition_email(target_date, newspaper_filename, thumbnail_path, publication, dry_run)
+    except Exception as e:
+        update_status('done', 'error', 'Something went wrong. Please check the logs for details.', percent=0, publication=publication)
+        logger.exception('Pipeline failed: %s', e)
+        return False
 
-        # Step 6: Generate thumbnail
-        update_status('thumbnail', 'in_progress', 'Creating a preview image of the front page...', percent=60, eta='about 20 seconds')
-        try:
-            from thumbnail import generate_thumbnail
-            thumbnail_path = generate_thumbnail(newspaper_path)
-            update_status('thumbnail', 'success', 'Preview image created!', percent=75)
-        except Exception as e:
-            update_status('thumbnail', 'error', 'Could not create a preview image. The email will not include a thumbnail.', percent=0)
-            logger.warning('Thumbnail generation failed: %s', e)
-            thumbnail_path = None
+def _send_edition_email(target_date, newspaper_filename, thumbnail_path, publication, dry_run=False):
+    """Steps 7 and on: prepare the email for a stored edition and finish the run."""
+    # Step 7: Update email template and prepare draft
+    update_status('email', 'in_progress', 'Updating your email with today\'s newspaper and preview...', percent=80, eta='about 30 seconds', publication=publication)
+    try:
+        past_papers = get_past_papers_from_storage(target_date, prefix=publication.storage_prefix)
+        email_sender.send_email(
+            target_date=target_date,
+            today_paper_url=storage.get_file_url(newspaper_filename),
+            past_papers=past_papers,
+            thumbnail_path=thumbnail_path,
+            dry_run=dry_run,
+            recipients=publication.recipients,
+            publication=publication.name
+        )
+        update_status('email', 'success', 'Email is ready to send! Check your drafts in Gmail.', percent=95, publication=publication)
+    except Exception as e:
+        update_status('email', 'error', 'Could not update the email. Please check your email settings.', percent=0, publication=publication)
+        logger.exception('Email update failed: %s', e)
+        return False
 
-        # Step 7: Update email template and prepare draft
-        update_status('email', 'in_progress', 'Updating your email with today\'s newspaper and preview...', percent=80, eta='about 30 seconds')
-        try:
-            past_papers = get_past_papers_from_storage(target_date)
-            email_sender.send_email(
-                target_date=target_date,
-                today_paper_url=storage.get_file_url(newspaper_filename),
-                past_papers=past_papers,
-                thumbnail_path=thumbnail_path,
-                dry_run=dry_run
-            )
-            update_status('email', 'success', 'Email is ready to send! Check your drafts in Gmail.', percent=95)
-        except Exception as e:
-            update_status('email', 'error', 'Could not update the email. Please check your email settings.', percent=0)
-            logger.exception('Email update failed: %s', e)
-            return False
+    update_status('done', 'success', 'All done! Your newspaper is ready and your email draft is waiting.', percent=100, publication=publication)
 
-        update_status('done', 'success', 'All done! Your newspaper is ready and your email draft is waiting.', percent=100)
+    # After a successful week, prompt for automation
+    last_7 = get_last_7_days_status(prefix=publication.storage_prefix)
+    if all(day['status'] == 'ready' for day in last_7):
+        logger.info('Prompt: Would you like to automate this process to run every day? You can stop it anytime.')
+    return True
 
-        # After a successful week, prompt for automation
-        last_7 = get_last_7_days_status()
-        if all(day['status'] == 'ready' for day in last_7):
-            logger.info('Prompt: Would you like to automate this process to run every day? You can stop it anytime.')
-        return True
-    except Exception as e:
-        update_status('done', 'error', 'Something went wrong. Please check the logs for details.', percent=0)
-        logger.exception('Pipeline failed: %s', e)
+def run_when_released(target_date_str: str | None = None, dry_run: bool = False, force_download: bool = False, publication=None):
+    """
+    Release-watch mode: wait until the edition is published, then run the
+    full pipeline straight away. Start it ahead of the usual release time.
+    """
+    if not config.config.load():
+        logger.critical("Configuration validation failed. Exiting.")
+        return False
+    if dry_run:
+        logger.info("[Dry Run] Skipping the release watch.")
+        return main(target_date_str=target_date_str, dry_run=dry_run, force_download=force_download, publication=publication)
+    publication = publication or publications.legacy_publication()
+    date_str = target_date_str or date.today().strftime('%Y-%m-%d')
+    if not force_download and find_stored_edition(date_str, prefix=publication.storage_prefix):
+        # Released and stored by an earlier run; nothing to wait for
+        logger.info("Edition for %s is already in storage; skipping the release watch.", date_str)
+        return main(target_date_str=date_str, dry_run=dry_run, force_download=force_download, publication=publication)
+    update_status('watch', 'in_progress', 'Waiting for today\'s newspaper to be published...', percent=0, publication=publication)
+    import website
+    watch = website.watch_for_release(
+        base_url=publication.url,
+        username=publication.username,
+        password=publication.password,
+        target_date=target_date_str,
+        publication=publication,
+    )
+    if not watch['available']:
+        update_status('watch', 'error', 'The newspaper was not published in time.', percent=0, publication=publication)
+        logger.error("Release watch gave up after %d probes: %s", watch['polls'], watch['error'])
         return False
+    logger.info("Edition released at %s (typical %s); starting the pipeline after %.0fs of watching.",
+                watch['released_at'], watch['typical_release'], watch['waited_seconds'])
+    update_status('watch', 'success', 'The newspaper is out!', percent=0, publication=publication)
+    return main(target_date_str=target_date_str, dry_run=dry_run, force_download=force_download, publication=publication)
+
 
 # This block is mostly for testing/standalone runs, main execution is via run_newspaper.py
 if __name__ == "__main__":
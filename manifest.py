@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Storage manifest module
+Keeps a local JSON index of the objects in the storage bucket (key, size,
+ETag, LastModified), so the archive page, past-paper links, the 7-day status
+and retention are answered from disk instead of listing the bucket.
+Our own uploads and deletes update it as they happen; a full listing
+(reconcile) corrects drift from other machines or manual changes.
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from datetime import datetime, timezone
+import config
+import storage
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MANIFEST_PATH = '.storage_manifest.json'
+DEFAULT_RECONCILE_HOURS = 24 # Re-list the bucket when the manifest is older than this
+MANIFEST_VERSION = 1
+KEY_END = '\U0010ffff' # Sorts after every key under a prefix
+
+
+def is_enabled():
+    """Return True unless `manifest.enabled` is switched off."""
+    return config.config.get(('manifest', 'enabled'), True) not in (False, 0, '0', 'false', 'False')
+
+
+def _timestamp(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class Manifest:
+    """
+    The objects of one bucket, kept in key order.
+
+    Entries are dicts shaped like storage.iter_storage_objects() results,
+    except that 'last_modified' is an ISO 8601 string. The file is rewritten
+    atomically on every change and reloaded when another process changes it.
+    """
+
+    def __init__(self, path, bucket=None):
+        self.path = path
+        self.bucket = bucket
+        self.reconciled_at = None
+        self._objects = {}
+        self._keys = []
+        self._mtime = None
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable storage manifest %s: %s", self.path, e)
+            return
+        if data.get('version') != MANIFEST_VERSION or data.get('bucket') != self.bucket:
+            logger.info("Storage manifest %s is for another bucket or version; it will be rebuilt.", self.path)
+            return
+        self._objects = data.get('objects', {})
+        self._keys = sorted(self._objects)
+        self.reconciled_at = data.get('reconciled_at')
+        self._mtime = mtime
+
+    def _refresh(self):
+        """Pick up changes written by another process (e.g. the daily run while the GUI is open)."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self._objects, self._keys, self.reconciled_at = {}, [], None
+            self._load()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def save(self):
+        with self._lock:
+            data = {'version': MANIFEST_VERSION, 'bucket': self.bucket,
+                    'reconciled_at': self.reconciled_at, 'objects': self._objects}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self._mtime = os.stat(self.path).st_mtime_ns
+
+    def is_stale(self, max_age_hours=DEFAULT_RECONCILE_HOURS, now=None):
+        """True if the bucket has never been listed into this manifest, or not for `max_age_hours`."""
+        with self._lock:
+            self._refresh()
+            if self.reconciled_at is None:
+                return True
+            now = time.time() if now is None else now
+            return now - self.reconciled_at > float(max_age_hours) * 3600
+
+    def put(self, key, size=None, etag=None, last_modified=None):
+        with self._lock:
+            self._refresh()
+            if key not in self._objects:
+                bisect.insort(self._keys, key)
+            self._objects[key] = {'size': size, 'etag': etag, 'last_modified': _timestamp(last_modified)}
+            self.save()
+
+    def remove(self, *keys):
+        with self._lock:
+            self._refresh()
+            removed = {key for key in keys if self._objects.pop(key, None) is not None}
+            if removed:
+                self._keys = [key for key in self._keys if key not in removed]
+                self.save()
+
+    def replace_all(self, objects, now=None):
+        """
+        Replace the contents with `objects` (storage.iter_storage_objects()
+        results) and mark the manifest reconciled.
+
+        Returns:
+            dict: counts of keys 'added', 'removed' and 'changed' (size or ETag).
+        """
+        listed = {obj['key']: {'size': obj.get('size'), 'etag': obj.get('etag'),
+                               'last_modified': _timestamp(obj.get('last_modified'))} for obj in objects}
+        with self._lock:
+            self._refresh()
+            old = self._objects
+            drift = {
+                'added': len(listed.keys() - old.keys()),
+                'removed': len(old.keys() - listed.keys()),
+                'changed': sum(1 for key in listed.keys() & old.keys()
+                               if (listed[key]['size'], listed[key]['etag']) != (old[key]['size'], old[key]['etag'])
+                               and old[key]['etag'] is not None),
+            }
+            self._objects = listed
+            self._keys = sorted(listed)
+            self.reconciled_at = time.time() if now is None else now
+            self.save()
+        return drift
+
+    def objects(self, prefix='', since=None, until=None, start_after=None):
+        """
+        The entries under `prefix` in key order, like storage.iter_storage_objects():
+        a `since`/`until` window (dates, inclusive) keeps only keys named for
+        an edition date in it, found by bisecting the sorted keys.
+        """
+        windowed = since is not None or until is not None
+        low = prefix + since.strftime(storage.KEY_DATE_FORMAT) if since is not None else prefix
+        high = prefix + until.strftime(storage.KEY_DATE_FORMAT) + '~' if until is not None else prefix + KEY_END
+        with self._lock:
+            self._refresh()
+            start = bisect.bisect_left(self._keys, low)
+            if start_after is not None:
+                start = max(start, bisect.bisect_right(self._keys, start_after))
+            keys = self._keys[start:bisect.bisect_left(self._keys, high)]
+            entries = [dict(self._objects[key], key=key) for key in keys]
+        if windowed:
+            entries = [entry for entry in entries if storage.key_date(entry['key'], prefix) is not None]
+        return entries
+
+    def lookup(self, day, prefix=''):
+        """
+        The objects stored for edition date `day` under `prefix`, by kind: the
+        rest of the file name after the date, e.g. 'newspaper.pdf' or 'thumbnail.jpg'.
+        """
+        start = len(prefix) + len('YYYY-MM-DD_')
+        return {entry['key'][start:]: entry for entry in self.objects(prefix, since=day, until=day)}
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_manifest():
+    """The manifest for the configured bucket, loaded on first use."""
+    global _manifest
+    path = config.config.get(('manifest', 'path'), DEFAULT_MANIFEST_PATH)
+    bucket = config.config.get(('storage', 'bucket'))
+    with _manifest_lock:
+        if _manifest is None or (_manifest.path, _manifest.bucket) != (path, bucket):
+            _manifest = Manifest(path, bucket)
+        return _manifest
+
+
+def reset():
+    """Forget the loaded manifest; the next call reads it from disk again."""
+    global _manifest
+    with _manifest_lock:
+        _manifest = None
+
+
+def reconcile(force=False):
+    """
+    List the whole bucket into the manifest if it is stale (or `force`).
+
+    Returns:
+        dict: the drift counts from Manifest.replace_all, or None if the manifest was fresh.
+    Raises:
+        storage.ClientError: if the bucket cannot be listed.
+    """
+    manifest = get_manifest()
+    max_age_hours = config.config.get(('manifest', 'reconcile_hours'), DEFAULT_RECONCILE_HOURS)
+    if not force and not manifest.is_stale(max_age_hours):
+        return None
+    start = time.monotonic()
+    drift = manifest.replace_all(storage.iter_storage_objects())
+    logger.info("Reconciled storage manifest in %.1f s: %d objects, %d added, %d removed, %d changed.",
+                time.monotonic() - start, len(manifest), drift['added'], drift['removed'], drift['changed'])
+    return drift
+
+
+def _fresh_manifest():
+    """The manifest, reconciled first if due. A failed listing only matters if the bucket was never listed."""
+    manifest = get_manifest()
+    try:
+        reconcile()
+    except storage.ClientError as e:
+        if manifest.reconciled_at is None:
+            raise
+        logger.warning("Could not reconcile the storage manifest (%s); using the copy from %s.",
+                       e, datetime.fromtimestamp(manifest.reconciled_at, timezone.utc).isoformat())
+    return manifest
+
+
+def objects(prefix='', since=None, until=None, start_after=None):
+    """
+    Stored objects under `prefix`, optionally in a date window; see
+    storage.iter_storage_objects. Answered from the manifest when it is
+    enabled, else by listing the bucket.
+    """
+    if not is_enabled():
+        return storage.iter_storage_objects(prefix, since=since, until=until, start_after=start_after)
+    return _fresh_manifest().objects(prefix, since=since, until=until, start_after=start_after)
+
+
+def lookup(day, prefix=''):
+    """{kind: object} stored for edition date `day`; see Manifest.lookup."""
+    if not is_enabled():
+        start = len(prefix) + len('YYYY-MM-DD_')
+        return {obj['key'][start:]: obj for obj in storage.iter_storage_objects(prefix, since=day, until=day)}
+    return _fresh_manifest().lookup(day, prefix)
+
+
+def record_upload(key, local_path=None, etag=None):
+    """Write-through for storage.upload_to_storage. Never raises: reconcile repairs a missed update."""
+    if not is_enabled():
+        return
+    try:
+        size = os.path.getsize(local_path) if local_path else None
+        get_manifest().put(key, size=size, etag=etag, last_modified=datetime.now(timezone.utc))
+    except OSError as e:
+        logger.warning("Could not record upload of %s in the storage manifest: %s", key, e)
+
+
+def record_delete(key):
+    """Write-through for storage.delete_from_storage. Never raises: reconcile repairs a missed update."""
+    record_deletes([key])
+
+
+def record_deletes(keys):
+    """Write-through for storage.delete_many: one manifest write for the whole sweep."""
+    if not is_enabled() or not keys:
+        return
+    try:
+        get_manifest().remove(*keys)
+    except OSError as e:
+        logger.warning("Could not record deletion of %d keys in the storage manifest: %s", len(keys), e)
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+HTML packaging module
+Turns an HTML edition into a single self-contained file: images, stylesheets,
+scripts and fonts it references are fetched concurrently with the logged-in
+session and inlined as data: URIs, so the stored copy renders without further
+requests (or expired auth). A gzip copy is written next to it for upload.
+"""
+
+import os
+import re
+import gzip
+import time
+import base64
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urldefrag
+import requests
+from bs4 import BeautifulSoup
+import config
+import downloader
+import rate_limit
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_WORKERS = 8 # Concurrent asset fetches; each host is still capped by rate_limit
+DEFAULT_MAX_ASSET_MB = 10 # Larger assets are left as links
+DEFAULT_COMPRESS_LEVEL = 6
+GZIP_SUFFIX = '.gz'
+
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)', re.IGNORECASE)
+CSS_IMPORT_RE = re.compile(r'@import\s+([\'"])([^\'"]+)\1', re.IGNORECASE)
+
+# (tag, attribute) pairs whose value is a single asset URL
+URL_ATTRIBUTES = (
+    ('img', 'src'), ('source', 'src'), ('video', 'poster'), ('audio', 'src'),
+    ('input', 'src'), ('script', 'src'), ('embed', 'src'),
+)
+SRCSET_TAGS = ('img', 'source')
+LINK_RELS = {'stylesheet', 'icon', 'shortcut', 'apple-touch-icon', 'preload'}
+
+
+def _fetchable(url):
+    return url.startswith(('http://', 'https://'))
+
+
+def _resolve(ref, base):
+    """Absolute URL for `ref` relative to `base`, without a fragment, or None for data:/javascript: etc."""
+    ref = (ref or '').strip()
+    if not ref or ref.startswith(('data:', 'blob:', 'javascript:', 'about:', '#')):
+        return None
+    url = urldefrag(urljoin(base, ref))[0]
+    return url if _fetchable(url) else None
+
+
+def _srcset_urls(value):
+    return [candidate.strip().split()[0] for candidate in value.split(',') if candidate.strip()]
+
+
+def _css_urls(css):
+    return [m.group(2) for m in CSS_URL_RE.finditer(css)] + [m.group(2) for m in CSS_IMPORT_RE.finditer(css)]
+
+
+def collect_assets(soup, page_url):
+    """Absolute URLs of every asset `soup` references, in document order without duplicates."""
+    refs = []
+    for tag, attr in URL_ATTRIBUTES:
+        refs += [(el[attr], page_url) for el in soup.find_all(tag) if el.get(attr)]
+    for tag in SRCSET_TAGS:
+        for el in soup.find_all(tag, srcset=True):
+            refs += [(ref, page_url) for ref in _srcset_urls(el['srcset'])]
+    for el in soup.find_all('link', href=True):
+        if LINK_RELS & {rel.lower() for rel in el.get('rel', [])}:
+            refs.append((el['href'], page_url))
+    for el in soup.find_all('style'):
+        refs += [(ref, page_url) for ref in _css_urls(el.string or '')]
+    for el in soup.find_all(style=True):
+        refs += [(ref, page_url) for ref in _css_urls(el['style'])]
+    urls = (_resolve(ref, base) for ref, base in refs)
+    return list(dict.fromkeys(url for url in urls if url))
+
+
+def _fetch(session, url, cookies, headers, max_size):
+    """
+    GET one asset through the host's rate limit.
+
+    Returns:
+        tuple: (content_type, body) or None if it could not be fetched.
+    """
+    policy = rate_limit.for_url(url)
+    try:
+        with policy.slot():
+            response = session.get(url, cookies=cookies, headers=headers, timeout=(10, 30), stream=True)
+            policy.record(response.status_code)
+            try:
+                if response.status_code != 200:
+                    logger.debug("Asset %s: HTTP %d", url, response.status_code)
+                    return None
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    body += chunk
+                    if len(body) > max_size:
+                        logger.info("Asset %s exceeds %d bytes; leaving it as a link.", url, max_size)
+                        return None
+            finally:
+                response.close()
+    except rate_limit.CircuitOpenError as e:
+        logger.debug("Asset %s skipped: %s", url, e)
+        return None
+    except requests.exceptions.RequestException as e:
+        policy.record_error()
+        logger.debug("Asset %s failed: %s", url, e)
+        return None
+    content_type = (response.headers.get('Content-Type') or 'application/octet-stream').split(';')[0].strip()
+    return content_type, bytes(body)
+
+
+def _data_uri(content_type, body):
+    return f"data:{content_type};base64,{base64.b64encode(body).decode('ascii')}"
+
+
+def _fetch_all(urls, fetch, max_workers):
+    """Fetch `urls` concurrently; returns {url: (content_type, body)} for the ones that succeeded."""
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))), thread_name_prefix='asset') as pool:
+        results = pool.map(fetch, urls)
+        return {url: result for url, result in zip(urls, results) if result is not None}
+
+
+def _rewrite_css(css, base, uris):
+    """Point url()/@import references in `css` at their data: URIs, or absolute URLs if not fetched."""
+    def url_ref(match):
+        url = _resolve(match.group(2), base)
+        return f'url("{uris.get(url, url)}")' if url else match.group(0)
+
+    def import_ref(match):
+        url = _resolve(match.group(2), base)
+        return f'@import "{uris.get(url, url)}"' if url else match.group(0)
+
+    return CSS_IMPORT_RE.sub(import_ref, CSS_URL_RE.sub(url_ref, css))
+
+
+def package_html(html_path, page_url, cookies=None, session=None, max_workers=None, stats=None):
+    """
+    Inline the assets of the HTML file at `html_path` and write a gzip copy.
+
+    Assets referenced by the page are fetched concurrently, then those
+    referenced by fetched stylesheets (fonts, background images, @imports).
+    Anything that cannot be fetched keeps its absolute URL. The page is
+    rewritten in place as UTF-8 and `<html_path>.gz` holds the compressed
+    single file to upload.
+
+    Args:
+        html_path (str): The downloaded HTML edition.
+        page_url (str): URL the page was fetched from; relative references resolve against it.
+        cookies: requests cookie jar (or dict) of the logged-in session.
+        session (requests.Session, optional): Session to fetch with; defaults to a plain one.
+        max_workers (int, optional): Concurrent fetches; defaults to `package.max_workers`.
+        stats (dict, optional): Filled with assets, inlined, failed, bytes_inlined, seconds,
+            size and compressed_size.
+
+    Returns:
+        tuple: (True, path_of_gzip_copy) or (False, error message).
+    """
+    stats = {} if stats is None else stats
+    start = time.monotonic()
+    if max_workers is None:
+        max_workers = int(config.config.get(('package', 'max_workers'), DEFAULT_MAX_WORKERS))
+    max_size = int(float(config.config.get(('package', 'max_asset_mb'), DEFAULT_MAX_ASSET_MB)) * 1024 * 1024)
+    session = session or requests.Session()
+    headers = {'Referer': page_url}
+
+    try:
+        with open(html_path, 'rb') as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+    except OSError as e:
+        return False, f"Could not read {html_path}: {e}"
+
+    def fetch(url):
+        return _fetch(session, url, cookies, headers, max_size)
+
+    urls = collect_assets(soup, page_url)
+    assets = _fetch_all(urls, fetch, max_workers)
+    # Second round: what the fetched stylesheets reference
+    css_refs = {}
+    for url, (content_type, body) in assets.items():
+        if content_type == 'text/css':
+            css_refs[url] = body.decode('utf-8', errors='replace')
+    nested = [u for u in dict.fromkeys(_resolve(ref, url) for url, css in css_refs.items() for ref in _css_urls(css))
+              if u and u not in assets]
+    assets.update(_fetch_all(nested, fetch, max_workers))
+
+    # Stylesheets are inlined after rewriting their own references
+    uris = {url: _data_uri(ct, body) for url, (ct, body) in assets.items() if ct != 'text/css'}
+    for url, css in css_refs.items():
+        uris[url] = _data_uri('text/css', _rewrite_css(css, url, uris).encode('utf-8'))
+
+    def rewrite(ref, base=page_url):
+        url = _resolve(ref, base)
+        return uris.get(url, url) if url else ref
+
+    for tag, attr in URL_ATTRIBUTES:
+        for el in soup.find_all(tag):
+            if el.get(attr):
+                el[attr] = rewrite(el[attr])
+    for tag in SRCSET_TAGS:
+        for el in soup.find_all(tag, srcset=True):
+            el['srcset'] = ', '.join(
+                ' '.join([rewrite(parts[0])] + parts[1:])
+                for parts in (candidate.split() for candidate in el['srcset'].split(',') if candidate.strip()))
+    for el in soup.find_all('link', href=True):
+        if LINK_RELS & {rel.lower() for rel in el.get('rel', [])}:
+            el['href'] = rewrite(el['href'])
+    for el in soup.find_all('style'):
+        if el.string:
+            el.string = _rewrite_css(el.string, page_url, uris)
+    for el in soup.find_all(style=True):
+        el['style'] = _rewrite_css(el['style'], page_url, uris)
+    for el in soup.find_all('base'):
+        el.decompose() # Nothing relative is left to resolve against it
+
+    # The document is re-encoded as UTF-8; say so
+    for meta in soup.find_all('meta', charset=True):
+        meta['charset'] = 'utf-8'
+    for meta in soup.find_all('meta', attrs={'http-equiv': re.compile('^content-type$', re.IGNORECASE)}):
+        meta['content'] = 'text/html; charset=utf-8'
+    if soup.head and not soup.find('meta', charset=True):
+        soup.head.insert(0, soup.new_tag('meta', charset='utf-8'))
+
+    packaged = str(soup).encode('utf-8')
+    gzip_path = f"{html_path}{GZIP_SUFFIX}"
+    if os.path.exists(gzip_path):
+        os.remove(gzip_path) # Stale copy of an earlier download
+    level = int(config.config.get(('package', 'compress_level'), DEFAULT_COMPRESS_LEVEL))
+    try:
+        with downloader.AtomicFileWriter(html_path) as writer:
+            writer.write(packaged)
+            writer.commit()
+        with downloader.AtomicFileWriter(gzip_path) as writer:
+            # mtime=0 keeps the archive byte-identical for identical content
+            writer.write(gzip.compress(packaged, compresslevel=level, mtime=0))
+            writer.commit()
+    except (OSError, downloader.DownloadError) as e:
+        return False, f"Could not write the packaged edition: {e}"
+
+    stats.update(
+        assets=len(urls) + len(nested),
+        inlined=len(uris),
+        failed=len(urls) + len(nested) - len(assets),
+        bytes_inlined=sum(len(body) for _, body in assets.values()),
+        seconds=round(time.monotonic() - start, 3),
+        size=len(packaged),
+        compressed_size=os.path.getsize(gzip_path),
+    )
+    logger.info("Packaged %s: inlined %d of %d assets (%d bytes) in %.2fs; %d bytes, %d gzipped.",
+                html_path, stats['inlined'], stats['assets'], stats['bytes_inlined'], stats['seconds'],
+                stats['size'], stats['compressed_size'])
+    return True, gzip_path
+
+
+def packaged_path(html_path):
+    """The gzip single-file copy of `html_path` if packaging produced one, else None."""
+    path = f"{html_path}{GZIP_SUFFIX}"
+    return path if os.path.exists(path) else None
+
+
+def upload_source(path, file_format):
+    """
+    What to upload for the edition at `path`: the packaged gzip copy of an
+    HTML edition, stored gzip-encoded so browsers decode it transparently,
+    or the file itself.
+
+    Returns:
+        tuple: (local_path, boto3 ExtraArgs or None)
+    """
+    if file_format == 'html' and packaged_path(path):
+        return packaged_path(path), {'ContentType': 'text/html; charset=utf-8', 'ContentEncoding': 'gzip'}
+    return path, None
+
+
+def package_edition(html_path, page_url, cookies=None, session=None, stats=None):
+    """
+    Package a downloaded HTML edition unless this download was packaged already.
+
+    The metadata sidecar keeps the hash of the document as downloaded, so a
+    304 or an existing copy is not packaged twice and a new download is.
+    Failures are logged and leave the plain document in place.
+
+    Returns:
+        str: path of the gzip copy, or None if packaging is off or failed.
+    """
+    if not config.config.get(('package', 'enabled'), True):
+        return None
+    sha256 = downloader.content_sha256(html_path)
+    if packaged_path(html_path) and downloader.load_meta(html_path).get('packaged_from') == sha256:
+        return packaged_path(html_path)
+    success, detail = package_html(html_path, page_url, cookies=cookies, session=session, stats=stats)
+    if not success:
+        logger.warning("Could not package %s; keeping the plain document: %s", html_path, detail)
+        return None
+    downloader.save_meta(html_path, packaged_from=sha256)
+    return detail
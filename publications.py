@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Publications module
+Describes each title we deliver (site, credentials, selectors, schedule and
+recipients) and runs the pipeline for several of them concurrently on a
+bounded worker pool, each with its own HTTP session and cookie cache.
+"""
+
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import config
+import browser_pool
+import http_session
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_WORKERS = 4 # Titles processed at the same time
+DEFAULT_NAME = 'default' # The legacy single `newspaper:` block
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+DEFAULT_DOWNLOAD_PATH = 'newspaper/download/{date}'
+DEFAULT_SELECTORS = {
+    'username': 'input[name="username"]',
+    'password': 'input[name="password"]',
+    'submit': 'button[type="submit"]',
+    'login_success': '#user-profile-link',
+    'login_success_url': '',
+}
+SHARED_KEYS = ('user_agent', 'selectors', 'login_strategy', 'download_path') # Inherited from `newspaper:`
+REPORT_FILE = 'publications_report.json'
+STATUS_FILE = 'pipeline_status.json' # main.STATUS_FILE; each named title gets its own copy
+
+
+def _per_publication_path(path, name):
+    # release_history.json -> release_history_<name>.json, .session_cache -> .session_cache_<name>
+    root, ext = os.path.splitext(path)
+    return f"{root}_{name}{ext}"
+
+
+class Publication:
+    """
+    Settings for one title. Built from a `publications:` entry, or from the
+    legacy `newspaper:` block, by `load_publications()`.
+
+    Titles from a `publications:` list get their own HTTP session (cookie
+    jar), session cache file, release history, status file, download folder
+    and storage prefix so that concurrent runs never see each other's state.
+    """
+
+    def __init__(self, name, url, username=None, password=None, login_url=None, user_agent=None,
+                 selectors=None, login_strategy='auto', session_probe_url=None, download_path=None,
+                 format_urls=None, schedule=None, recipients=None, storage_prefix='', isolated=True,
+                 session_cache_path=None, release_history_path=None, status_path=None):
+        selectors = dict(DEFAULT_SELECTORS, **(selectors or {}))
+        self.name = name
+        self.url = url
+        self.login_url = login_url or url
+        self.username = username
+        self.password = password
+        self.user_agent = user_agent or DEFAULT_USER_AGENT
+        self.username_selector = selectors['username']
+        self.password_selector = selectors['password']
+        self.submit_selector = selectors['submit']
+        self.login_success_selector = selectors['login_success']
+        self.login_success_url = selectors['login_success_url']
+        self.login_strategy = login_strategy or 'auto'
+        self.session_probe_url = session_probe_url or url
+        self.download_path = download_path or DEFAULT_DOWNLOAD_PATH
+        self.format_urls = format_urls or {}
+        self.schedule = schedule # 'HH:MM' (earliest start), 'watch' (release watch) or None
+        self.recipients = recipients # None: the global email.recipients
+        self.storage_prefix = storage_prefix
+        self.isolated = isolated
+        self.session_cache_path = session_cache_path # None: session_cache's configured path
+        self.release_history_path = release_history_path # None: release_watch.history_path
+        self.status_path = status_path # None: main.STATUS_FILE
+        self._session = None
+
+    def __repr__(self):
+        return f"Publication({self.name!r}, {self.url!r})"
+
+    def http(self):
+        """This title's requests session: isolated cookies, shared keep-alive connection pools."""
+        if not self.isolated:
+            return http_session.get_session()
+        if self._session is None:
+            self._session = http_session.isolated_session()
+        return self._session
+
+    def download_dir(self, base_dir):
+        return os.path.join(base_dir, self.name) if self.storage_prefix else base_dir
+
+    @classmethod
+    def from_config(cls, entry, shared=None):
+        """Build a named title from a `publications:` entry, inheriting SHARED_KEYS from `shared`."""
+        name = entry.get('name')
+        if not name:
+            raise ValueError("Every publications entry needs a 'name'")
+        merged = {key: (shared or {}).get(key) for key in SHARED_KEYS}
+        merged['selectors'] = dict(merged.get('selectors') or {}, **(entry.get('selectors') or {}))
+        merged.update({k: v for k, v in entry.items() if k != 'selectors'})
+        if not merged.get('url'):
+            raise ValueError(f"Publication {name!r} has no 'url'")
+        session_cache_path = config.config.get(('session_cache', 'path'), '.session_cache')
+        history_path = config.config.get(('release_watch', 'history_path'), 'release_history.json')
+        return cls(
+            name=str(name),
+            url=merged['url'],
+            # Credentials may be given as ${ENV_VAR} references
+            username=os.path.expandvars(str(merged['username'])) if merged.get('username') is not None else None,
+            password=os.path.expandvars(str(merged['password'])) if merged.get('password') is not None else None,
+            login_url=merged.get('login_url'),
+            user_agent=merged.get('user_agent'),
+            selectors=merged['selectors'],
+            login_strategy=merged.get('login_strategy'),
+            session_probe_url=merged.get('session_probe_url'),
+            download_path=merged.get('download_path'),
+            format_urls=merged.get('format_urls'),
+            schedule=merged.get('schedule'),
+            recipients=merged.get('recipients'),
+            storage_prefix=merged.get('storage_prefix', f"{name}/"),
+            session_cache_path=_per_publication_path(session_cache_path, name),
+            release_history_path=_per_publication_path(history_path, name),
+            status_path=_per_publication_path(STATUS_FILE, name),
+        )
+
+
+def legacy_publication():
+    """The single title described by the `newspaper:` block, using the process-wide session and caches."""
+    get = config.config.get
+    url = get(('newspaper', 'url'))
+    return Publication(
+        name=DEFAULT_NAME,
+        url=url,
+        username=get(('newspaper', 'username')),
+        password=get(('newspaper', 'password')),
+        login_url=get(('newspaper', 'login_url'), url),
+        user_agent=get(('newspaper', 'user_agent'), DEFAULT_USER_AGENT),
+        selectors={key: get(('newspaper', 'selectors', key), default) for key, default in DEFAULT_SELECTORS.items()},
+        login_strategy=get(('newspaper', 'login_strategy'), 'auto'),
+        session_probe_url=get(('newspaper', 'session_probe_url'), url),
+        download_path=get(('newspaper', 'download_path'), DEFAULT_DOWNLOAD_PATH),
+        format_urls=get(('newspaper', 'format_urls')),
+        isolated=False,
+    )
+
+
+def load_publications():
+    """
+    Return the configured titles: one per `publications:` entry, or the
+    legacy `newspaper:` block when there is no such list.
+    """
+    entries = config.config.get(('publications',)) or []
+    if not entries:
+        return [legacy_publication()]
+    if not isinstance(entries, list):
+        raise ValueError("'publications' must be a list")
+    shared = config.config.get(('newspaper',)) or {}
+    publications = [Publication.from_config(entry, shared if isinstance(shared, dict) else {}) for entry in entries]
+    names = [p.name for p in publications]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate publication names: {', '.join(duplicates)}")
+    return publications
+
+
+def select(publications, names=None):
+    """Keep only the named titles (all of them if `names` is empty)."""
+    if not names:
+        return list(publications)
+    known = {p.name: p for p in publications}
+    unknown = [n for n in names if n not in known]
+    if unknown:
+        raise ValueError(f"Unknown publication(s): {', '.join(unknown)}")
+    return [known[n] for n in names]
+
+
+def _wait_for_schedule(publication, target_date, sleep=time.sleep, now=datetime.now):
+    """Sleep until the title's scheduled 'HH:MM' start on target_date, if that is still ahead."""
+    if not publication.schedule or publication.schedule == 'watch':
+        return 0.0
+    hours, minutes = str(publication.schedule).split(':')
+    start = datetime.combine(target_date, datetime.min.time()) + timedelta(hours=int(hours), minutes=int(minutes))
+    wait = (start - now()).total_seconds()
+    if wait > 0:
+        logger.info("[%s] Waiting until %s to start.", publication.name, start.strftime('%H:%M'))
+        sleep(wait)
+    return max(0.0, wait)
+
+
+def _run_one(publication, target_date, dry_run, force_download, honour_schedule, watch):
+    import main
+    started = time.monotonic()
+    date_str = target_date.strftime('%Y-%m-%d')
+    try:
+        if honour_schedule:
+            _wait_for_schedule(publication, target_date)
+        if watch or (honour_schedule and publication.schedule == 'watch'):
+            success = main.run_when_released(date_str, dry_run=dry_run, force_download=force_download, publication=publication)
+        else:
+            success = main.main(date_str, dry_run=dry_run, force_download=force_download, publication=publication)
+    except Exception as e:
+        logger.exception("[%s] Pipeline failed: %s", publication.name, e)
+        success = False
+    return {'name': publication.name, 'success': bool(success), 'seconds': round(time.monotonic() - started, 2)}
+
+
+def run_publications(target_date_str=None, dry_run=False, force_download=False, names=None,
+                     max_workers=None, honour_schedule=None, watch=False):
+    """
+    Run the pipeline for every selected title concurrently.
+
+    Schedules are honoured when running today's editions for real (not for a
+    past date or a dry run) unless `honour_schedule` says otherwise. `watch`
+    puts every title in release-watch mode.
+
+    Returns:
+        dict: Report with one entry per title, total 'elapsed_seconds' and the
+        'sequential_seconds' the same work would have taken one after another.
+    """
+    publications = select(load_publications(), names)
+    target_date = datetime.strptime(target_date_str, '%Y-%m-%d').date() if target_date_str else date.today()
+    if honour_schedule is None:
+        honour_schedule = target_date == date.today() and not dry_run
+    if max_workers is None:
+        max_workers = config.config.get(('engine', 'max_workers'), DEFAULT_MAX_WORKERS)
+    max_workers = max(1, min(len(publications), int(max_workers)))
+    logger.info("Running %d publication(s) with %d workers: %s", len(publications), max_workers,
+                ', '.join(p.name for p in publications))
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='publication') as pool:
+        futures = [pool.submit(_run_one, p, target_date, dry_run, force_download, honour_schedule, watch) for p in publications]
+        results = [future.result() for future in futures]
+        browser_pool.shutdown_worker_pools(pool, max_workers) # Playwright must be closed by the thread that started it
+    report = {
+        'date': target_date.strftime('%Y-%m-%d'),
+        'dry_run': dry_run,
+        'elapsed_seconds': round(time.monotonic() - started, 2),
+        'sequential_seconds': round(sum(r['seconds'] for r in results), 2),
+        'succeeded': sum(1 for r in results if r['success']),
+        'publications': results,
+    }
+    try:
+        with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    except OSError as e:
+        logger.warning("Could not write publications report: %s", e)
+    for result in results:
+        logger.info("Publication %s: %s in %.1fs", result['name'], 'ok' if result['success'] else 'FAILED', result['seconds'])
+    logger.info("All publications finished in %.1fs (%.1fs if run one after another); %d of %d succeeded.",
+                report['elapsed_seconds'], report['sequential_seconds'], report['succeeded'], len(results))
+    return report
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Rate limiting module
+Shared politeness layer for requests to publisher hosts: a token bucket and
+a concurrency cap per host, jittered exponential backoff, Retry-After
+handling (seconds or HTTP-date) that pauses the host for every caller, and a
+circuit breaker that stops hammering a host after repeated 5xx responses.
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import config
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_RATE = 1.0 # Requests per second to one host
+DEFAULT_BURST = 2 # Requests that may start back to back after an idle spell
+DEFAULT_MAX_CONCURRENT = 2 # Requests in flight to one host
+DEFAULT_FAILURE_THRESHOLD = 5 # Consecutive 5xx responses that open the circuit
+DEFAULT_RESET_TIMEOUT = 60.0 # Seconds the circuit stays open before a trial request
+DEFAULT_BACKOFF_BASE = 2.0 # Seconds; doubled per attempt, then jittered
+DEFAULT_BACKOFF_MAX = 60.0
+MAX_RETRY_AFTER = 600.0 # Never honour a Retry-After longer than this
+ASYNC_POLL_INTERVAL = 0.05 # Seconds between tries for a host slot from a coroutine
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host, retry_in):
+        super().__init__(f"Circuit open for {host}; retry in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parse a Retry-After header given either as delta-seconds ("120") or as an
+    HTTP-date ("Wed, 21 Oct 2015 07:28:00 GMT").
+
+    Returns:
+        float: Seconds to wait (never negative, capped at MAX_RETRY_AFTER), or None if absent/invalid.
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            logger.debug("Ignoring unparseable Retry-After header: %r", value)
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        now = now or datetime.now(timezone.utc)
+        seconds = (when - now).total_seconds()
+    return min(max(0.0, seconds), MAX_RETRY_AFTER)
+
+
+def backoff_delay(attempt, base=DEFAULT_BACKOFF_BASE, cap=DEFAULT_BACKOFF_MAX, rng=random):
+    """
+    Exponential backoff with "equal jitter": a random delay between half and
+    all of min(cap, base * 2**attempt), so concurrent callers don't retry in lockstep.
+    """
+    ceiling = min(float(cap), float(base) * 2 ** max(0, attempt))
+    return rng.uniform(ceiling / 2, ceiling)
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        """Take a token, returning how long the caller must wait before using it."""
+        with self._lock:
+            if self.rate <= 0:
+                return 0.0
+            self._refill()
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; after
+    `reset_timeout` seconds one trial request is let through (half-open),
+    and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT, clock=time.monotonic):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_started = None
+
+    def allow(self):
+        """Return 0 if a request may go ahead, else the seconds until the next trial."""
+        with self._lock:
+            now = self._clock()
+            if self.state == self.OPEN:
+                remaining = self._opened_at + self.reset_timeout - now
+                if remaining > 0:
+                    return remaining
+                self.state = self.HALF_OPEN
+                self._trial_started = None
+            if self.state == self.HALF_OPEN:
+                # One trial at a time; a trial that never reported back expires
+                if self._trial_started is not None and now - self._trial_started < self.reset_timeout:
+                    return self._trial_started + self.reset_timeout - now
+                self._trial_started = now
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit closed again after a successful request.")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_started = None
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Opening circuit after %d consecutive server errors.", self.failures)
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+
+
+class HostPolicy:
+    """
+    Everything that limits requests to one host. Use `acquire()`/`release()`
+    around each request (or the `slot()` context manager) and report the
+    outcome with `record(status_code)`.
+    """
+
+    def __init__(self, host, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_concurrent=DEFAULT_MAX_CONCURRENT,
+                 failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst, clock=clock)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, clock=clock)
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self._semaphore = threading.BoundedSemaphore(max(1, int(max_concurrent)))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+    def acquire(self):
+        """
+        Block until a request to this host may start. Raises CircuitOpenError
+        (without waiting) while the circuit is open.
+        """
+        retry_in = self.breaker.allow()
+        if retry_in > 0:
+            raise CircuitOpenError(self.host, retry_in)
+        self._semaphore.acquire()
+        try:
+            self.wait_turn()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def try_acquire(self):
+        """
+        Take a concurrency slot only if one is free right now, without pacing.
+        Returns False when none is (or the circuit is open). The holder must
+        call `wait_turn()` before each request it sends on the slot.
+        """
+        if self.breaker.allow() > 0:
+            return False
+        return self._semaphore.acquire(blocking=False)
+
+    def wait_turn(self):
+        """Wait out any Retry-After pause and the token bucket before one request."""
+        with self._lock:
+            pause = self._paused_until - self._clock()
+        wait = max(pause, self.bucket.reserve())
+        if wait > 0:
+            logger.debug("Rate limit: waiting %.2fs before requesting %s.", wait, self.host)
+            self._sleep(wait)
+
+    def release(self):
+        self._semaphore.release()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield self
+        finally:
+            self.release()
+
+    async def acquire_async(self):
+        """
+        Coroutine version of `acquire()` that waits without blocking the event
+        loop. It shares the same concurrency cap, pacing and circuit breaker as
+        threaded callers, and can be cancelled while waiting.
+        """
+        retry_in = self.breaker.allow()
+        if retry_in > 0:
+            raise CircuitOpenError(self.host, retry_in)
+        while not self._semaphore.acquire(blocking=False):
+            await asyncio.sleep(ASYNC_POLL_INTERVAL)
+        try:
+            with self._lock:
+                pause = self._paused_until - self._clock()
+            wait = max(pause, self.bucket.reserve())
+            if wait > 0:
+                logger.debug("Rate limit: waiting %.2fs before requesting %s.", wait, self.host)
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    @asynccontextmanager
+    async def slot_async(self):
+        await self.acquire_async()
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def pause(self, seconds):
+        """Hold back every caller's next request to this host for `seconds` (e.g. after a Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def record(self, status_code):
+        """Feed a response status to the circuit breaker; 429 is throttling, not failure."""
+        if status_code >= 500:
+            self.breaker.record_failure()
+        elif status_code != 429:
+            self.breaker.record_success()
+
+    def record_error(self):
+        """Count a timeout or connection failure against the circuit breaker."""
+        self.breaker.record_failure()
+
+    def backoff(self, attempt):
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max)
+
+    def retry_delay(self, response, attempt):
+        """
+        Delay before retrying after `response`: its Retry-After if present, else
+        jittered backoff. A Retry-After also pauses the host for other callers.
+        """
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after is None:
+            return self.backoff(attempt)
+        self.pause(retry_after)
+        return retry_after
+
+
+_policies = {}
+_policies_lock = threading.Lock()
+
+
+def _setting(host, name, default):
+    # A host entry under rate_limit.hosts overrides the top-level value
+    hosts = config.config.get(('rate_limit', 'hosts'), {}) or {}
+    host_settings = hosts.get(host) or {}
+    if name in host_settings:
+        return host_settings[name]
+    return config.config.get(('rate_limit', name), default)
+
+
+def for_url(url):
+    """Return the shared HostPolicy for the host serving `url`, creating it from config on first use."""
+    host = (urlparse(url).hostname or '').lower()
+    with _policies_lock:
+        policy = _policies.get(host)
+        if policy is None:
+            policy = HostPolicy(
+                host,
+                rate=_setting(host, 'requests_per_second', DEFAULT_RATE),
+                burst=_setting(host, 'burst', DEFAULT_BURST),
+                max_concurrent=_setting(host, 'max_concurrent', DEFAULT_MAX_CONCURRENT),
+                failure_threshold=_setting(host, 'failure_threshold', DEFAULT_FAILURE_THRESHOLD),
+                reset_timeout=_setting(host, 'reset_timeout_seconds', DEFAULT_RESET_TIMEOUT),
+                backoff_base=_setting(host, 'backoff_base_seconds', DEFAULT_BACKOFF_BASE),
+                backoff_max=_setting(host, 'backoff_max_seconds', DEFAULT_BACKOFF_MAX),
+            )
+            _policies[host] = policy
+        return policy
+
+
+def reset():
+    """Forget all host state (used by tests and after configuration changes)."""
+    with _policies_lock:
+        _policies.clear()
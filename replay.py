@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+HTTP record/replay module
+Records the HTTP exchanges of a real acquisition run into a cassette file,
+with credentials and cookie values scrubbed, and replays them from a local
+server with configurable latency, bandwidth and error injection. Downloads,
+retries and login strategies can then be measured offline and repeatably.
+
+Only traffic sent through `requests` is recorded. The Playwright login
+strategy drives a real browser: it can be pointed at the replay server, but
+its own requests are not captured.
+
+Usage:
+    python run_newspaper.py --record-http cassette.json
+    python replay.py serve cassette.json --latency 0.05 --bandwidth-mb 8 --error-rate 0.1
+"""
+
+import os
+import re
+import copy
+import json
+import time
+import base64
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, quote, quote_plus
+from requests.adapters import HTTPAdapter
+import config
+
+logger = logging.getLogger(__name__)
+
+# Constants
+CASSETTE_VERSION = 1
+SCRUBBED = '<scrubbed>'
+SENSITIVE_REQUEST_HEADERS = {'authorization', 'proxy-authorization'}
+# Re-created by the replay server (the recorded body is already decoded)
+HOP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'}
+MAX_REQUEST_BODY = 64 * 1024 # Recorded request bodies are for reference only
+WRITE_CHUNK = 16 * 1024 # Bandwidth is enforced per chunk written
+TEXT_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'application/xhtml')
+RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _path(url):
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else '') or '/'
+
+
+def _header_items(response):
+    """Response headers as (name, value) pairs, keeping repeated Set-Cookie headers apart."""
+    raw = getattr(response, 'raw', None)
+    headers = getattr(raw, 'headers', None)
+    if headers is not None and hasattr(headers, 'items'):
+        return list(headers.items())
+    return list(response.headers.items())
+
+
+def _configured_secrets():
+    """Credentials of every configured title; scrubbed wherever they appear."""
+    import publications
+    secrets = []
+    try:
+        for pub in publications.load_publications():
+            secrets += [pub.username, pub.password]
+    except ValueError as e:
+        logger.warning("Could not read publications for scrubbing (%s); using the newspaper block only.", e)
+        secrets += [config.config.get(('newspaper', 'username')), config.config.get(('newspaper', 'password'))]
+    return secrets
+
+
+class Recorder:
+    """
+    Collects scrubbed request/response pairs. Credentials are replaced
+    wherever they appear (URLs, bodies, headers), cookie values become
+    stable placeholders so recorded requests still match their Set-Cookie,
+    and Authorization headers are dropped.
+    """
+
+    def __init__(self, secrets=()):
+        self.interactions = []
+        self.secrets = sorted({str(s) for s in secrets if s}, key=len, reverse=True)
+        self._cookie_values = {}
+        self._lock = threading.Lock()
+
+    def _scrub_text(self, text):
+        for secret in self.secrets:
+            for form in {secret, quote(secret, safe=''), quote_plus(secret)}:
+                text = text.replace(form, SCRUBBED)
+        return text
+
+    def _scrub_bytes(self, body):
+        for secret in self.secrets:
+            for form in {secret, quote(secret, safe=''), quote_plus(secret)}:
+                body = body.replace(form.encode('utf-8'), SCRUBBED.encode('utf-8'))
+        return body
+
+    def _cookie_value(self, name, value):
+        with self._lock:
+            return self._cookie_values.setdefault((name, value), f"scrubbed{len(self._cookie_values) + 1}")
+
+    def _scrub_cookie_header(self, value):
+        # Cookie: a=1; b=2
+        pairs = []
+        for pair in value.split(';'):
+            name, sep, cookie_value = pair.strip().partition('=')
+            pairs.append(f"{name}={self._cookie_value(name, cookie_value)}" if sep else pair.strip())
+        return '; '.join(pairs)
+
+    def _scrub_set_cookie(self, value):
+        # Set-Cookie: a=1; Path=/; HttpOnly (only the value is replaced)
+        first, sep, attributes = value.partition(';')
+        name, eq, cookie_value = first.strip().partition('=')
+        if not eq:
+            return value
+        return f"{name}={self._cookie_value(name, cookie_value)}{sep}{attributes}"
+
+    def record(self, request, response):
+        """Add one exchange; `response.content` must already be read."""
+        request_headers = []
+        for name, value in request.headers.items():
+            if name.lower() in SENSITIVE_REQUEST_HEADERS:
+                continue
+            if name.lower() == 'cookie':
+                value = self._scrub_cookie_header(value)
+            request_headers.append([name, self._scrub_text(value)])
+        body = request.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        response_headers = []
+        for name, value in _header_items(response):
+            if name.lower() in HOP_HEADERS:
+                continue
+            if name.lower() == 'set-cookie':
+                value = self._scrub_set_cookie(value)
+            response_headers.append([name, self._scrub_text(value)])
+        content = response.content or b''
+        content_type = response.headers.get('Content-Type', '')
+        if content_type.startswith(TEXT_TYPES):
+            content = self._scrub_bytes(content)
+        interaction = {
+            'request': {
+                'method': request.method,
+                'url': self._scrub_text(request.url),
+                'headers': request_headers,
+                'body': self._scrub_bytes(body[:MAX_REQUEST_BODY]).decode('utf-8', errors='replace'),
+            },
+            'response': {
+                'status': response.status_code,
+                'headers': response_headers,
+                'body': base64.b64encode(content).decode('ascii'),
+            },
+            'elapsed_ms': round(response.elapsed.total_seconds() * 1000, 1),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def save(self, path):
+        cassette = {
+            'version': CASSETTE_VERSION,
+            'recorded_at': datetime.now(timezone.utc).isoformat(),
+            'interactions': self.interactions,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(cassette, f, indent=1)
+        logger.info("Recorded %d HTTP exchanges to %s", len(self.interactions), path)
+
+
+@contextmanager
+def recording(path, secrets=None):
+    """
+    Record every `requests` exchange made inside the block to the cassette
+    at `path`. `secrets` defaults to the configured usernames and passwords,
+    so the configuration must be loaded first. Bodies are buffered so they
+    can be recorded; callers still stream them.
+
+    Raises:
+        ValueError: If there are no secrets to scrub; the cassette would hold
+            the login credentials in plain text.
+    """
+    recorder = Recorder(_configured_secrets() if secrets is None else secrets)
+    if not recorder.secrets:
+        raise ValueError("No credentials found to scrub; refusing to record (is the configuration loaded?)")
+    original_send = HTTPAdapter.send
+
+    def send(adapter, request, **kwargs):
+        response = original_send(adapter, request, **kwargs)
+        try:
+            response.content # Buffer the body; iter_content then replays it from memory
+            recorder.record(request, response)
+        except Exception as e:
+            logger.warning("Could not record %s %s: %s", request.method, request.url, e)
+        return response
+
+    HTTPAdapter.send = send
+    try:
+        yield recorder
+    finally:
+        HTTPAdapter.send = original_send
+        recorder.save(path)
+
+
+def load(path):
+    """Read a cassette written by `recording()`."""
+    with open(path, 'r', encoding='utf-8') as f:
+        cassette = json.load(f)
+    if cassette.get('version') != CASSETTE_VERSION:
+        raise ValueError(f"Unsupported cassette version {cassette.get('version')!r} in {path}")
+    return cassette
+
+
+class ReplayServer:
+    """
+    Serve a cassette on a local port. Requests are matched on method and
+    path+query (any host); repeated requests get the recorded responses in
+    order, then the last one again. Recorded origins in Location headers and
+    text bodies are rewritten to the server's own URL, and byte ranges of
+    recorded 200 responses are served as 206 for resumed/segmented downloads.
+
+    Args:
+        cassette (dict): As returned by `load()`.
+        latency (float): Seconds to wait before every response.
+        bandwidth (float): Bytes per second per connection, or None for unthrottled.
+        error_rate (float): Chance (0-1) of answering 503 + Retry-After: 0 instead.
+        errors (dict): {path: [status, ...]} served, once each, before the recorded response.
+        seed (int): Seed for the error injection, so runs are repeatable.
+    """
+
+    def __init__(self, cassette, latency=0.0, bandwidth=None, error_rate=0.0, errors=None, seed=0,
+                 host='127.0.0.1', port=0):
+        self.cassette = cassette
+        self.latency = float(latency)
+        self.bandwidth = float(bandwidth) if bandwidth else None
+        self.error_rate = float(error_rate)
+        self.errors = {path: list(statuses) for path, statuses in (errors or {}).items()}
+        self.stats = {'requests': 0, 'injected_errors': 0, 'unmatched': 0, 'bytes_sent': 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._served = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self.url = f"http://{host}:{self._server.server_port}/"
+        self._responses = self._index(cassette)
+        self._thread = None
+
+    def _index(self, cassette):
+        origins = {_origin(i['request']['url']) for i in cassette['interactions']}
+        own = self.url.rstrip('/')
+        responses = {}
+        for interaction in cassette['interactions']:
+            response = copy.deepcopy(interaction['response'])
+            body = base64.b64decode(response['body'])
+            headers = []
+            for name, value in response['headers']:
+                if name.lower() == 'location':
+                    for origin in origins:
+                        value = value.replace(origin, own)
+                headers.append((name, value))
+            content_type = next((v for n, v in headers if n.lower() == 'content-type'), '')
+            if content_type.startswith(TEXT_TYPES):
+                for origin in origins:
+                    body = body.replace(origin.encode('utf-8'), own.encode('utf-8'))
+            key = (interaction['request']['method'], _path(interaction['request']['url']))
+            responses.setdefault(key, []).append((response['status'], headers, body))
+        return responses
+
+    def _next_response(self, method, path):
+        with self._lock:
+            self.stats['requests'] += 1
+            queued = self.errors.get(path)
+            if queued:
+                self.stats['injected_errors'] += 1
+                return queued.pop(0), [('Retry-After', '0')], b''
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.stats['injected_errors'] += 1
+                return 503, [('Retry-After', '0')], b''
+            recorded = self._responses.get((method, path)) or (
+                self._responses.get(('GET', path)) if method == 'HEAD' else None)
+            if not recorded:
+                self.stats['unmatched'] += 1
+                logger.warning("Replay: no recorded response for %s %s", method, path)
+                return 404, [], b''
+            index = self._served.get((method, path), 0)
+            self._served[(method, path)] = index + 1
+            return recorded[min(index, len(recorded) - 1)]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                status, headers, body = server._next_response(method, self.path)
+                headers, body, status = server._apply_range(self.headers, status, list(headers), body)
+                if server.latency:
+                    time.sleep(server.latency)
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if method != 'HEAD':
+                    server._write(self.wfile, body)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def do_HEAD(self):
+                self._handle('HEAD')
+
+        return Handler
+
+    def _apply_range(self, request_headers, status, headers, body):
+        spec = RANGE_RE.match(request_headers.get('Range') or '')
+        if status != 200 or not spec or not body:
+            return headers, body, status
+        etag = next((v for n, v in headers if n.lower() == 'etag'), None)
+        if_range = request_headers.get('If-Range')
+        if if_range and if_range != etag:
+            return headers, body, status
+        start, end = spec.group(1), spec.group(2)
+        if start:
+            start, end = int(start), min(int(end) if end else len(body) - 1, len(body) - 1)
+        else:
+            start, end = max(0, len(body) - int(end)), len(body) - 1
+        if start > end:
+            return headers, body, status
+        headers = [h for h in headers if h[0].lower() != 'content-range']
+        headers.append(('Content-Range', f"bytes {start}-{end}/{len(body)}"))
+        return headers, body[start:end + 1], 206
+
+    def _write(self, wfile, body):
+        try:
+            for offset in range(0, len(body), WRITE_CHUNK):
+                chunk = body[offset:offset + WRITE_CHUNK]
+                wfile.write(chunk)
+                with self._lock:
+                    self.stats['bytes_sent'] += len(chunk)
+                if self.bandwidth:
+                    time.sleep(len(chunk) / self.bandwidth)
+        except (BrokenPipeError, ConnectionResetError):
+            pass # The client stopped reading (e.g. the first segment of a segmented download)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        logger.info("Replaying %d exchanges at %s", len(self.cassette['interactions']), self.url)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def rebase(publication, server_url, cassette):
+    """
+    A copy of `publication` whose URLs point at the replay server instead of
+    the recorded origins, with its own (empty) session cache.
+    """
+    origins = {_origin(i['request']['url']) for i in cassette['interactions']}
+    own = server_url.rstrip('/')
+
+    def swap(url):
+        for origin in origins:
+            if url and url.startswith(origin):
+                return own + url[len(origin):]
+        return url
+
+    rebased = copy.copy(publication)
+    rebased.url = swap(publication.url)
+    rebased.login_url = swap(publication.login_url)
+    rebased.session_probe_url = swap(publication.session_probe_url)
+    rebased.format_urls = {fmt: swap(url) for fmt, url in publication.format_urls.items()}
+    rebased.isolated = True
+    rebased._session = None
+    rebased.session_cache_path = os.path.join(tempfile.mkdtemp(prefix='replay-'), '.session_cache')
+    return rebased
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded acquisition cassette from a local server.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help='Serve a cassette until interrupted.')
+    serve.add_argument('cassette')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0, help='Seconds before every response.')
+    serve.add_argument('--bandwidth-mb', type=float, default=None, help='Per-connection cap in MB/s.')
+    serve.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 503.')
+    serve.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(module)s - %(message)s')
+    server = ReplayServer(load(args.cassette), latency=args.latency, error_rate=args.error_rate, seed=args.seed,
+                          bandwidth=args.bandwidth_mb * 1e6 if args.bandwidth_mb else None, port=args.port)
+    with server:
+        print(f"Replaying {args.cassette} at {server.url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    print(json.dumps(server.stats))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
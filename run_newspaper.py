@@ -8,12 +8,12 @@ and orchestrates the download, storage, and email process.
 import argparse
 import logging
 import sys
+from contextlib import ExitStack
 from datetime import date
 import config
-import main
 import os
-import storage
-import email_sender
+# main, storage and email_sender (boto3, sendgrid, the acquisition stack) are
+# imported where they are needed, so --health and --onboarding start fast
 
 
 def setup_logging(log_path='newspaper_emailer.log'):
@@ -30,10 +30,19 @@ def setup_logging(log_path='newspaper_emailer.log'):
 def parse_args():
     parser = argparse.ArgumentParser(description='Run the newspaper emailer pipeline.')
     parser.add_argument('--date', type=str, help='Target date (YYYY-MM-DD) for the newspaper. Defaults to today.')
+    parser.add_argument('--from', dest='from_date', type=str, help='Backfill: first date (YYYY-MM-DD) of a range of editions to recover.')
+    parser.add_argument('--to', dest='to_date', type=str, help='Backfill: last date (YYYY-MM-DD) of the range. Defaults to today.')
+    parser.add_argument('--publication', action='append', dest='publications', metavar='NAME',
+                        help='Only run this title from the publications list (repeatable). Defaults to all of them.')
+    parser.add_argument('--watch', action='store_true', help='Wait for the edition to be published, then run the pipeline immediately.')
     parser.add_argument('--dry-run', action='store_true', help='Simulate the run without downloading, uploading, or emailing.')
     parser.add_argument('--force-download', action='store_true', help='Force re-download even if file exists.')
     parser.add_argument('--health', action='store_true', help='Run a health check for config, storage, and email.')
+    parser.add_argument('--reconcile-manifest', action='store_true',
+                        help='Re-list the storage bucket into the local manifest now (run from cron to correct drift).')
     parser.add_argument('--onboarding', action='store_true', help='Run interactive onboarding/setup wizard.')
+    parser.add_argument('--record-http', metavar='CASSETTE',
+                        help='Record this run\'s HTTP exchanges (credentials scrubbed) to CASSETTE for offline replay; see replay.py.')
     return parser.parse_args()
 
 
@@ -53,6 +62,8 @@ def health_check():
         print_colored("Config: FAILED to load config.yaml", 'red')
         return False
     print_colored("Config: OK", 'green')
+    import storage
+    import email_sender
     # Storage check
     try:
         files = storage.list_storage_files()
@@ -99,6 +110,68 @@ def onboarding():
     print_colored("Onboarding complete! Run with --health to check your setup.\n", 'green')
 
 
+def run_backfill(args):
+    import backfill
+    try:
+        start_date = backfill.parse_date(args.from_date)
+        end_date = backfill.parse_date(args.to_date) if args.to_date else date.today()
+        backfill.date_range(start_date, end_date)
+    except ValueError as e:
+        print_colored(f'Invalid backfill range: {e}', 'red')
+        sys.exit(2)
+    if args.dry_run:
+        print_colored('[DRY RUN] No files will be downloaded, uploaded, or emailed.', 'yellow')
+    print_colored(f'[BACKFILL] Recovering editions from {start_date} to {end_date}...', 'blue')
+    try:
+        report = backfill.run_backfill(start_date, end_date, dry_run=args.dry_run, force_download=args.force_download,
+                                       names=args.publications)
+    except ValueError as e:
+        print_colored(f'Invalid publications setup: {e}', 'red')
+        sys.exit(2)
+    several = len(report['publications']) > 1
+    for entry in report['editions']:
+        ok = entry.get('download') == 'ok' and 'failed' not in (entry.get('upload'), entry.get('thumbnail'))
+        detail = entry.get('error') or f"{entry.get('format')}, upload {entry.get('upload', '-')}, thumbnail {entry.get('thumbnail', '-')}"
+        label = f"{entry['publication']} {entry['date']}" if several else entry['date']
+        print_colored(f"  {label}: {'OK' if ok else 'FAILED'} ({detail})", 'green' if ok else 'red')
+    print_colored(f"Backfill finished in {report['elapsed_seconds']}s: {report['downloaded']} downloaded, {report['failed']} with problems. Report: {backfill.REPORT_FILE}",
+                  'green' if report['failed'] == 0 else 'red')
+    if report['failed']:
+        sys.exit(1)
+
+
+def run_publications(args, target_date_str):
+    import publications
+    try:
+        report = publications.run_publications(target_date_str, dry_run=args.dry_run, force_download=args.force_download,
+                                               names=args.publications, watch=args.watch)
+    except ValueError as e:
+        print_colored(f'Invalid publications setup: {e}', 'red')
+        sys.exit(2)
+    for entry in report['publications']:
+        print_colored(f"  {entry['name']}: {'OK' if entry['success'] else 'FAILED'} ({entry['seconds']}s)",
+                      'green' if entry['success'] else 'red')
+    print_colored(f"{report['succeeded']} of {len(report['publications'])} publications done in {report['elapsed_seconds']}s "
+                  f"({report['sequential_seconds']}s of work). Report: {publications.REPORT_FILE}",
+                  'green' if report['succeeded'] == len(report['publications']) else 'red')
+    return report['succeeded'] == len(report['publications'])
+
+
+def reconcile_manifest():
+    if not config.config.load():
+        print_colored('Failed to load configuration. Exiting.', 'red')
+        sys.exit(1)
+    import manifest
+    import storage
+    try:
+        drift = manifest.reconcile(force=True)
+    except storage.ClientError as e:
+        print_colored(f"Manifest reconcile FAILED ({e})", 'red')
+        sys.exit(1)
+    print_colored(f"Manifest reconciled: {len(manifest.get_manifest())} objects "
+                  f"({drift['added']} added, {drift['removed']} removed, {drift['changed']} changed)", 'green')
+
+
 def main_entry():
     args = parse_args()
     setup_logging()
@@ -108,12 +181,36 @@ def main_entry():
     if args.onboarding:
         onboarding()
         return
+    if args.reconcile_manifest:
+        reconcile_manifest()
+        return
+    if args.record_http:
+        import replay
+        # The credentials to scrub are read from the configuration
+        if not config.config.load():
+            print_colored('Failed to load configuration. Exiting.', 'red')
+            sys.exit(1)
+        with ExitStack() as stack:
+            try:
+                stack.enter_context(replay.recording(args.record_http))
+            except ValueError as e:
+                print_colored(f'Cannot record HTTP: {e}', 'red')
+                sys.exit(2)
+            run(args)
+        return
+    run(args)
+
+
+def run(args):
     logging.info('Starting newspaper emailer run...')
     # Load config
     if not config.config.load():
         print_colored('Failed to load configuration. Exiting.', 'red')
         logging.critical('Failed to load configuration. Exiting.')
         sys.exit(1)
+    if args.from_date:
+        run_backfill(args)
+        return
     # Determine date
     target_date_str = args.date if args.date else date.today().strftime('%Y-%m-%d')
     logging.info(f"Target date for newspaper: {target_date_str}")
@@ -130,8 +227,19 @@ def main_entry():
     # (Distribution is handled in main.main)
     logging.info('Step 3: Archive Management')
     # (Archive management is handled in main.main)
+    # Several titles from the publications list run side by side
+    if args.publications or config.config.get(('publications',)):
+        if not run_publications(args, target_date_str):
+            logging.error('Newspaper emailer run failed for some publications.')
+            sys.exit(1)
+        logging.info('Newspaper emailer run completed successfully.')
+        return
     # Call main pipeline
-    success = main.main(
+    import main
+    pipeline = main.run_when_released if args.watch else main.main
+    if args.watch:
+        print_colored('[WATCH] Waiting for the edition to be published...', 'blue')
+    success = pipeline(
         target_date_str=target_date_str,
         dry_run=args.dry_run,
         force_download=args.force_download
@@ -145,4 +253,4 @@ def main_entry():
 
 
 if __name__ == '__main__':
-    main_entry()
\ No newline at end of file
+    main_entry()
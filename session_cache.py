@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Session cache module
+Keeps the publisher session cookies in an encrypted file on disk, with their
+expiry, so a still-valid login can be reused instead of launching a browser.
+The key is stretched with scrypt and a random salt stored in the file, so a
+copied cache cannot be used to test password guesses cheaply.
+"""
+
+import os
+import json
+import time
+import base64
+import logging
+import config
+
+# Optional dependency handling for cryptography
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
+    class InvalidToken(Exception):
+        pass
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_CACHE_PATH = '.session_cache'
+DEFAULT_MAX_AGE_HOURS = 12 # Upper bound even when cookies claim to live longer
+FILE_MAGIC = b'NSC2' # Cache file: magic, salt, Fernet token
+SALT_BYTES = 16
+SCRYPT_N = 2 ** 15 # scrypt cost: ~32 MiB and tens of milliseconds per derivation
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+
+def _cache_path(path=None):
+    return path or config.config.get(('session_cache', 'path'), DEFAULT_CACHE_PATH)
+
+
+def is_enabled():
+    """Return True if session caching is enabled and cryptography is installed."""
+    enabled = config.config.get(('session_cache', 'enabled'), True)
+    if enabled in (False, 0, '0', 'false', 'False'):
+        return False
+    if not CRYPTOGRAPHY_AVAILABLE:
+        logger.debug("cryptography not installed; session cache disabled. Install with: pip install cryptography")
+        return False
+    return True
+
+
+def _fernet(username, password, salt):
+    # Without a configured key, derive one from the credentials so only
+    # someone who already knows them can read the cached session.
+    secret = config.config.get(('session_cache', 'key')) or f"{username}:{password}"
+    kdf = Scrypt(salt=salt, length=32, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P)
+    return Fernet(base64.urlsafe_b64encode(kdf.derive(str(secret).encode('utf-8'))))
+
+
+def cookies_expiry(cookies, max_age_hours=None, now=None):
+    """
+    Return the epoch time at which the cached cookies should be considered stale:
+    the earliest cookie expiry, capped at `max_age_hours` from now.
+    Session cookies (expires <= 0) only count against the cap.
+    """
+    if max_age_hours is None:
+        max_age_hours = config.config.get(('session_cache', 'max_age_hours'), DEFAULT_MAX_AGE_HOURS)
+    now = time.time() if now is None else now
+    expiry = now + float(max_age_hours) * 3600
+    for cookie in cookies:
+        expires = cookie.get('expires')
+        if isinstance(expires, (int, float)) and expires > 0:
+            expiry = min(expiry, expires)
+    return expiry
+
+
+def load_cookies(username, password, login_url, path=None):
+    """
+    Load cached cookies for this account and login URL.
+
+    Returns:
+        list: Playwright-style cookie dicts, or None if there is no usable cache entry.
+    """
+    if not is_enabled():
+        return None
+    cache_path = _cache_path(path)
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(FILE_MAGIC):
+            logger.info("Session cache %s is in an older format; ignoring it.", cache_path)
+            return None
+        salt = data[len(FILE_MAGIC):len(FILE_MAGIC) + SALT_BYTES]
+        payload = json.loads(_fernet(username, password, salt).decrypt(data[len(FILE_MAGIC) + SALT_BYTES:]))
+    except InvalidToken:
+        logger.info("Session cache %s was written for different credentials; ignoring it.", cache_path)
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read session cache %s: %s", cache_path, e)
+        return None
+    if payload.get('username') != username or payload.get('login_url') != login_url:
+        logger.info("Session cache is for a different account or login URL; ignoring it.")
+        return None
+    if payload.get('expires', 0) <= time.time():
+        logger.info("Cached session expired at %s.", time.ctime(payload.get('expires', 0)))
+        return None
+    cookies = payload.get('cookies') or None
+    if cookies:
+        logger.info("Loaded %d cached session cookies (valid until %s).", len(cookies), time.ctime(payload['expires']))
+    return cookies
+
+
+def save_cookies(cookies, username, password, login_url, path=None):
+    """Encrypt and write the cookies to the cache file. Returns True on success."""
+    if not cookies or not is_enabled():
+        return False
+    cache_path = _cache_path(path)
+    payload = {
+        'username': username,
+        'login_url': login_url,
+        'saved': time.time(),
+        'expires': cookies_expiry(cookies),
+        'cookies': cookies,
+    }
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        salt = os.urandom(SALT_BYTES)
+        token = _fernet(username, password, salt).encrypt(json.dumps(payload).encode('utf-8'))
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(FILE_MAGIC + salt + token)
+        os.replace(tmp_path, cache_path)
+        logger.info("Saved %d session cookies to %s.", len(cookies), cache_path)
+        return True
+    except OSError as e:
+        logger.warning("Could not write session cache %s: %s", cache_path, e)
+        return False
+
+
+def clear(path=None):
+    """Remove the cache file, e.g. after the server rejected the cached session."""
+    cache_path = _cache_path(path)
+    try:
+        os.remove(cache_path)
+        logger.info("Cleared session cache %s.", cache_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Could not remove session cache %s: %s", cache_path, e)
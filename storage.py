@@ -6,47 +6,201 @@ Also manages local file cleanup.
 """
 
 import os
+import gzip
+import shutil
 import tempfile
 import logging
-import boto3
-from botocore.exceptions import ClientError as BotoClientError
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import config
 
 logger = logging.getLogger(__name__)
 
+GZIP_MAGIC = b'\x1f\x8b'
+DEFAULT_MAX_POOL_CONNECTIONS = 16 # Keep >= the number of threads using storage at once
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+DEFAULT_RETRY_MODE = 'standard' # 'legacy', 'standard' or 'adaptive' (botocore retry modes)
+DEFAULT_MAX_ATTEMPTS = 5
+LIST_PAGE_SIZE = 1000 # list_objects_v2 returns at most 1000 keys per call
+KEY_DATE_FORMAT = '%Y-%m-%d' # Edition keys are '<prefix><date>_newspaper.<ext>'
+DELETE_BATCH_SIZE = 1000 # delete_objects accepts at most 1000 keys per call
+DEFAULT_DELETE_WORKERS = 4 # Batches deleted concurrently; each holds one pooled connection
+DEFAULT_MULTIPART_THRESHOLD_MB = 8 # Files at least this big are uploaded in parts
+DEFAULT_MULTIPART_CHUNKSIZE_MB = 8
+MIN_MULTIPART_CHUNKSIZE_MB = 5 # S3 rejects smaller parts (except the last)
+DEFAULT_UPLOAD_CONCURRENCY = 4 # Parts in flight at once; keep <= max_pool_connections
+PROGRESS_INTERVAL = 1.0 # Seconds between progress reports
+
 # Custom exception for storage errors
 class ClientError(Exception):
     pass
 
-# Lazy S3 client initialization
-def _get_s3_client():
-    endpoint_url = config.config.get(('storage', 'endpoint_url'))
-    aws_access_key_id = config.config.get(('storage', 'access_key_id'))
-    aws_secret_access_key = config.config.get(('storage', 'secret_access_key'))
-    region_name = config.config.get(('storage', 'region'), 'auto')
-    return boto3.client(
+def _boto_client_error():
+    """botocore's ClientError, imported when an except clause needs it (by then the client has loaded botocore)."""
+    from botocore.exceptions import ClientError as BotoClientError
+    return BotoClientError
+
+def _client_settings():
+    """Everything the S3 client is built from; a change means the client must be rebuilt."""
+    get = config.config.get
+    return (
+        get(('storage', 'endpoint_url')),
+        get(('storage', 'access_key_id')),
+        get(('storage', 'secret_access_key')),
+        get(('storage', 'region'), 'auto'),
+        int(get(('storage', 'max_pool_connections'), DEFAULT_MAX_POOL_CONNECTIONS)),
+        float(get(('storage', 'connect_timeout'), DEFAULT_CONNECT_TIMEOUT)),
+        float(get(('storage', 'read_timeout'), DEFAULT_READ_TIMEOUT)),
+        get(('storage', 'retry_mode'), DEFAULT_RETRY_MODE),
+        int(get(('storage', 'max_attempts'), DEFAULT_MAX_ATTEMPTS)),
+    )
+
+def create_s3_client(settings=None):
+    """Build a new S3 client (own botocore session, tuned pool, timeouts and retries)."""
+    import boto3 # ~250 ms; only paid by runs that touch storage
+    from botocore.config import Config
+    (endpoint_url, aws_access_key_id, aws_secret_access_key, region_name,
+     max_pool_connections, connect_timeout, read_timeout, retry_mode, max_attempts) = settings or _client_settings()
+    # boto3.client() uses the default session, which isn't safe to share across threads
+    return boto3.session.Session().client(
         's3',
         endpoint_url=endpoint_url,
         aws_access_key_id=aws_access_key_id,
         aws_secret_access_key=aws_secret_access_key,
-        region_name=region_name
+        region_name=region_name,
+        config=Config(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retries={'mode': retry_mode, 'max_attempts': max_attempts},
+        )
     )
 
+_client = None
+_client_settings_used = None
+_client_lock = threading.Lock()
+
+# Shared S3 client, created on first use and rebuilt when the storage config changes.
+# botocore clients are thread-safe, so every thread uses the same one and its connection pool.
+def _get_s3_client():
+    global _client, _client_settings_used
+    settings = _client_settings()
+    with _client_lock:
+        if _client is None or settings != _client_settings_used:
+            if _client is not None:
+                logger.info("Storage settings changed; creating a new S3 client.")
+            _client = create_s3_client(settings)
+            _client_settings_used = settings
+        return _client
+
+def reset_client():
+    """Drop the shared S3 client; the next call creates a new one."""
+    global _client, _client_settings_used
+    with _client_lock:
+        _client = None
+        _client_settings_used = None
+
 def _get_bucket():
     return config.config.get(('storage', 'bucket'))
 
-# List all files in the storage bucket
-def list_storage_files():
+def key_date(key, prefix=''):
+    """The edition date at the start of `key` (after `prefix`), or None if it has none."""
+    if not key.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(key[len(prefix):len(prefix) + 10], KEY_DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+def iter_storage_objects(prefix='', since=None, until=None, start_after=None, page_size=LIST_PAGE_SIZE):
+    """
+    Yield the objects under `prefix`, in key order, one list_objects_v2 page at a time.
+
+    Follows continuation tokens, so buckets of any size are listed in full.
+    With `since` and/or `until` (dates, inclusive) only keys whose name starts
+    with an edition date in that window are yielded: listing starts at `since`
+    and stops at the first key past `until`, so older and newer pages are
+    never fetched. `start_after` resumes after a key (e.g. for paging).
+
+    Yields:
+        dict: {'key', 'size', 'etag', 'last_modified'}
+    Raises:
+        ClientError: if a page cannot be listed.
+    """
     s3 = _get_s3_client()
     bucket = _get_bucket()
+    windowed = since is not None or until is not None
+    params = {'Bucket': bucket, 'Prefix': prefix, 'MaxKeys': page_size}
+    if since is not None:
+        # Every key of day `since` sorts after '<prefix><day before>~'
+        floor = f"{prefix}{(since - timedelta(days=1)).strftime(KEY_DATE_FORMAT)}~"
+        start_after = max(start_after or '', floor)
+    if start_after:
+        params['StartAfter'] = start_after
+    pages = listed = 0
     try:
-        resp = s3.list_objects_v2(Bucket=bucket)
-        files = [obj['Key'] for obj in resp.get('Contents', [])]
-        logger.info("Listed %d files in storage bucket %s", len(files), bucket)
-        return files
-    except BotoClientError as e:
+        while True:
+            resp = s3.list_objects_v2(**params)
+            pages += 1
+            for obj in resp.get('Contents', []):
+                key = obj['Key']
+                listed += 1
+                if windowed:
+                    file_date = key_date(key, prefix)
+                    if file_date is None or (since is not None and file_date < since):
+                        continue
+                    if until is not None and file_date > until:
+                        logger.debug("Listed %d objects in %d pages under '%s'", listed, pages, prefix)
+                        return
+                yield {
+                    'key': key,
+                    'size': obj.get('Size'),
+                    'etag': obj.get('ETag'),
+                    'last_modified': obj.get('LastModified'),
+                }
+            if not resp.get('IsTruncated'):
+                break
+            params['ContinuationToken'] = resp['NextContinuationToken']
+            params.pop('StartAfter', None)
+    except _boto_client_error() as e:
         logger.error("Error listing files in storage: %s", e)
         raise ClientError(str(e)) from e
+    logger.debug("Listed %d objects in %d pages under '%s'", listed, pages, prefix)
+
+# List all files in the storage bucket
+def list_storage_files(prefix=''):
+    files = [obj['key'] for obj in iter_storage_objects(prefix)]
+    logger.info("Listed %d files in storage bucket %s", len(files), _get_bucket())
+    return files
+
+# Look up a single object without downloading it
+def find_object(filename):
+    """
+    HEAD `filename` in the bucket.
+
+    Returns:
+        dict: {'key', 'size', 'etag', 'last_modified'} if the object exists, else None.
+    Raises:
+        ClientError: for errors other than a missing object (e.g. bad credentials).
+    """
+    s3 = _get_s3_client()
+    bucket = _get_bucket()
+    try:
+        resp = s3.head_object(Bucket=bucket, Key=filename)
+    except _boto_client_error() as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        logger.error("Error checking %s in storage: %s", filename, e)
+        raise ClientError(str(e)) from e
+    return {
+        'key': filename,
+        'size': resp.get('ContentLength'),
+        'etag': resp.get('ETag'),
+        'last_modified': resp.get('LastModified'),
+    }
 
 # Generate a presigned URL for a file
 def get_file_url(filename, expires_in=86400):
@@ -60,7 +214,7 @@ def get_file_url(filename, expires_in=86400):
         )
         logger.info("Generated presigned URL for %s", filename)
         return url
-    except BotoClientError as e:
+    except _boto_client_error() as e:
         logger.error("Error generating file URL: %s", e)
         return None
 
@@ -74,13 +228,116 @@ def delete_from_storage(filename, dry_run=False):
     try:
         s3.delete_object(Bucket=bucket, Key=filename)
         logger.info("Deleted %s from bucket %s", filename, bucket)
+        import manifest # manifest imports this module
+        manifest.record_delete(filename)
         return True
-    except BotoClientError as e:
+    except _boto_client_error() as e:
         logger.error("Error deleting file %s: %s", filename, e)
         return False
 
+def _delete_batch(s3, bucket, keys):
+    """One delete_objects call. Returns (deleted keys, {key: error message})."""
+    try:
+        resp = s3.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True})
+    except _boto_client_error() as e:
+        logger.error("Error deleting a batch of %d files: %s", len(keys), e)
+        return [], {key: str(e) for key in keys}
+    # In quiet mode only the failures are listed
+    errors = {err['Key']: f"{err.get('Code')}: {err.get('Message')}" for err in resp.get('Errors', [])}
+    return [key for key in keys if key not in errors], errors
+
+# Delete many files with as few requests as possible (supports dry_run)
+def delete_many(keys, dry_run=False, batch_size=None, max_workers=None):
+    """
+    Delete `keys` from the bucket in delete_objects batches of up to 1000
+    keys, several batches at a time.
+
+    Returns:
+        tuple: (list of deleted keys, dict {key: error message} for keys that could not be deleted)
+    """
+    keys = list(dict.fromkeys(keys))
+    bucket = _get_bucket()
+    if dry_run:
+        for key in keys:
+            logger.info("[Dry Run] Would delete %s from bucket %s", key, bucket)
+        return keys, {}
+    if not keys:
+        return [], {}
+    if batch_size is None:
+        batch_size = config.config.get(('storage', 'delete_batch_size'), DELETE_BATCH_SIZE)
+    batch_size = max(1, min(int(batch_size), DELETE_BATCH_SIZE))
+    if max_workers is None:
+        max_workers = config.config.get(('storage', 'delete_workers'), DEFAULT_DELETE_WORKERS)
+    s3 = _get_s3_client()
+    batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+    deleted, errors = [], {}
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(batches)))) as pool:
+        for batch_deleted, batch_errors in pool.map(lambda batch: _delete_batch(s3, bucket, batch), batches):
+            deleted.extend(batch_deleted)
+            errors.update(batch_errors)
+    for key, message in errors.items():
+        logger.error("Error deleting file %s: %s", key, message)
+    logger.info("Deleted %d of %d files from bucket %s in %d requests", len(deleted), len(keys), bucket, len(batches))
+    import manifest # manifest imports this module
+    manifest.record_deletes(deleted)
+    return deleted, errors
+
+def transfer_config():
+    """boto3 TransferConfig for uploads: multipart threshold, part size and concurrency from config."""
+    from boto3.s3.transfer import TransferConfig
+    get = config.config.get
+    mb = 1024 * 1024
+    chunksize = max(float(get(('storage', 'multipart_chunksize_mb'), DEFAULT_MULTIPART_CHUNKSIZE_MB)), MIN_MULTIPART_CHUNKSIZE_MB)
+    return TransferConfig(
+        multipart_threshold=int(float(get(('storage', 'multipart_threshold_mb'), DEFAULT_MULTIPART_THRESHOLD_MB)) * mb),
+        multipart_chunksize=int(chunksize * mb),
+        max_concurrency=max(1, int(get(('storage', 'upload_concurrency'), DEFAULT_UPLOAD_CONCURRENCY))),
+        use_threads=True,
+    )
+
+class UploadProgress:
+    """
+    boto3 upload Callback that turns byte counts into a rate and an ETA.
+
+    `report(sent, total, bytes_per_second, eta_seconds)` is called at most
+    every `interval` seconds, and once more when the last byte is sent.
+    Parts are uploaded from several threads, so counting is locked.
+    """
+
+    def __init__(self, total, report, interval=PROGRESS_INTERVAL, clock=time.monotonic):
+        self.total = total
+        self.sent = 0
+        self._report = report
+        self._interval = interval
+        self._clock = clock
+        self._started = clock()
+        self._last_report = None
+        self._lock = threading.Lock()
+
+    def __call__(self, bytes_amount):
+        with self._lock:
+            # A retried part first reports its failed bytes as negative
+            self.sent = max(0, self.sent + bytes_amount)
+            now = self._clock()
+            done = self.sent >= self.total
+            if not done and self._last_report is not None and now - self._last_report < self._interval:
+                return
+            self._last_report = now
+            elapsed = now - self._started
+            rate = self.sent / elapsed if elapsed > 0 else 0.0
+            eta = (self.total - self.sent) / rate if rate > 0 else None
+            sent, total = self.sent, self.total
+        try:
+            self._report(sent, total, rate, eta)
+        except Exception as e: # Progress must never fail an upload
+            logger.warning("Upload progress report failed: %s", e)
+
 # Upload a file to storage (supports dry_run)
-def upload_to_storage(local_file_path, s3_key, dry_run=False):
+# extra_args go to boto3 as ExtraArgs, e.g. {'ContentType': ..., 'ContentEncoding': 'gzip'}
+# Large files go up as a multipart upload (see transfer_config); each part request is
+# retried by the client's retry policy (storage.max_attempts) without restarting the upload.
+# progress: optional callable(sent_bytes, total_bytes, bytes_per_second, eta_seconds)
+def upload_to_storage(local_file_path, s3_key, dry_run=False, extra_args=None, progress=None):
     s3 = _get_s3_client()
     bucket = _get_bucket()
     if dry_run:
@@ -89,11 +346,19 @@ def upload_to_storage(local_file_path, s3_key, dry_run=False):
     if not os.path.isfile(local_file_path):
         logger.error("File to upload does not exist: %s", local_file_path)
         return False
+    from boto3.exceptions import S3UploadFailedError
+    size = os.path.getsize(local_file_path)
+    callback = UploadProgress(size, progress) if progress else None
+    start = time.monotonic()
     try:
-        s3.upload_file(local_file_path, bucket, s3_key)
-        logger.info("Uploaded %s to %s/%s", local_file_path, bucket, s3_key)
+        s3.upload_file(local_file_path, bucket, s3_key, ExtraArgs=extra_args, Callback=callback, Config=transfer_config())
+        elapsed = time.monotonic() - start
+        logger.info("Uploaded %s to %s/%s (%.1f MB in %.1f s)", local_file_path, bucket, s3_key,
+                    size / 1e6, elapsed)
+        import manifest # manifest imports this module
+        manifest.record_upload(s3_key, local_file_path)
         return True
-    except BotoClientError as e:
+    except (_boto_client_error(), S3UploadFailedError) as e:
         logger.error("Error uploading file %s: %s", local_file_path, e)
         return False
 
@@ -105,8 +370,15 @@ def download_to_temp(filename):
         tmp_dir = tempfile.gettempdir()
         local_path = os.path.join(tmp_dir, os.path.basename(filename))
         s3.download_file(bucket, filename, local_path)
+        # Packaged HTML editions are stored gzip-encoded; hand back the document
+        with open(local_path, 'rb') as f:
+            gzipped = f.read(2) == GZIP_MAGIC
+        if gzipped:
+            with gzip.open(local_path, 'rb') as src, open(f"{local_path}.tmp", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(f"{local_path}.tmp", local_path)
         logger.info("Downloaded %s to temp file %s", filename, local_path)
         return local_path
-    except BotoClientError as e:
+    except _boto_client_error() as e:
         logger.error("Error downloading file %s: %s", filename, e)
-        return None
\ No newline at end of file
+        return None
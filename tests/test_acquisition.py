@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+import acquisition
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded only once an edition is actually fetched, stored or emailed
+HEAVY_MODULES = ('playwright.sync_api', 'playwright.async_api', 'boto3', 'botocore', 'sendgrid', 'bs4', 'aiohttp',
+                 'website', 'async_website')
+# Wall-clock import budgets live in benchmarks/; here only the module set is checked
+ENTRY_POINTS = ('run_newspaper', 'main')
+
+
+def imported_modules(module):
+    """Names of the modules loaded by `import <module>` in a fresh interpreter (`python -X importtime`)."""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                               cwd=ROOT, capture_output=True, text=True, check=True)
+    names = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        names.add(line[len('import time:'):].split('|')[2].strip())
+    return names
+
+
+class TestBackendRegistry(unittest.TestCase):
+    def test_backends_resolve_on_first_use(self):
+        self.assertEqual(acquisition.available(), ['async', 'sync'])
+        import website
+        self.assertIs(acquisition.get('sync'), website.acquire_edition)
+        with mock.patch.object(website, 'acquire_edition') as patched:
+            self.assertIs(acquisition.get('sync'), patched)
+
+    def test_configured_backend_is_used(self):
+        backend = mock.Mock(return_value={'success': True})
+        acquisition.register('test', backend)
+        self.addCleanup(acquisition._backends.pop, 'test')
+        with mock.patch.object(acquisition.config.config, 'get', return_value='test'):
+            self.assertEqual(acquisition.acquire_edition(save_path='x'), {'success': True})
+        backend.assert_called_once_with(save_path='x')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError) as ctx:
+            acquisition.get('carrier-pigeon')
+        self.assertIn('sync', str(ctx.exception))
+
+
+class TestImportTime(unittest.TestCase):
+    def test_entry_points_start_without_heavy_dependencies(self):
+        for module in ENTRY_POINTS:
+            with self.subTest(module=module):
+                names = imported_modules(module)
+                self.assertIn(module, names)
+                loaded = [name for name in HEAVY_MODULES if name in names]
+                self.assertEqual(loaded, [], f"importing {module} loads {loaded}")
+
+    def test_backfill_defers_the_acquisition_backends(self):
+        names = imported_modules('backfill')
+        self.assertEqual([name for name in ('website', 'async_website') if name in names], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from unittest import mock
+import async_website
+import rate_limit
+import website
+
+PDF = b'%PDF-1.4\nxref\n0 1\n0000000000 65535 f \ntrailer\n<< /Size 1 >>\nstartxref\n9\n%%EOF\n'
+LOGIN_PAGE = b"""<html><body><form action="/session" method="post">
+  <input type="hidden" name="csrf" value="tok">
+  <input id="username" name="user"><input id="password" name="pass" type="password">
+  <button id="login-btn" type="submit">Log in</button>
+</form></body></html>"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    delay = 0.3
+    failures = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/login':
+            self._send(200, LOGIN_PAGE, [('Content-Type', 'text/html')])
+        elif self.path == '/account':
+            self._send(200, b'<a id="user-profile-link">Me</a>', [('Content-Type', 'text/html')])
+        elif self.path.startswith('/edition/'):
+            if 'sid=abc' not in (self.headers.get('Cookie') or ''):
+                self._send(403, b'forbidden')
+            elif self.failures.get(self.path, 0) > 0:
+                self.failures[self.path] -= 1
+                self._send(503, b'busy', [('Retry-After', '0')])
+            else:
+                time.sleep(self.delay)
+                self._send(200, PDF, [('Content-Type', 'application/pdf'), ('ETag', '"v1"')])
+        else:
+            self._send(404, b'')
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        if form.get('user') == ['alice'] and form.get('pass') == ['secret'] and form.get('csrf') == ['tok']:
+            self._send(303, b'', [('Location', '/account'), ('Set-Cookie', 'sid=abc; Path=/; HttpOnly')])
+        else:
+            self._send(200, b'<div class="login-error">Bad credentials</div>')
+
+
+@unittest.skipUnless(async_website.AIOHTTP_AVAILABLE, "aiohttp not installed")
+class TestAsyncAcquisition(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        values = {('rate_limit', 'requests_per_second'): 0, ('rate_limit', 'max_concurrent'): 8,
+                  ('rate_limit', 'max_retries'): 3, ('rate_limit', 'backoff_base_seconds'): 0}
+        patch = mock.patch.object(rate_limit.config.config, 'get', side_effect=lambda key, default=None: values.get(key, default))
+        patch.start()
+        self.addCleanup(patch.stop)
+        for patch in (mock.patch.object(async_website.session_cache, 'load_cookies', return_value=None),
+                      mock.patch.object(async_website.session_cache, 'save_cookies')):
+            patch.start()
+            self.addCleanup(patch.stop)
+        rate_limit.reset()
+        self.addCleanup(rate_limit.reset)
+        _Handler.failures = {}
+        self.site = website.publications.Publication(
+            'test', self.base_url, login_url=self.base_url + 'login', login_strategy='requests',
+            session_probe_url=self.base_url + 'account', download_path='edition/{date}',
+            selectors={'username': '#username', 'password': '#password', 'submit': '#login-btn',
+                       'login_success': '#user-profile-link', 'login_success_url': ''})
+
+    def _path(self, day):
+        return os.path.join(self.tmp.name, f"{day}_newspaper")
+
+    def test_login_and_download(self):
+        success, fmt = async_website.login_and_download_sync(
+            self.base_url, 'alice', 'secret', self._path('2024-01-01'), target_date='2024-01-01', publication=self.site)
+        self.assertTrue(success)
+        self.assertEqual(fmt, 'pdf')
+        with open(f"{self._path('2024-01-01')}.pdf", 'rb') as f:
+            self.assertEqual(f.read(), PDF)
+
+    def test_bad_credentials(self):
+        success, error = async_website.login_and_download_sync(
+            self.base_url, 'alice', 'wrong', self._path('2024-01-01'), target_date='2024-01-01', publication=self.site)
+        self.assertFalse(success)
+        self.assertIn('cookies', error)
+
+    def test_retries_on_503(self):
+        _Handler.failures = {'/edition/2024-01-02': 1}
+        result = async_website.acquire_edition_sync(self.base_url, 'alice', 'secret', self._path('2024-01-02'),
+                                                    target_date='2024-01-02', publication=self.site)
+        self.assertTrue(result['success'])
+        self.assertEqual(result['login']['strategy'], 'requests')
+        self.assertIsNotNone(result['sha256'])
+
+    def test_invalid_local_copy_is_downloaded_again(self):
+        with open(f"{self._path('2024-01-03')}.pdf", 'wb') as f:
+            f.write(b'<html>Session expired</html>')
+        result = async_website.acquire_edition_sync(self.base_url, 'alice', 'secret', self._path('2024-01-03'),
+                                                    target_date='2024-01-03', publication=self.site)
+        self.assertTrue(result['success'])
+        self.assertEqual(result['login']['strategy'], 'requests')
+        with open(f"{self._path('2024-01-03')}.pdf", 'rb') as f:
+            self.assertEqual(f.read(), PDF)
+
+    def test_editions_download_concurrently_in_one_loop(self):
+        days = ['2024-02-01', '2024-02-02', '2024-02-03', '2024-02-04']
+        start = time.monotonic()
+        results = asyncio.run(async_website.acquire_editions(
+            self.base_url, 'alice', 'secret', {day: self._path(day) for day in days}, publication=self.site))
+        elapsed = time.monotonic() - start
+        self.assertTrue(all(r['success'] for r in results.values()))
+        # Four 0.3s downloads overlap instead of taking 1.2s back to back
+        self.assertLess(elapsed, 4 * _Handler.delay)
+
+    def test_cancelled_download_releases_host_slot(self):
+        async def cancel_midway():
+            async with async_website.create_session(self.site) as session:
+                task = asyncio.ensure_future(async_website.download_edition(
+                    session, self.base_url, [{'name': 'sid', 'value': 'abc'}], self._path('2024-03-01'),
+                    target_date='2024-03-01', publication=self.site))
+                await asyncio.sleep(0.1)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+        asyncio.run(cancel_midway())
+        policy = rate_limit.for_url(self.base_url)
+        # Every slot is free again
+        self.assertTrue(all(policy._semaphore.acquire(blocking=False) for _ in range(8)))
+
+    def test_sync_wrapper_inside_running_loop(self):
+        async def caller():
+            return async_website.run_sync(asyncio.sleep(0, result='done'))
+        self.assertEqual(asyncio.run(caller()), 'done')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date
+from unittest import mock
+import backfill
+import website
+
+
+class TestBackfill(unittest.TestCase):
+    def test_date_range_inclusive(self):
+        days = backfill.date_range(date(2024, 1, 1), date(2024, 1, 7))
+        self.assertEqual(len(days), 7)
+        self.assertEqual(days[-1], date(2024, 1, 7))
+
+    def test_date_range_rejects_reversed(self):
+        with self.assertRaises(ValueError):
+            backfill.date_range(date(2024, 1, 7), date(2024, 1, 1))
+
+    @staticmethod
+    def _fake_acquire(base_url, username, password, save_path, target_date=None, **kwargs):
+        if target_date == '2024-01-02':
+            return {'success': False, 'error': 'Error 404', 'format': None, 'path': None}
+        return {'success': True, 'format': 'pdf', 'path': f"{save_path}.pdf", 'error': None}
+
+    def test_run_backfill_logs_in_once(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(backfill, 'REPORT_FILE', os.path.join(tmp, 'report.json')), \
+                mock.patch.object(backfill.main, 'update_status'), \
+                mock.patch.object(backfill.config.config, 'get', side_effect=lambda key, default=None: tmp if key == ('paths', 'download_dir') else default), \
+                mock.patch.object(website, 'login', return_value=[{'name': 'sid'}]) as login, \
+                mock.patch.object(website, 'acquire_edition', side_effect=self._fake_acquire), \
+                mock.patch.object(backfill, '_upload_one', return_value=True) as upload, \
+                mock.patch.object(backfill, '_thumbnail_one', return_value=True):
+            report = backfill.run_backfill(date(2024, 1, 1), date(2024, 1, 3), max_workers=3)
+        self.assertEqual(login.call_count, 1)
+        self.assertEqual(report['downloaded'], 2)
+        self.assertEqual(report['failed'], 1)
+        self.assertEqual(upload.call_count, 2)
+        self.assertEqual([e['date'] for e in report['editions']], ['2024-01-01', '2024-01-02', '2024-01-03'])
+
+    def test_publications_are_backfilled_under_their_prefix(self):
+        entries = [{'name': 'times', 'url': 'https://times.example/', 'username': 'ta', 'password': 'tp'},
+                   {'name': 'herald', 'url': 'https://herald.example/', 'username': 'ha', 'password': 'hp'},
+                   {'name': 'post', 'url': 'https://post.example/', 'username': 'pa', 'password': 'pp'}]
+        with tempfile.TemporaryDirectory() as tmp:
+            values = {('paths', 'download_dir'): tmp, ('publications',): entries}
+            with mock.patch.object(backfill, 'REPORT_FILE', os.path.join(tmp, 'report.json')), \
+                    mock.patch.object(backfill.main, 'update_status'), \
+                    mock.patch.object(backfill.config.config, 'get', side_effect=lambda key, default=None: values.get(key, default)), \
+                    mock.patch.object(website, 'login', return_value=[{'name': 'sid'}]) as login, \
+                    mock.patch.object(website, 'acquire_edition', side_effect=self._fake_acquire) as acquire, \
+                    mock.patch.object(backfill.packager, 'upload_source', side_effect=lambda path, fmt: (path, None)), \
+                    mock.patch.object(backfill.storage, 'upload_to_storage', return_value=True) as upload, \
+                    mock.patch.object(backfill, '_thumbnail_one', return_value=True), \
+                    mock.patch.object(backfill.downloader, 'mark_published'):
+                report = backfill.run_backfill(date(2024, 1, 1), date(2024, 1, 1), names=['times', 'herald'])
+        self.assertEqual(report['publications'], ['times', 'herald'])
+        self.assertEqual(sorted((c.args[:3], c.kwargs['publication'].name) for c in login.call_args_list),
+                         [(('https://herald.example/', 'ha', 'hp'), 'herald'), (('https://times.example/', 'ta', 'tp'), 'times')])
+        self.assertEqual({c.kwargs['publication'].name for c in acquire.call_args_list}, {'times', 'herald'})
+        self.assertEqual(sorted(c.args[1] for c in upload.call_args_list),
+                         ['herald/2024-01-01_newspaper.pdf', 'times/2024-01-01_newspaper.pdf'])
+        self.assertEqual([(e['publication'], e['download']) for e in report['editions']], [('herald', 'ok'), ('times', 'ok')])
+
+    def test_configured_acquisition_backend_is_used(self):
+        backend = mock.Mock(side_effect=lambda **kwargs: self._fake_acquire(**kwargs))
+        backfill.acquisition.register('test', backend)
+        self.addCleanup(backfill.acquisition._backends.pop, 'test')
+        with tempfile.TemporaryDirectory() as tmp:
+            values = {('paths', 'download_dir'): tmp, ('acquisition', 'backend'): 'test'}
+            with mock.patch.object(backfill, 'REPORT_FILE', os.path.join(tmp, 'report.json')), \
+                    mock.patch.object(backfill.main, 'update_status'), \
+                    mock.patch.object(backfill.config.config, 'get', side_effect=lambda key, default=None: values.get(key, default)), \
+                    mock.patch.object(website, 'login', return_value=[{'name': 'sid'}]), \
+                    mock.patch.object(website, 'acquire_edition') as sync_acquire, \
+                    mock.patch.object(backfill, '_upload_one', return_value=True), \
+                    mock.patch.object(backfill, '_thumbnail_one', return_value=True), \
+                    mock.patch.object(backfill.downloader, 'mark_published'):
+                report = backfill.run_backfill(date(2024, 1, 1), date(2024, 1, 3), max_workers=2)
+        self.assertEqual(backend.call_count, 3)
+        self.assertEqual({c.kwargs['cookies'][0]['name'] for c in backend.call_args_list}, {'sid'})
+        sync_acquire.assert_not_called()
+        self.assertEqual(report['downloaded'], 2)
+
+    def test_workers_launch_the_browser_once_and_close_it_themselves(self):
+        launched, closed = [], []
+
+        def launch(pool):
+            launched.append(threading.get_ident())
+            pool._playwright, pool._browser = mock.Mock(), mock.Mock(**{'is_connected.return_value': True})
+            pool.launches += 1
+
+        def close(pool):
+            if pool._browser is not None:
+                closed.append(threading.get_ident())
+            pool._browser = pool._playwright = None
+
+        def fallback_acquire(base_url, username, password, save_path, **kwargs):
+            with backfill.browser_pool.get_pool().context():
+                pass
+            return {'success': True, 'format': 'pdf', 'path': f"{save_path}.pdf", 'error': None}
+
+        existing = list(backfill.browser_pool._pools)
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(backfill, 'REPORT_FILE', os.path.join(tmp, 'report.json')), \
+                mock.patch.object(backfill.main, 'update_status'), \
+                mock.patch.object(backfill.config.config, 'get', side_effect=lambda key, default=None: tmp if key == ('paths', 'download_dir') else default), \
+                mock.patch.object(website, 'login', return_value=[{'name': 'sid'}]), \
+                mock.patch.object(website, 'acquire_edition', side_effect=fallback_acquire), \
+                mock.patch.object(backfill, '_upload_one', return_value=True), \
+                mock.patch.object(backfill, '_thumbnail_one', return_value=True), \
+                mock.patch.object(backfill.downloader, 'mark_published'), \
+                mock.patch.object(backfill.browser_pool.BrowserPool, '_launch', autospec=True, side_effect=launch), \
+                mock.patch.object(backfill.browser_pool.BrowserPool, '_close_browser', autospec=True, side_effect=close):
+            report = backfill.run_backfill(date(2024, 1, 1), date(2024, 1, 8), max_workers=2)
+        self.assertEqual(report['downloaded'], 8)
+        self.assertLessEqual(len(launched), 2)
+        self.assertEqual(len(set(launched)), len(launched))
+        self.assertEqual(sorted(closed), sorted(launched))
+        self.assertEqual(backfill.browser_pool._pools, existing)
+
+    def test_unknown_publication_is_rejected(self):
+        with mock.patch.object(backfill.config.config, 'get', side_effect=lambda key, default=None: default):
+            with self.assertRaises(ValueError):
+                backfill.run_backfill(date(2024, 1, 1), date(2024, 1, 1), names=['nope'])
+
+
+if __name__ == "__main__":
+    unittest.main()
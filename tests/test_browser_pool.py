@@ -0,0 +1,176 @@
+import threading
+import unittest
+from unittest import mock
+import browser_pool
+
+
+class _FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    def new_context(self, **options):
+        ctx = _FakeContext()
+        self.contexts.append(ctx)
+        return ctx
+
+    def close(self):
+        self.connected = False
+
+
+class _FakePlaywright:
+    def __init__(self):
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+class TestBrowserPool(unittest.TestCase):
+    def setUp(self):
+        self.browsers = []
+
+        def launcher():
+            browser = _FakeBrowser()
+            self.browsers.append(browser)
+            return _FakePlaywright(), browser
+
+        self.pool = browser_pool.BrowserPool(max_uses=3, launcher=launcher)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_reuses_browser_and_closes_contexts(self):
+        for _ in range(3):
+            with self.pool.context() as ctx:
+                self.assertFalse(ctx.closed)
+            self.assertTrue(ctx.closed)
+        self.assertEqual(self.pool.launches, 1)
+
+    def test_recycles_after_max_uses(self):
+        for _ in range(4):
+            with self.pool.context():
+                pass
+        self.assertEqual(self.pool.launches, 2)
+        self.assertFalse(self.browsers[0].is_connected())
+
+    def test_recycles_after_crash(self):
+        with self.assertRaises(browser_pool.PlaywrightError):
+            with self.pool.context():
+                raise browser_pool.PlaywrightError("target crashed")
+        with self.pool.context():
+            pass
+        self.assertEqual(self.pool.launches, 2)
+
+    def test_relaunches_disconnected_browser(self):
+        with self.pool.context():
+            pass
+        self.browsers[0].connected = False
+        with self.pool.context():
+            pass
+        self.assertEqual(self.pool.launches, 2)
+
+    def test_shutdown_closes_browser(self):
+        with self.pool.context():
+            pass
+        self.pool.shutdown()
+        self.assertFalse(self.browsers[0].is_connected())
+        self.pool.shutdown()  # Idempotent
+
+    @unittest.skipUnless(browser_pool.PLAYWRIGHT_AVAILABLE, "playwright not installed")
+    def test_public_error_classes(self):
+        from playwright.sync_api import Error, TimeoutError
+        self.assertIs(browser_pool.PlaywrightError, Error)
+        self.assertIs(browser_pool.PlaywrightTimeoutError, TimeoutError)
+
+
+class TestPerThreadPools(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(browser_pool.shutdown_pool)
+
+    def test_exit_hook_only_closes_its_own_threads_pool(self):
+        pools = {}
+
+        def worker():
+            pools['worker'] = browser_pool.get_pool()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        pools['main'] = browser_pool.get_pool()
+        with mock.patch.object(browser_pool.BrowserPool, 'shutdown', autospec=True) as shutdown:
+            browser_pool._shutdown_all()
+        self.assertEqual([call.args[0] for call in shutdown.call_args_list], [pools['main']])
+        self.assertEqual(browser_pool._pools, [])
+
+
+class _FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = mock.Mock(resource_type=resource_type, url=url)
+        self.outcome = None
+
+    def abort(self):
+        self.outcome = 'aborted'
+
+    def continue_(self):
+        self.outcome = 'continued'
+
+
+class TestRequestBlocking(unittest.TestCase):
+    def _config(self, values):
+        return mock.patch.object(browser_pool.config.config, 'get',
+                                 side_effect=lambda key, default=None: values.get(key, default))
+
+    def test_blocks_by_type_and_pattern(self):
+        blocker = browser_pool.RequestBlocker(['image', 'font'], ['*google-analytics.com/*'])
+        routes = [
+            _FakeRoute('image', 'https://example.com/logo.png'),
+            _FakeRoute('script', 'https://www.google-analytics.com/analytics.js'),
+            _FakeRoute('document', 'https://example.com/login'),
+            _FakeRoute('script', 'https://example.com/app.js'),
+        ]
+        for route in routes:
+            blocker.handle(route)
+        self.assertEqual([r.outcome for r in routes], ['aborted', 'aborted', 'continued', 'continued'])
+        self.assertEqual((blocker.blocked, blocker.allowed), (2, 2))
+
+    def test_install_skips_route_when_nothing_to_block(self):
+        context = mock.Mock()
+        browser_pool.RequestBlocker().install(context)
+        context.route.assert_not_called()
+        browser_pool.RequestBlocker(['image']).install(context)
+        context.route.assert_called_once()
+
+    def test_site_profile_overrides_default_for_host(self):
+        profiles = {
+            'default': {'block_url_patterns': ['*ads*'], 'wait_until': 'domcontentloaded'},
+            'example.com': {'block_resource_types': ['image', 'stylesheet'], 'wait_until': 'load'},
+        }
+        with self._config({('browser', 'profiles'): profiles}):
+            site = browser_pool.site_profile('https://www.example.com/login')
+            other = browser_pool.site_profile('https://other.org/login')
+        self.assertEqual(site['block_resource_types'], ['image', 'stylesheet'])
+        self.assertEqual(site['block_url_patterns'], ['*ads*'])
+        self.assertEqual(site['wait_until'], 'load')
+        self.assertEqual(other['block_resource_types'], list(browser_pool.DEFAULT_BLOCK_RESOURCE_TYPES))
+        self.assertEqual(other['wait_until'], 'domcontentloaded')
+
+    def test_blocking_can_be_switched_off(self):
+        with self._config({('browser', 'block_requests'): False}):
+            profile = browser_pool.site_profile('https://example.com/')
+        self.assertFalse(browser_pool.RequestBlocker.from_profile(profile).enabled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+import os
+import hashlib
+import tempfile
+import unittest
+import requests
+import downloader
+
+
+URL = 'https://example.com/newspaper/download/2024-01-01'
+
+
+class _FakeResponse:
+    def __init__(self, body, headers=None, chunk_limit=None, status_code=200, interrupt_after=None):
+        self.body = body
+        self.headers = headers if headers is not None else {'Content-Length': str(len(body))}
+        self.chunk_limit = chunk_limit
+        self.status_code = status_code
+        self.interrupt_after = interrupt_after
+        self.url = URL
+        self.closed = False
+        self.chunk_sizes = []
+
+    def iter_content(self, chunk_size=1):
+        body = self.body if self.chunk_limit is None else self.body[:self.chunk_limit]
+        for i in range(0, len(body), chunk_size):
+            if self.interrupt_after is not None and i >= self.interrupt_after:
+                raise requests.exceptions.ConnectionError("Read timed out.")
+            self.chunk_sizes.append(len(body[i:i + chunk_size]))
+            yield body[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class TestDownloader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'edition.pdf')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_streams_in_chunks_and_hashes(self):
+        body = b'%PDF-1.7 ' + b'x' * 10000
+        response = _FakeResponse(body)
+        size, sha256 = downloader.stream_response_to_file(response, self.path, chunk_size=1024)
+        self.assertEqual(size, len(body))
+        self.assertEqual(sha256, hashlib.sha256(body).hexdigest())
+        self.assertTrue(max(response.chunk_sizes) <= 1024)
+        self.assertTrue(response.closed)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), body)
+        self.assertFalse(os.path.exists(downloader.part_path(self.path)))
+
+    def test_truncated_download_leaves_nothing(self):
+        response = _FakeResponse(b'a' * 5000, chunk_limit=3000)
+        with self.assertRaises(downloader.DownloadError):
+            downloader.stream_response_to_file(response, self.path, chunk_size=1024)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(downloader.part_path(self.path)))
+
+    def test_max_size_enforced(self):
+        response = _FakeResponse(b'a' * 5000, headers={})
+        with self.assertRaises(downloader.DownloadError):
+            downloader.stream_response_to_file(response, self.path, chunk_size=1024, max_size=2048)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_existing_file_kept_on_failure(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'old edition')
+        response = _FakeResponse(b'a' * 5000, chunk_limit=10)
+        with self.assertRaises(downloader.DownloadError):
+            downloader.stream_response_to_file(response, self.path, chunk_size=1024)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), b'old edition')
+
+
+class TestResumableDownload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'edition.pdf')
+        self.temp_path = os.path.join(self.tmp.name, 'edition.part')
+        self.body = bytes(range(256)) * 40
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _interrupted_first_attempt(self):
+        headers = {'Content-Length': str(len(self.body)), 'ETag': '"v1"'}
+        response = _FakeResponse(self.body, headers=headers, interrupt_after=4096)
+        with self.assertRaises(downloader.DownloadError) as ctx:
+            downloader.stream_response_to_file(response, self.path, chunk_size=1024, temp_path=self.temp_path, url=URL)
+        self.assertTrue(ctx.exception.resumable)
+        return downloader.load_resume_state(self.temp_path, URL)
+
+    def test_interrupted_transfer_keeps_partial_and_validator(self):
+        state = self._interrupted_first_attempt()
+        self.assertEqual(state['offset'], 4096)
+        self.assertEqual(downloader.resume_headers(state), {'Range': 'bytes=4096-', 'If-Range': '"v1"'})
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_resume_with_206_appends(self):
+        state = self._interrupted_first_attempt()
+        rest = self.body[4096:]
+        headers = {'Content-Length': str(len(rest)), 'Content-Range': f'bytes 4096-{len(self.body) - 1}/{len(self.body)}'}
+        response = _FakeResponse(rest, headers=headers, status_code=206)
+        size, sha256 = downloader.stream_response_to_file(response, self.path, chunk_size=1024,
+                                                          temp_path=self.temp_path, resume_state=state, url=URL)
+        self.assertEqual(size, len(self.body))
+        self.assertEqual(sha256, hashlib.sha256(self.body).hexdigest())
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), self.body)
+        self.assertIsNone(downloader.load_resume_state(self.temp_path, URL))
+
+    def test_server_ignoring_range_falls_back_to_full_fetch(self):
+        state = self._interrupted_first_attempt()
+        response = _FakeResponse(self.body, headers={'Content-Length': str(len(self.body)), 'ETag': '"v2"'})
+        size, _ = downloader.stream_response_to_file(response, self.path, chunk_size=1024,
+                                                     temp_path=self.temp_path, resume_state=state, url=URL)
+        self.assertEqual(size, len(self.body))
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), self.body)
+
+    def test_no_validator_means_no_resume(self):
+        response = _FakeResponse(self.body, interrupt_after=4096)
+        with self.assertRaises(downloader.DownloadError):
+            downloader.stream_response_to_file(response, self.path, chunk_size=1024, temp_path=self.temp_path, url=URL)
+        self.assertFalse(os.path.exists(self.temp_path))
+
+    def test_parse_content_range(self):
+        self.assertEqual(downloader.parse_content_range('bytes 10-19/20'), (10, 19, 20))
+        self.assertEqual(downloader.parse_content_range('bytes 10-19/*'), (10, 19, None))
+        self.assertIsNone(downloader.parse_content_range('garbage'))
+
+
+class TestEditionMetadata(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'edition.pdf')
+        with open(self.path, 'wb') as f:
+            f.write(b'%PDF-1.7 edition')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_conditional_headers_from_recorded_validators(self):
+        response = _FakeResponse(b'', headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 05:00:00 GMT'})
+        downloader.record_download(self.path, response, URL, 16, 'abc')
+        self.assertEqual(downloader.conditional_headers(self.path), {
+            'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Mon, 01 Jan 2024 05:00:00 GMT',
+        })
+
+    def test_no_validators_without_file(self):
+        self.assertEqual(downloader.conditional_headers(os.path.join(self.tmp.name, 'missing.pdf')), {})
+
+    def test_published_state_follows_content_hash(self):
+        self.assertFalse(downloader.is_published(self.path))
+        downloader.mark_published(self.path)
+        self.assertTrue(downloader.is_published(self.path))
+        self.assertEqual(downloader.content_sha256(self.path), hashlib.sha256(b'%PDF-1.7 edition').hexdigest())
+        downloader.save_meta(self.path, sha256='different')
+        self.assertFalse(downloader.is_published(self.path))
+
+
+class TestSegmentedDownload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'edition.pdf')
+        self.body = bytes(range(256)) * 400
+        self.requested = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _fetch(self, corrupt=()):
+        total = len(self.body)
+        def fetch_range(start, end):
+            self.requested.append((start, end))
+            if (start, end) in corrupt:
+                return _FakeResponse(self.body, status_code=200)
+            return _FakeResponse(self.body[start:end + 1], status_code=206,
+                                 headers={'Content-Range': f"bytes {start}-{end}/{total}"})
+        return fetch_range
+
+    def test_plan_covers_every_byte_once(self):
+        ranges = downloader.plan_segments(10, 3)
+        self.assertEqual(ranges, [(0, 3), (4, 6), (7, 9)])
+        self.assertEqual(downloader.plan_segments(2, 4), [(0, 0), (1, 1)])
+
+    def test_segments_assemble_in_place(self):
+        first = _FakeResponse(self.body)
+        size, sha256, stats = downloader.download_segmented(self._fetch(), self.path, len(self.body),
+                                                            first_response=first, segments=4, chunk_size=1000)
+        self.assertEqual(size, len(self.body))
+        self.assertEqual(sha256, hashlib.sha256(self.body).hexdigest())
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), self.body)
+        # The first segment came from the already open response
+        self.assertEqual(len(self.requested), 3)
+        self.assertNotIn(0, [start for start, _ in self.requested])
+        self.assertTrue(first.closed)
+        self.assertEqual(stats['segments'], 4)
+        self.assertIn('speedup', stats)
+        self.assertFalse(os.path.exists(downloader.part_path(self.path)))
+
+    def test_wrong_range_fails_and_leaves_nothing(self):
+        ranges = downloader.plan_segments(len(self.body), 4)
+        with self.assertRaises(downloader.DownloadError):
+            downloader.download_segmented(self._fetch(corrupt=(ranges[2],)), self.path, len(self.body), segments=4)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(downloader.part_path(self.path)))
+
+    def test_supports_segments_needs_ranges_and_validator(self):
+        headers = {'Accept-Ranges': 'bytes', 'Content-Length': '100', 'ETag': '"v1"'}
+        self.assertTrue(downloader.supports_segments(_FakeResponse(b'', headers=headers)))
+        self.assertFalse(downloader.supports_segments(_FakeResponse(b'', headers=dict(headers, ETag='W/"v1"'))))
+        self.assertFalse(downloader.supports_segments(_FakeResponse(b'', headers=dict(headers, **{'Accept-Ranges': 'none'}))))
+
+
+if __name__ == "__main__":
+    unittest.main()
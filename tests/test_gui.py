@@ -1,5 +1,9 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
 import gui_app
+from tests.test_storage import FakeBucket
 
 class TestGUI(unittest.TestCase):
     def setUp(self):
@@ -14,5 +18,38 @@ class TestGUI(unittest.TestCase):
         response = self.client.get('/health')
         self.assertEqual(response.status_code, 200)
 
+    def test_archive_is_paged(self):
+        keys = [f"2024-{month:02d}-{day:02d}_newspaper.pdf" for month in range(1, 7) for day in range(1, 29)]
+        bucket = FakeBucket(keys, page_size=1000)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        index = gui_app.manifest.Manifest(os.path.join(tmp.name, 'manifest.json'))
+        with mock.patch.object(gui_app.storage, '_get_s3_client', return_value=bucket), \
+                mock.patch.object(gui_app.manifest, 'get_manifest', return_value=index):
+            first = self.client.get('/archive').get_data(as_text=True)
+            second = self.client.get(f"/archive?after={keys[99]}").get_data(as_text=True)
+        self.assertIn(keys[99], first)
+        self.assertNotIn(keys[100], first)
+        self.assertIn(f"after={keys[99]}", first)
+        self.assertIn(keys[100], second)
+        self.assertEqual(len(bucket.calls), 1) # Both pages come from the manifest built by the first request
+
+    def test_progress_reports_each_title(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        titles = [gui_app.main.publications.Publication(name, f"https://{name}/", status_path=os.path.join(tmp.name, f"{name}.json"))
+                  for name in ('daily', 'weekly')]
+        with mock.patch.object(gui_app.main, 'STATUS_FILE', os.path.join(tmp.name, 'status.json')), \
+                mock.patch.object(gui_app.main.publications, 'load_publications', return_value=titles):
+            gui_app.main.update_status('download', 'in_progress', 'Downloading daily', publication=titles[0])
+            everything = self.client.get('/progress').get_json()
+            weekly = self.client.get('/progress?publication=weekly').get_json()
+            unknown = self.client.get('/progress?publication=nope')
+        self.assertEqual(everything['status'], 'none')
+        self.assertEqual(everything['publications']['daily']['message'], 'Downloading daily')
+        self.assertEqual(everything['publications']['weekly']['status'], 'none')
+        self.assertEqual(weekly['status'], 'none')
+        self.assertEqual(unknown.status_code, 404)
+
 if __name__ == "__main__":
     unittest.main()
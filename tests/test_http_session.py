@@ -0,0 +1,72 @@
+import threading
+import unittest
+import http.server
+import http_session
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.hits += 1
+        if self.path == '/unavailable':
+            self.send_response(503)
+            self.send_header('Retry-After', '30')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestHttpSession(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.hits = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connections_are_reused(self):
+        session = http_session.create_session(max_retries=0)
+        for _ in range(5):
+            self.assertEqual(session.get(self.url, timeout=5).text, 'ok')
+        stats = http_session.connection_stats(session)
+        session.close()
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['connections'], 1)
+        self.assertEqual(stats['reused'], 4)
+
+    def test_retry_configuration(self):
+        session = http_session.create_session(max_retries=2, backoff_factor=0.1, pool_maxsize=3)
+        adapter = session.get_adapter('https://example.com/')
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertEqual(adapter.max_retries.status, 0)
+        self.assertFalse(adapter.max_retries.status_forcelist)
+        self.assertEqual(adapter._pool_maxsize, 3)
+        session.close()
+
+    def test_server_errors_are_left_to_the_caller(self):
+        # No adapter-level retry (or Retry-After sleep) under rate_limit's own
+        session = http_session.create_session(max_retries=3, backoff_factor=0)
+        response = session.get(self.url + 'unavailable', timeout=5)
+        session.close()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.hits, 1)
+
+    def test_shared_session_is_singleton(self):
+        self.assertIs(http_session.get_session(), http_session.get_session())
+        http_session.close_session()
+
+
+if __name__ == "__main__":
+    unittest.main()
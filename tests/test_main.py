@@ -1,11 +1,126 @@
+import json
+import os
+import tempfile
 import unittest
+from unittest import mock
 import main
+import website
 from datetime import date
+from tests.test_storage import FakeBucket
 
 class TestMainPipeline(unittest.TestCase):
     def test_main_dry_run(self):
         result = main.main(target_date_str=date.today().strftime('%Y-%m-%d'), dry_run=True, force_download=False)
         self.assertTrue(result)
 
+class TestStatusFile(unittest.TestCase):
+    def test_titles_write_their_own_status(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(main, 'STATUS_FILE', os.path.join(tmp, 'status.json')):
+            daily = main.publications.Publication('daily', 'https://daily/', status_path=os.path.join(tmp, 'status_daily.json'))
+            weekly = main.publications.Publication('weekly', 'https://weekly/', status_path=os.path.join(tmp, 'status_weekly.json'))
+            main.update_status('download', 'in_progress', 'Downloading daily', publication=daily)
+            main.update_status('upload', 'success', 'Uploaded weekly', publication=weekly)
+            main.update_status('backfill', 'in_progress', 'Backfilling')
+            statuses = {}
+            for name in ('status.json', 'status_daily.json', 'status_weekly.json'):
+                with open(os.path.join(tmp, name), encoding='utf-8') as f:
+                    statuses[name] = json.load(f)['message']
+        self.assertEqual(statuses, {'status.json': 'Backfilling', 'status_daily.json': 'Downloading daily',
+                                    'status_weekly.json': 'Uploaded weekly'})
+
+class TestStoragePreflight(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        values = {('paths', 'download_dir'): self.tmp.name}
+        for patch in (mock.patch.object(main, 'STATUS_FILE', os.path.join(self.tmp.name, 'status.json')),
+                      mock.patch.object(main.config.config, 'load', return_value=True),
+                      mock.patch.object(main.config.config, 'get', side_effect=lambda key, default=None: values.get(key, default)),
+                      mock.patch.object(main, 'get_past_papers_from_storage', return_value=[]),
+                      mock.patch.object(main.manifest, 'objects', return_value=[]),
+                      mock.patch.object(main.manifest, 'lookup', return_value={}),
+                      mock.patch.object(main.storage, 'get_file_url', side_effect=lambda key: f"https://r2/{key}")):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_stored_edition_skips_login_and_download(self):
+        stored = {'key': '2024-01-01_newspaper.html', 'size': 10, 'etag': '"e"', 'last_modified': None}
+        with open(os.path.join(self.tmp.name, '2024-01-01_thumbnail.jpg'), 'wb') as f:
+            f.write(b'jpg')
+        with mock.patch.object(main.storage, 'find_object', side_effect=lambda key: stored if key.endswith('.html') else None), \
+                mock.patch.object(website, 'acquire_edition') as acquire, \
+                mock.patch.object(main.storage, 'upload_to_storage') as upload, \
+                mock.patch.object(main.email_sender, 'send_email') as send:
+            self.assertTrue(main.main('2024-01-01'))
+        acquire.assert_not_called()
+        upload.assert_not_called()
+        self.assertEqual(send.call_args.kwargs['today_paper_url'], 'https://r2/2024-01-01_newspaper.html')
+        self.assertTrue(send.call_args.kwargs['thumbnail_path'].endswith('2024-01-01_thumbnail.jpg'))
+
+    def test_unreachable_storage_falls_back_to_download(self):
+        with mock.patch.object(main.storage, 'find_object', side_effect=main.storage.ClientError('denied')):
+            self.assertIsNone(main.find_stored_edition('2024-01-01'))
+
+    def test_force_download_skips_preflight(self):
+        acquisition = {'success': False, 'format': None, 'path': None, 'login': {}, 'probes': []}
+        with mock.patch.object(main.storage, 'find_object') as find, \
+                mock.patch.object(website, 'acquire_edition', return_value=acquisition) as acquire, \
+                mock.patch.object(main.email_sender, 'send_alert_email'):
+            self.assertFalse(main.main('2024-01-01', force_download=True))
+        find.assert_not_called()
+        acquire.assert_called_once()
+
+
+class TestDatedListings(unittest.TestCase):
+    KEYS = [f"2024-01-{day:02d}_newspaper.pdf" for day in range(1, 21)] + ['2024-01-10_thumbnail.jpg', 'other/2024-01-01_newspaper.pdf']
+
+    def setUp(self):
+        self.bucket = FakeBucket(sorted(self.KEYS))
+        # Straight from the bucket listing; the manifest has its own tests
+        for patch in (mock.patch.object(main.storage, '_get_s3_client', return_value=self.bucket),
+                      mock.patch.object(main.manifest, 'is_enabled', return_value=False)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_past_papers_list_only_the_window(self):
+        with mock.patch.object(main.storage, 'get_file_url', side_effect=lambda key: f"https://r2/{key}"):
+            papers = main.get_past_papers_from_storage(date(2024, 1, 12), days=3)
+        self.assertEqual([d for d, _ in papers], ['2024-01-12', '2024-01-11', '2024-01-10'])
+        self.assertEqual(self.bucket.calls[0]['StartAfter'], '2024-01-09~')
+
+    def test_cleanup_deletes_only_expired_keys_in_namespace(self):
+        main.cleanup_old_files(date(2024, 1, 20), days_to_keep=15)
+        listings, deletes = self.bucket.calls[:-1], self.bucket.calls[-1]
+        self.assertEqual(deletes['Delete'], self.KEYS[:4]) # One delete_objects request
+        self.assertEqual(len(listings), 2) # Stopped at 2024-01-05, not at the end of the bucket
+        self.assertIn('other/2024-01-01_newspaper.pdf', self.bucket.keys)
+
+    def test_last_7_days_status_stays_in_namespace(self):
+        today = date.today()
+        yesterday = today - main.timedelta(days=1)
+        self.bucket.keys = sorted([f"{today:%Y-%m-%d}_newspaper.pdf", f"other/{yesterday:%Y-%m-%d}_newspaper.html"])
+        legacy = {d['date']: d['status'] for d in main.get_last_7_days_status()}
+        other = {d['date']: d['status'] for d in main.get_last_7_days_status(prefix='other/')}
+        self.assertEqual((legacy[f"{today:%Y-%m-%d}"], legacy[f"{yesterday:%Y-%m-%d}"]), ('ready', 'missing'))
+        self.assertEqual((other[f"{today:%Y-%m-%d}"], other[f"{yesterday:%Y-%m-%d}"]), ('missing', 'ready'))
+
+
+class TestUploadStatus(unittest.TestCase):
+    def test_describe_eta(self):
+        self.assertIsNone(main.describe_eta(None))
+        self.assertEqual(main.describe_eta(1), 'about 5 seconds')
+        self.assertEqual(main.describe_eta(22), 'about 20 seconds')
+        self.assertEqual(main.describe_eta(80), 'about 1 minute')
+        self.assertEqual(main.describe_eta(200), 'about 3 minutes')
+
+    def test_progress_is_written_to_the_status_file(self):
+        with mock.patch.object(main, 'update_status') as update:
+            main._upload_progress(40, 55)(5000000, 10000000, 2500000.0, 2.0)
+        update.assert_called_once_with('upload', 'in_progress',
+                                       'Uploading your newspaper to the cloud... 5.0 of 10.0 MB (2.5 MB/s)',
+                                       percent=47, eta='about 5 seconds', publication=None)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import date
+from unittest import mock
+import manifest
+import storage
+from tests.test_storage import FakeBucket
+
+KEYS = sorted([f"2024-01-{day:02d}_newspaper.pdf" for day in range(1, 11)] + ['2024-01-05_thumbnail.jpg',
+              'pub/2024-01-05_newspaper.html', 'pub/notes.txt'])
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'manifest.json')
+        self.bucket = FakeBucket(list(KEYS))
+        self.values = {('manifest', 'path'): self.path, ('storage', 'bucket'): 'papers'}
+        for patch in (mock.patch.object(manifest.config.config, 'get', side_effect=lambda key, default=None: self.values.get(key, default)),
+                      mock.patch.object(storage, '_get_s3_client', return_value=self.bucket)):
+            patch.start()
+            self.addCleanup(patch.stop)
+        manifest.reset()
+        self.addCleanup(manifest.reset)
+
+    def test_lookups_are_answered_without_listing_again(self):
+        self.assertEqual([o['key'] for o in manifest.objects(since=date(2024, 1, 4), until=date(2024, 1, 5))],
+                         ['2024-01-04_newspaper.pdf', '2024-01-05_newspaper.pdf', '2024-01-05_thumbnail.jpg'])
+        calls = len(self.bucket.calls)
+        self.assertEqual(sorted(manifest.lookup(date(2024, 1, 5))), ['newspaper.pdf', 'thumbnail.jpg'])
+        self.assertEqual(list(manifest.lookup(date(2024, 1, 5), prefix='pub/')), ['newspaper.html'])
+        self.assertEqual([o['key'] for o in manifest.objects(prefix='pub/')], ['pub/2024-01-05_newspaper.html', 'pub/notes.txt'])
+        self.assertEqual([o['key'] for o in manifest.objects(start_after='2024-01-09_newspaper.pdf', until=date(2024, 1, 31))],
+                         ['2024-01-10_newspaper.pdf'])
+        self.assertEqual(len(self.bucket.calls), calls)
+
+    def test_uploads_and_deletes_write_through(self):
+        manifest.reconcile()
+        calls = len(self.bucket.calls)
+        with open(os.path.join(os.path.dirname(self.path), 'edition.pdf'), 'wb') as f:
+            f.write(b'%PDF' * 10)
+        self.assertTrue(storage.upload_to_storage(f.name, '2024-01-11_newspaper.pdf'))
+        self.assertTrue(storage.delete_from_storage('2024-01-01_newspaper.pdf'))
+        self.assertEqual(storage.delete_many(['2024-01-02_newspaper.pdf', '2024-01-03_newspaper.pdf'])[1], {})
+        self.assertTrue(storage.upload_to_storage(f.name, 'x.pdf', dry_run=True))
+        manifest.reset() # Read back from disk
+        stored = manifest.lookup(date(2024, 1, 11))
+        self.assertEqual(stored['newspaper.pdf']['size'], 40)
+        self.assertEqual(manifest.lookup(date(2024, 1, 1)), {})
+        self.assertEqual(len(manifest.objects()), len(KEYS) - 2)
+        self.assertEqual(len(self.bucket.calls), calls + 1) # The delete_objects request; no listing
+
+    def test_reconcile_corrects_drift(self):
+        manifest.reconcile()
+        self.bucket.keys = sorted([k for k in self.bucket.keys if k != '2024-01-02_newspaper.pdf'] + ['2024-01-20_newspaper.pdf'])
+        self.assertIsNone(manifest.reconcile()) # Still fresh
+        self.assertEqual(manifest.reconcile(force=True), {'added': 1, 'removed': 1, 'changed': 0})
+        self.assertIn('newspaper.pdf', manifest.lookup(date(2024, 1, 20)))
+        self.assertEqual(manifest.lookup(date(2024, 1, 2)), {})
+
+    def test_stale_manifest_is_reconciled_on_read(self):
+        manifest.reconcile()
+        manifest.get_manifest().reconciled_at = time.time() - 2 * 86400
+        self.bucket.keys = sorted(self.bucket.keys + ['pub/2024-02-01_newspaper.pdf'])
+        self.assertIn('newspaper.pdf', manifest.lookup(date(2024, 2, 1), prefix='pub/'))
+
+    def test_listing_failure_uses_the_last_copy(self):
+        manifest.reconcile()
+        manifest.get_manifest().reconciled_at = 0
+        with mock.patch.object(storage, 'iter_storage_objects', side_effect=storage.ClientError('offline')):
+            self.assertEqual(len(manifest.objects(since=date(2024, 1, 1))), 11)
+            manifest.reset()
+            os.remove(self.path)
+            with self.assertRaises(storage.ClientError):
+                manifest.objects()
+
+    def test_other_bucket_is_rebuilt(self):
+        manifest.reconcile()
+        self.values[('storage', 'bucket')] = 'other'
+        self.assertTrue(manifest.get_manifest().is_stale())
+        self.assertEqual(len(manifest.get_manifest()), 0)
+
+    def test_disabled_lists_the_bucket(self):
+        self.values[('manifest', 'enabled')] = False
+        self.assertEqual(list(manifest.lookup(date(2024, 1, 3))), ['newspaper.pdf'])
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
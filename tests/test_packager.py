@@ -0,0 +1,120 @@
+import gzip
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+import requests
+import packager
+import rate_limit
+
+PAGE = """<!DOCTYPE html><html><head><meta charset="iso-8859-1">
+<link rel="stylesheet" href="/css/site.css"><script src="/app.js"></script></head>
+<body style="background: url('img/bg.png')"><h1>Zeitung f\xfcr heute</h1>
+<img src="img/front.png" srcset="img/front.png 1x, img/front@2x.png 2x">
+<img src="/missing.png"><img src="data:image/gif;base64,R0lGOD">
+</body></html>"""
+
+ASSETS = {
+    '/css/site.css': ('text/css', b'@font-face { src: url(fonts/serif.woff2) } h1 { color: red }'),
+    '/css/fonts/serif.woff2': ('font/woff2', b'wOF2font'),
+    '/app.js': ('application/javascript', b'console.log(1)'),
+    '/edition/img/bg.png': ('image/png', b'\x89PNGbg'),
+    '/edition/img/front.png': ('image/png', b'\x89PNGfront'),
+    '/edition/img/front@2x.png': ('image/png', b'\x89PNGfront2x'),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    delay = 0.2
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        asset = ASSETS.get(self.path)
+        if asset is None or 'sid=abc' not in (self.headers.get('Cookie') or ''):
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        time.sleep(self.delay)
+        content_type, body = asset
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestPackageHtml(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.page_url = f"http://127.0.0.1:{cls.server.server_port}/edition/today.html"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.html_path = os.path.join(self.tmp.name, '2024-01-01_newspaper.html')
+        with open(self.html_path, 'wb') as f:
+            f.write(PAGE.encode('latin-1'))
+        values = {('rate_limit', 'requests_per_second'): 0, ('rate_limit', 'max_concurrent'): 8}
+        patch = mock.patch.object(packager.config.config, 'get', side_effect=lambda key, default=None: values.get(key, default))
+        patch.start()
+        self.addCleanup(patch.stop)
+        rate_limit.reset()
+        self.addCleanup(rate_limit.reset)
+        _Handler.requests = []
+        self.cookies = requests.cookies.cookiejar_from_dict({'sid': 'abc'})
+
+    def test_assets_are_inlined_into_one_gzip_file(self):
+        stats = {}
+        start = time.monotonic()
+        success, gzip_path = packager.package_html(self.html_path, self.page_url, cookies=self.cookies, stats=stats)
+        elapsed = time.monotonic() - start
+        self.assertTrue(success)
+        with gzip.open(gzip_path, 'rb') as f:
+            packaged = f.read()
+        with open(self.html_path, 'rb') as f:
+            self.assertEqual(f.read(), packaged)
+        html = packaged.decode('utf-8')
+        self.assertIn('Zeitung f\xfcr heute', html)
+        self.assertIn('charset="utf-8"', html)
+        for path in ('/css/site.css', '/app.js', 'img/bg.png', 'img/front.png', 'front@2x.png'):
+            self.assertNotIn(path, html)
+        self.assertIn('data:image/png;base64,', html)
+        self.assertIn('data:text/css;base64,', html)
+        # The font referenced by the stylesheet was fetched in the second round
+        self.assertIn('/css/fonts/serif.woff2', _Handler.requests)
+        # Unfetchable assets keep a working absolute link
+        self.assertIn(f"http://127.0.0.1:{self.server.server_port}/missing.png", html)
+        self.assertEqual(stats['assets'], 7)
+        self.assertEqual(stats['inlined'], 6)
+        self.assertEqual(stats['failed'], 1)
+        # Six 0.2s fetches in two concurrent rounds rather than back to back
+        self.assertLess(elapsed, 6 * _Handler.delay)
+
+    def test_edition_is_packaged_once_per_download(self):
+        with mock.patch.object(packager, 'package_html', wraps=packager.package_html) as package:
+            first = packager.package_edition(self.html_path, self.page_url, cookies=self.cookies)
+            second = packager.package_edition(self.html_path, self.page_url, cookies=self.cookies)
+        self.assertEqual(first, second)
+        self.assertEqual(package.call_count, 1)
+        self.assertEqual(packager.upload_source(self.html_path, 'html'),
+                         (first, {'ContentType': 'text/html; charset=utf-8', 'ContentEncoding': 'gzip'}))
+        self.assertEqual(packager.upload_source(self.html_path, 'pdf'), (self.html_path, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime
+from unittest import mock
+import main
+import publications
+
+
+class TestPublicationConfig(unittest.TestCase):
+    def _config(self, values):
+        return mock.patch.object(publications.config.config, 'get',
+                                 side_effect=lambda key, default=None: values.get(key, default))
+
+    def test_legacy_block_when_no_publications(self):
+        values = {('newspaper', 'url'): 'https://example.com/login', ('newspaper', 'username'): 'u'}
+        with self._config(values):
+            pubs = publications.load_publications()
+        self.assertEqual([p.name for p in pubs], ['default'])
+        self.assertEqual(pubs[0].storage_prefix, '')
+        self.assertFalse(pubs[0].isolated)
+        self.assertEqual(pubs[0].download_dir('downloads'), 'downloads')
+
+    def test_entries_inherit_shared_settings_and_get_own_state(self):
+        values = {
+            ('publications',): [
+                {'name': 'daily', 'url': 'https://daily.example.com/', 'username': '${DAILY_USER}', 'password': 'p'},
+                {'name': 'weekly', 'url': 'https://weekly.example.com/', 'selectors': {'username': '#email'},
+                 'recipients': ['a@example.com'], 'schedule': '06:00'},
+            ],
+            ('newspaper',): {'user_agent': 'UA', 'selectors': {'username': '#user', 'submit': '#go'}},
+        }
+        with self._config(values), mock.patch.dict(os.environ, {'DAILY_USER': 'alice'}):
+            daily, weekly = publications.load_publications()
+        self.assertEqual(daily.username, 'alice')
+        self.assertEqual(daily.user_agent, 'UA')
+        self.assertEqual(daily.username_selector, '#user')
+        self.assertEqual(weekly.username_selector, '#email')
+        self.assertEqual(weekly.submit_selector, '#go')
+        self.assertEqual(weekly.recipients, ['a@example.com'])
+        self.assertEqual(daily.storage_prefix, 'daily/')
+        self.assertEqual(daily.download_dir('downloads'), os.path.join('downloads', 'daily'))
+        self.assertNotEqual(daily.session_cache_path, weekly.session_cache_path)
+        self.assertNotEqual(daily.release_history_path, weekly.release_history_path)
+        self.assertNotEqual(daily.status_path, weekly.status_path)
+        self.assertIsNot(daily.http(), weekly.http())
+        self.assertIsNot(daily.http().cookies, weekly.http().cookies)
+
+    def test_invalid_entries_are_rejected(self):
+        for entries in ([{'url': 'https://x/'}], [{'name': 'a'}],
+                        [{'name': 'a', 'url': 'https://x/'}, {'name': 'a', 'url': 'https://y/'}]):
+            with self._config({('publications',): entries}), self.assertRaises(ValueError):
+                publications.load_publications()
+
+    def test_select(self):
+        pubs = [publications.Publication('a', 'https://a/'), publications.Publication('b', 'https://b/')]
+        self.assertEqual([p.name for p in publications.select(pubs, ['b'])], ['b'])
+        self.assertEqual(len(publications.select(pubs)), 2)
+        with self.assertRaises(ValueError):
+            publications.select(pubs, ['c'])
+
+    def test_waits_for_schedule(self):
+        pub = publications.Publication('a', 'https://a/', schedule='06:00')
+        sleep = mock.Mock()
+        waited = publications._wait_for_schedule(pub, date(2024, 1, 1), sleep=sleep,
+                                                 now=lambda: datetime(2024, 1, 1, 5, 59))
+        self.assertEqual(waited, 60)
+        sleep.assert_called_once_with(60)
+
+
+class TestRunPublications(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patch = mock.patch.object(publications, 'REPORT_FILE', os.path.join(self.tmp.name, 'report.json'))
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_titles_run_concurrently(self):
+        pubs = [publications.Publication(name, f"https://{name}.example.com/") for name in ('a', 'b', 'c')]
+        delays = {'a': 0.3, 'b': 0.3, 'c': 0.1}
+        threads = set()
+
+        def fake_main(date_str, dry_run=False, force_download=False, publication=None):
+            threads.add(threading.get_ident())
+            time.sleep(delays[publication.name])
+            return publication.name != 'c'
+
+        with mock.patch.object(publications, 'load_publications', return_value=pubs), \
+                mock.patch.object(main, 'main', side_effect=fake_main):
+            report = publications.run_publications('2024-01-01', max_workers=3)
+        self.assertEqual([r['name'] for r in report['publications']], ['a', 'b', 'c'])
+        self.assertEqual(report['succeeded'], 2)
+        self.assertEqual(len(threads), 3)
+        # Wall time is close to the slowest title, not the sum
+        self.assertLess(report['elapsed_seconds'], 0.6)
+        self.assertGreaterEqual(report['sequential_seconds'], 0.6)
+        self.assertTrue(os.path.exists(publications.REPORT_FILE))
+
+    def test_failing_title_does_not_stop_others(self):
+        pubs = [publications.Publication('a', 'https://a/'), publications.Publication('b', 'https://b/')]
+
+        def fake_main(date_str, dry_run=False, force_download=False, publication=None):
+            if publication.name == 'a':
+                raise RuntimeError('boom')
+            return True
+
+        with mock.patch.object(publications, 'load_publications', return_value=pubs), \
+                mock.patch.object(main, 'main', side_effect=fake_main):
+            report = publications.run_publications('2024-01-01')
+        self.assertEqual([r['success'] for r in report['publications']], [False, True])
+
+    def test_workers_shut_down_their_own_browser_pools(self):
+        pubs = [publications.Publication(name, f"https://{name}.example.com/") for name in ('a', 'b')]
+        started, closed = {}, {}
+
+        def fake_main(date_str, dry_run=False, force_download=False, publication=None):
+            started[id(publications.browser_pool.get_pool())] = threading.get_ident()
+            return True
+
+        def shutdown(pool):
+            closed[id(pool)] = threading.get_ident()
+
+        with mock.patch.object(publications, 'load_publications', return_value=pubs), \
+                mock.patch.object(main, 'main', side_effect=fake_main), \
+                mock.patch.object(publications.browser_pool.BrowserPool, 'shutdown', autospec=True, side_effect=shutdown):
+            publications.run_publications('2024-01-01', max_workers=2)
+        self.assertEqual(closed, started)
+
+
+class TestStorageNamespace(unittest.TestCase):
+    def test_keys_are_split_by_prefix(self):
+        self.assertEqual(main._in_namespace('2024-01-01_newspaper.pdf'), '2024-01-01_newspaper.pdf')
+        self.assertIsNone(main._in_namespace('daily/2024-01-01_newspaper.pdf'))
+        self.assertEqual(main._in_namespace('daily/2024-01-01_newspaper.pdf', 'daily/'), '2024-01-01_newspaper.pdf')
+        self.assertIsNone(main._in_namespace('weekly/2024-01-01_newspaper.pdf', 'daily/'))
+
+
+if __name__ == '__main__':
+    unittest.main()
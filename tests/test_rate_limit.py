@@ -0,0 +1,139 @@
+import time
+import threading
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+import rate_limit
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_delta_seconds(self):
+        self.assertEqual(rate_limit.parse_retry_after('120'), 120.0)
+
+    def test_http_date(self):
+        now = datetime(2015, 10, 21, 7, 27, 0, tzinfo=timezone.utc)
+        self.assertEqual(rate_limit.parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', now=now), 60.0)
+
+    def test_past_date_and_garbage(self):
+        now = datetime(2015, 10, 21, 8, 0, 0, tzinfo=timezone.utc)
+        self.assertEqual(rate_limit.parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', now=now), 0.0)
+        self.assertIsNone(rate_limit.parse_retry_after('soon'))
+        self.assertIsNone(rate_limit.parse_retry_after(None))
+
+    def test_capped(self):
+        self.assertEqual(rate_limit.parse_retry_after('86400'), rate_limit.MAX_RETRY_AFTER)
+
+
+class TestBackoff(unittest.TestCase):
+    def test_jittered_within_bounds(self):
+        for attempt in range(6):
+            delay = rate_limit.backoff_delay(attempt, base=2, cap=30)
+            ceiling = min(30, 2 * 2 ** attempt)
+            self.assertGreaterEqual(delay, ceiling / 2)
+            self.assertLessEqual(delay, ceiling)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_paced(self):
+        clock = _Clock()
+        bucket = rate_limit.TokenBucket(rate=2, capacity=2, clock=clock)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+        self.assertAlmostEqual(bucket.reserve(), 1.0)
+        clock.now += 10
+        self.assertEqual(bucket.reserve(), 0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold_and_recovers(self):
+        clock = _Clock()
+        breaker = rate_limit.CircuitBreaker(failure_threshold=3, reset_timeout=60, clock=clock)
+        for _ in range(3):
+            self.assertEqual(breaker.allow(), 0)
+            breaker.record_failure()
+        self.assertEqual(breaker.state, breaker.OPEN)
+        self.assertGreater(breaker.allow(), 0)
+        clock.now += 61
+        self.assertEqual(breaker.allow(), 0)  # Trial request
+        self.assertGreater(breaker.allow(), 0)  # Only one trial at a time
+        breaker.record_success()
+        self.assertEqual(breaker.state, breaker.CLOSED)
+
+    def test_failed_trial_reopens(self):
+        clock = _Clock()
+        breaker = rate_limit.CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now += 11
+        self.assertEqual(breaker.allow(), 0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, breaker.OPEN)
+
+
+class TestHostPolicy(unittest.TestCase):
+    def test_try_acquire_never_waits(self):
+        policy = rate_limit.HostPolicy('example.com', rate=0, max_concurrent=2)
+        policy.acquire()
+        self.assertTrue(policy.try_acquire())
+        self.assertFalse(policy.try_acquire())
+        policy.release()
+        self.assertTrue(policy.try_acquire())
+
+    def test_limits_concurrency(self):
+        policy = rate_limit.HostPolicy('example.com', rate=0, max_concurrent=2)
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def work():
+            with policy.slot():
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(peak[0], 2)
+
+    def test_retry_after_pauses_other_callers(self):
+        clock = _Clock()
+        policy = rate_limit.HostPolicy('example.com', rate=100, burst=10, clock=clock, sleep=clock.sleep)
+        response = mock.Mock(headers={'Retry-After': '30'})
+        self.assertEqual(policy.retry_delay(response, 0), 30)
+        with policy.slot():
+            pass
+        self.assertEqual(clock.now, 30)
+
+    def test_open_circuit_refuses_requests(self):
+        policy = rate_limit.HostPolicy('example.com', failure_threshold=2)
+        policy.record(503)
+        policy.record(429)  # Throttling is not a server failure
+        policy.record(502)
+        with self.assertRaises(rate_limit.CircuitOpenError):
+            policy.acquire()
+
+    def test_for_url_shares_policy_per_host(self):
+        rate_limit.reset()
+        self.addCleanup(rate_limit.reset)
+        a = rate_limit.for_url('https://example.com/a')
+        self.assertIs(a, rate_limit.for_url('https://EXAMPLE.com/b'))
+        self.assertIsNot(a, rate_limit.for_url('https://other.org/'))
+
+
+if __name__ == "__main__":
+    unittest.main()
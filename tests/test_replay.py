@@ -0,0 +1,190 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from unittest import mock
+import config
+import rate_limit
+import replay
+import run_newspaper
+import website
+
+BODY = b'%PDF-1.4\n' + b'x' * 100000
+PDF = BODY + b'xref\n0 1\n0000000000 65535 f \ntrailer\n<< /Size 1 >>\nstartxref\n%d\n%%%%EOF\n' % len(BODY)
+LOGIN_PAGE = b"""<html><body><form action="/session" method="post">
+  <input type="hidden" name="csrf" value="tok">
+  <input id="username" name="user"><input id="password" name="pass" type="password">
+  <button id="login-btn" type="submit">Log in</button>
+</form></body></html>"""
+
+
+class _Publisher(BaseHTTPRequestHandler):
+    """The real site for recording: a form login, an account page and one edition."""
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/login':
+            self._send(200, LOGIN_PAGE, [('Content-Type', 'text/html')])
+        elif self.path == '/account':
+            self._send(200, b'<a id="user-profile-link">alice@example.com</a>', [('Content-Type', 'text/html')])
+        elif self.path == '/edition/2024-01-01' and 'sid=s3cr3t-session' in (self.headers.get('Cookie') or ''):
+            self._send(200, PDF, [('Content-Type', 'application/pdf'), ('ETag', '"v1"'), ('Accept-Ranges', 'bytes')])
+        else:
+            self._send(403, b'forbidden')
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        if form.get('user') == ['alice@example.com'] and form.get('pass') == ['hunter2!']:
+            self._send(303, b'', [('Location', f"http://127.0.0.1:{self.server.server_port}/account"),
+                                  ('Set-Cookie', 'sid=s3cr3t-session; Path=/; HttpOnly')])
+        else:
+            self._send(200, b'<div class="login-error">Bad credentials</div>', [('Content-Type', 'text/html')])
+
+
+class TestRecordReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cassette_path = os.path.join(self.tmp.name, 'cassette.json')
+        values = {('rate_limit', 'requests_per_second'): 0, ('rate_limit', 'max_retries'): 3,
+                  ('rate_limit', 'backoff_base_seconds'): 0}
+        for patch in (mock.patch.object(website.config.config, 'get', side_effect=lambda key, default=None: values.get(key, default)),
+                      mock.patch.object(website.session_cache, 'load_cookies', return_value=None),
+                      mock.patch.object(website.session_cache, 'save_cookies')):
+            patch.start()
+            self.addCleanup(patch.stop)
+        rate_limit.reset()
+        self.addCleanup(rate_limit.reset)
+        publisher = ThreadingHTTPServer(('127.0.0.1', 0), _Publisher)
+        threading.Thread(target=publisher.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{publisher.server_port}/"
+        self.site = website.publications.Publication(
+            'test', base_url, login_url=base_url + 'login', login_strategy='requests',
+            session_probe_url=base_url + 'account', download_path='edition/{date}',
+            selectors={'username': '#username', 'password': '#password', 'submit': '#login-btn',
+                       'login_success': '#user-profile-link', 'login_success_url': ''})
+        with replay.recording(self.cassette_path, secrets=['alice@example.com', 'hunter2!']):
+            result = self._acquire(self.site, 'recorded')
+        publisher.shutdown()
+        publisher.server_close()
+        self.assertTrue(result['success'])
+        self.cassette = replay.load(self.cassette_path)
+
+    def _acquire(self, site, name):
+        return website.acquire_edition(site.url, 'alice@example.com', 'hunter2!',
+                                       os.path.join(self.tmp.name, name), target_date='2024-01-01', publication=site)
+
+    def _replay(self, **options):
+        server = replay.ReplayServer(self.cassette, **options).start()
+        self.addCleanup(server.stop)
+        return server, replay.rebase(self.site, server.url, self.cassette)
+
+    def test_cassette_is_scrubbed(self):
+        with open(self.cassette_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        for secret in ('hunter2', 'alice@example.com', 'alice%40example.com', 's3cr3t-session'):
+            self.assertNotIn(secret, text)
+        methods = [(i['request']['method'], replay._path(i['request']['url'])) for i in self.cassette['interactions']]
+        self.assertIn(('POST', '/session'), methods)
+        self.assertIn(('GET', '/edition/2024-01-01'), methods)
+
+    def test_replayed_run_matches_the_recording(self):
+        server, site = self._replay()
+        result = self._acquire(site, 'replayed')
+        self.assertTrue(result['success'])
+        self.assertEqual(result['login']['strategy'], 'requests')
+        with open(result['path'], 'rb') as f:
+            self.assertEqual(f.read(), PDF)
+        self.assertEqual(server.stats['unmatched'], 0)
+
+    def test_injected_errors_are_retried(self):
+        server, site = self._replay(errors={'/edition/2024-01-01': [503, 503]})
+        result = self._acquire(site, 'retried')
+        self.assertTrue(result['success'])
+        self.assertEqual(server.stats['injected_errors'], 2)
+
+    def test_latency_and_bandwidth(self):
+        server, site = self._replay(latency=0.05, bandwidth=250000)
+        start = time.monotonic()
+        result = self._acquire(site, 'throttled')
+        self.assertTrue(result['success'])
+        # ~100 KB at 250 KB/s, plus the latency of every request
+        self.assertGreater(time.monotonic() - start, len(PDF) / 250000)
+
+    def test_ranges_are_served_from_recorded_bodies(self):
+        server, site = self._replay()
+        session = site.http()
+        response = session.get(server.url + 'edition/2024-01-01', headers={'Range': 'bytes=10-19', 'If-Range': '"v1"'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, PDF[10:20])
+        self.assertEqual(response.headers['Content-Range'], f"bytes 10-19/{len(PDF)}")
+
+
+class TestRecordFromCli(unittest.TestCase):
+    """`run_newspaper.py --record-http` with the credentials only in config.yaml."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cassette_path = os.path.join(self.tmp.name, 'cassette.json')
+        saved = (config.config._config, config.config._loaded)
+        self.addCleanup(lambda: (setattr(config.config, '_config', saved[0]), setattr(config.config, '_loaded', saved[1])))
+        publisher = ThreadingHTTPServer(('127.0.0.1', 0), _Publisher)
+        threading.Thread(target=publisher.serve_forever, daemon=True).start()
+        self.addCleanup(publisher.server_close)
+        self.addCleanup(publisher.shutdown)
+        self.login_url = f"http://127.0.0.1:{publisher.server_port}/session"
+
+    def _main_entry(self, credentials):
+        config_path = os.path.join(self.tmp.name, 'config.yaml')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump({'newspaper': dict({'url': self.login_url}, **credentials)}, f)
+
+        def run(args):
+            # Stands in for the pipeline: one login POST through `requests`
+            import requests
+            requests.post(self.login_url, data={'user': 'alice@example.com', 'pass': 'hunter2!'}, allow_redirects=False)
+
+        env = {'NEWSPAPER_CONFIG': config_path, 'NEWSPAPER_ENV': os.path.join(self.tmp.name, '.env')}
+        with mock.patch.dict(os.environ, env), \
+                mock.patch('sys.argv', ['run_newspaper.py', '--record-http', self.cassette_path]), \
+                mock.patch.object(run_newspaper, 'setup_logging'), \
+                mock.patch.object(run_newspaper, 'run', side_effect=run) as run_mock:
+            run_newspaper.main_entry()
+        return run_mock
+
+    def test_credentials_from_config_file_are_scrubbed(self):
+        run_mock = self._main_entry({'username': 'alice@example.com', 'password': 'hunter2!'})
+        run_mock.assert_called_once()
+        with open(self.cassette_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        self.assertIn('/session', text)
+        for secret in ('hunter2', 'alice@example.com', 'alice%40example.com'):
+            self.assertNotIn(secret, text)
+
+    def test_refuses_to_record_without_credentials(self):
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('NEWSPAPER_USERNAME', None)
+            os.environ.pop('NEWSPAPER_PASSWORD', None)
+            with self.assertRaises(SystemExit) as raised:
+                self._main_entry({})
+        self.assertEqual(raised.exception.code, 2)
+        self.assertFalse(os.path.exists(self.cassette_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import time
+import tempfile
+import unittest
+import session_cache
+
+
+@unittest.skipUnless(session_cache.CRYPTOGRAPHY_AVAILABLE, "cryptography not installed")
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'session')
+        self.cookies = [{'name': 'sid', 'value': 'abc', 'domain': 'example.com', 'path': '/', 'expires': -1}]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        self.assertTrue(session_cache.save_cookies(self.cookies, 'user', 'pw', 'https://example.com/login', path=self.path))
+        loaded = session_cache.load_cookies('user', 'pw', 'https://example.com/login', path=self.path)
+        self.assertEqual(loaded, self.cookies)
+
+    def test_file_is_encrypted(self):
+        session_cache.save_cookies(self.cookies, 'user', 'pw', 'https://example.com/login', path=self.path)
+        with open(self.path, 'rb') as f:
+            self.assertNotIn(b'abc', f.read())
+
+    def test_key_is_salted_per_file(self):
+        other = os.path.join(self.tmp.name, 'other')
+        session_cache.save_cookies(self.cookies, 'user', 'pw', 'https://example.com/login', path=self.path)
+        session_cache.save_cookies(self.cookies, 'user', 'pw', 'https://example.com/login', path=other)
+        with open(self.path, 'rb') as f, open(other, 'rb') as g:
+            first, second = f.read(), g.read()
+        self.assertTrue(first.startswith(session_cache.FILE_MAGIC))
+        salt = slice(len(session_cache.FILE_MAGIC), len(session_cache.FILE_MAGIC) + session_cache.SALT_BYTES)
+        self.assertNotEqual(first[salt], second[salt])
+
+    def test_older_format_ignored(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'gAAAAAB-unsalted-token')
+        self.assertIsNone(session_cache.load_cookies('user', 'pw', 'https://example.com/login', path=self.path))
+
+    def test_wrong_credentials_ignored(self):
+        session_cache.save_cookies(self.cookies, 'user', 'pw', 'https://example.com/login', path=self.path)
+        self.assertIsNone(session_cache.load_cookies('user', 'other', 'https://example.com/login', path=self.path))
+
+    def test_expired_cookie_ignored(self):
+        cookies = [dict(self.cookies[0], expires=time.time() - 10)]
+        session_cache.save_cookies(cookies, 'user', 'pw', 'https://example.com/login', path=self.path)
+        self.assertIsNone(session_cache.load_cookies('user', 'pw', 'https://example.com/login', path=self.path))
+
+    def test_expiry_capped_by_max_age(self):
+        now = 1000.0
+        expiry = session_cache.cookies_expiry([{'expires': now + 10 * 86400}], max_age_hours=1, now=now)
+        self.assertEqual(expiry, now + 3600)
+
+    def test_clear(self):
+        session_cache.save_cookies(self.cookies, 'user', 'pw', 'https://example.com/login', path=self.path)
+        session_cache.clear(path=self.path)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,13 @@
+import os
+import tempfile
+import threading
 import unittest
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from unittest import mock
+from botocore.exceptions import ClientError as BotoClientError
+import manifest
 import storage
 
 class TestStorage(unittest.TestCase):
@@ -16,5 +25,267 @@ class TestStorage(unittest.TestCase):
             url = storage.get_file_url(files[0])
             self.assertTrue(url.startswith('http'))
 
+class FakeBucket:
+    """list_objects_v2 over `keys` with small pages, recording every call; uploads and deletes change `keys`."""
+
+    def __init__(self, keys, page_size=3):
+        self.keys, self.page_size, self.calls = keys, page_size, []
+        self.lock = threading.Lock()
+
+    def list_objects_v2(self, Bucket, Prefix='', MaxKeys=1000, StartAfter='', ContinuationToken=None):
+        self.calls.append({'StartAfter': StartAfter, 'ContinuationToken': ContinuationToken})
+        keys = [k for k in self.keys if k.startswith(Prefix) and k > (ContinuationToken or StartAfter)]
+        page = keys[:min(MaxKeys, self.page_size)]
+        resp = {'Contents': [{'Key': k, 'Size': 1, 'ETag': '"e"'} for k in page], 'IsTruncated': len(keys) > len(page)}
+        if resp['IsTruncated']:
+            resp['NextContinuationToken'] = page[-1]
+        return resp
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None, Callback=None, Config=None):
+        self.keys = sorted(set(self.keys) | {key})
+
+    def delete_object(self, Bucket, Key):
+        self.keys = [k for k in self.keys if k != Key]
+
+    def delete_objects(self, Bucket, Delete):
+        requested = [obj['Key'] for obj in Delete['Objects']]
+        self.calls.append({'Delete': requested})
+        denied = [key for key in requested if key.startswith('locked/')]
+        with self.lock: # Batches arrive from several threads
+            self.keys = [k for k in self.keys if k not in requested or k in denied]
+        return {'Errors': [{'Key': key, 'Code': 'AccessDenied', 'Message': 'Access Denied'} for key in denied]}
+
+class TestIterStorageObjects(unittest.TestCase):
+    def _list(self, keys, **kwargs):
+        bucket = FakeBucket(keys)
+        with mock.patch.object(storage, '_get_s3_client', return_value=bucket):
+            return [obj['key'] for obj in storage.iter_storage_objects(**kwargs)], bucket.calls
+
+    def test_follows_continuation_tokens(self):
+        keys = [f"2024-01-{day:02d}_newspaper.pdf" for day in range(1, 11)]
+        listed, calls = self._list(keys)
+        self.assertEqual(listed, keys)
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(calls[1]['ContinuationToken'], keys[2])
+
+    def test_date_window_and_prefix(self):
+        keys = sorted([f"pub/2024-01-{day:02d}_newspaper.pdf" for day in range(1, 11)] + ['pub/notes.txt', '2024-01-05_newspaper.pdf'])
+        listed, calls = self._list(keys, prefix='pub/', since=date(2024, 1, 4), until=date(2024, 1, 6))
+        self.assertEqual(listed, [f"pub/2024-01-{day:02d}_newspaper.pdf" for day in (4, 5, 6)])
+        self.assertEqual(calls[0]['StartAfter'], 'pub/2024-01-03~')
+        self.assertEqual(len(calls), 2) # The pages after 2024-01-06 are never fetched
+
+    def test_yields_object_metadata(self):
+        with mock.patch.object(storage, '_get_s3_client', return_value=FakeBucket(['a'])):
+            self.assertEqual(next(storage.iter_storage_objects()), {'key': 'a', 'size': 1, 'etag': '"e"', 'last_modified': None})
+
+    def test_errors_raise(self):
+        client = mock.Mock(list_objects_v2=mock.Mock(side_effect=BotoClientError({'Error': {'Code': '403'}}, 'ListObjectsV2')))
+        with mock.patch.object(storage, '_get_s3_client', return_value=client), self.assertRaises(storage.ClientError):
+            list(storage.iter_storage_objects())
+
+class TestDeleteMany(unittest.TestCase):
+    def setUp(self):
+        self.keys = [f"2020-{i // 28 + 1:02d}-{i % 28 + 1:02d}_newspaper.pdf" for i in range(250)]
+        self.bucket = FakeBucket(self.keys + ['keep.pdf', 'locked/a.pdf'])
+        for patch in (mock.patch.object(storage, '_get_s3_client', return_value=self.bucket),
+                      mock.patch.object(manifest, 'record_deletes')):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_batches_run_in_parallel(self):
+        deleted, errors = storage.delete_many(self.keys, batch_size=100, max_workers=3)
+        self.assertEqual(sorted(deleted), sorted(self.keys))
+        self.assertEqual(errors, {})
+        self.assertEqual(sorted(len(c['Delete']) for c in self.bucket.calls), [50, 100, 100])
+        self.assertEqual(self.bucket.keys, ['keep.pdf', 'locked/a.pdf'])
+
+    def test_batch_size_is_capped_at_the_s3_limit(self):
+        keys = [f"k{i:05d}" for i in range(2500)]
+        self.bucket.keys = list(keys)
+        storage.delete_many(keys, batch_size=5000)
+        self.assertEqual(sorted(len(c['Delete']) for c in self.bucket.calls), [500, 1000, 1000])
+
+    def test_errors_are_reported_per_key(self):
+        deleted, errors = storage.delete_many(['locked/a.pdf', 'keep.pdf'])
+        self.assertEqual(deleted, ['keep.pdf'])
+        self.assertEqual(errors, {'locked/a.pdf': 'AccessDenied: Access Denied'})
+        manifest.record_deletes.assert_called_once_with(['keep.pdf'])
+
+    def test_failed_request_marks_its_keys(self):
+        self.bucket.delete_objects = mock.Mock(side_effect=BotoClientError({'Error': {'Code': 'SlowDown'}}, 'DeleteObjects'))
+        deleted, errors = storage.delete_many(['a', 'b'])
+        self.assertEqual(deleted, [])
+        self.assertEqual(sorted(errors), ['a', 'b'])
+
+    def test_dry_run(self):
+        deleted, errors = storage.delete_many(self.keys[:3], dry_run=True)
+        self.assertEqual((deleted, errors), (self.keys[:3], {}))
+        self.assertEqual(self.bucket.calls, [])
+
+class _FakeS3(BaseHTTPRequestHandler):
+    """Just enough of the S3 API for upload_file: PutObject and multipart uploads. Part 2 fails once."""
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b'', headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_PUT(self):
+        state, query = self.server.state, parse_qs(urlparse(self.path).query, keep_blank_values=True)
+        body = self._body()
+        if 'partNumber' not in query:
+            state['objects'][urlparse(self.path).path] = body
+            return self._reply(200, headers=[('ETag', '"put"')])
+        part = int(query['partNumber'][0])
+        with state['lock']:
+            state['part_requests'].append(part)
+            fail = part == 2 and part not in state['failed']
+            state['failed'].add(part)
+        if fail:
+            return self._reply(500, b'<Error><Code>InternalError</Code><Message>try again</Message></Error>')
+        state['parts'][part] = body
+        self._reply(200, headers=[('ETag', f'"part{part}"')])
+
+    def do_POST(self):
+        state, query = self.server.state, parse_qs(urlparse(self.path).query, keep_blank_values=True)
+        self._body()
+        key = urlparse(self.path).path
+        if 'uploads' in query:
+            state['creates'] += 1
+            return self._reply(200, b'<InitiateMultipartUploadResult><Bucket>papers</Bucket>'
+                                    b'<Key>k</Key><UploadId>upload-1</UploadId></InitiateMultipartUploadResult>')
+        state['objects'][key] = b''.join(state['parts'][n] for n in sorted(state['parts']))
+        self._reply(200, b'<CompleteMultipartUploadResult><Bucket>papers</Bucket><Key>k</Key>'
+                         b'<ETag>"done"</ETag></CompleteMultipartUploadResult>')
+
+class TestMultipartUpload(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeS3)
+        self.server.state = {'objects': {}, 'parts': {}, 'part_requests': [], 'failed': set(),
+                             'creates': 0, 'lock': threading.Lock()}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        values = {('storage', 'endpoint_url'): f"http://127.0.0.1:{self.server.server_port}",
+                  ('storage', 'access_key_id'): 'id', ('storage', 'secret_access_key'): 'secret',
+                  ('storage', 'region'): 'us-east-1', ('storage', 'bucket'): 'papers',
+                  ('storage', 'multipart_threshold_mb'): 5, ('storage', 'multipart_chunksize_mb'): 1,
+                  ('storage', 'upload_concurrency'): 3, ('manifest', 'enabled'): False}
+        patch = mock.patch.object(storage.config.config, 'get', side_effect=lambda key, default=None: values.get(key, default))
+        patch.start()
+        self.addCleanup(patch.stop)
+        storage.reset_client()
+        self.addCleanup(storage.reset_client)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'edition.pdf')
+
+    def _file(self, size):
+        data = os.urandom(size)
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        return data
+
+    def test_failed_part_is_retried_alone(self):
+        data = self._file(12 * 1024 * 1024)
+        reports = []
+        self.assertTrue(storage.upload_to_storage(self.path, '2024-01-01_newspaper.pdf',
+                                                  progress=lambda *args: reports.append(args)))
+        state = self.server.state
+        self.assertEqual(state['objects']['/papers/2024-01-01_newspaper.pdf'], data)
+        self.assertEqual(state['creates'], 1) # Never restarted
+        # Part size is raised to the 5 MB minimum: 5 + 5 + 2 MB, and part 2 sent twice
+        self.assertEqual(sorted(state['part_requests']), [1, 2, 2, 3])
+        self.assertEqual(reports[-1][:2], (len(data), len(data)))
+        self.assertTrue(all(0 <= sent <= total for sent, total, _, _ in reports))
+        self.assertGreater(reports[-1][2], 0)
+
+    def test_small_files_use_one_request(self):
+        data = self._file(1024)
+        self.assertTrue(storage.upload_to_storage(self.path, 'small.pdf'))
+        self.assertEqual(self.server.state['objects']['/papers/small.pdf'], data)
+        self.assertEqual(self.server.state['creates'], 0)
+
+class TestUploadProgress(unittest.TestCase):
+    def test_rate_and_eta(self):
+        now = [0.0]
+        reports = []
+        progress = storage.UploadProgress(100, lambda *args: reports.append(args), interval=1.0, clock=lambda: now[0])
+        now[0] = 2.0
+        progress(40)
+        now[0] = 2.5
+        progress(10) # Within the interval: not reported
+        now[0] = 4.0
+        progress(-10) # A part being retried rewinds
+        now[0] = 5.0
+        progress(60)
+        self.assertEqual(reports, [(40, 100, 20.0, 3.0), (40, 100, 10.0, 6.0), (100, 100, 20.0, 0.0)])
+
+class TestFindObject(unittest.TestCase):
+    def _client(self, **kwargs):
+        return mock.patch.object(storage, '_get_s3_client', return_value=mock.Mock(head_object=mock.Mock(**kwargs)))
+
+    def test_existing_object(self):
+        with self._client(return_value={'ContentLength': 5, 'ETag': '"e"'}):
+            found = storage.find_object('2024-01-01_newspaper.pdf')
+        self.assertEqual(found['size'], 5)
+        self.assertEqual(found['key'], '2024-01-01_newspaper.pdf')
+
+    def test_missing_object(self):
+        error = BotoClientError({'Error': {'Code': '404'}}, 'HeadObject')
+        with self._client(side_effect=error):
+            self.assertIsNone(storage.find_object('2024-01-01_newspaper.pdf'))
+
+    def test_other_errors_raise(self):
+        error = BotoClientError({'Error': {'Code': '403'}}, 'HeadObject')
+        with self._client(side_effect=error), self.assertRaises(storage.ClientError):
+            storage.find_object('2024-01-01_newspaper.pdf')
+
+class TestClientCache(unittest.TestCase):
+    def setUp(self):
+        self.values = {('storage', 'endpoint_url'): 'https://r2.example.com', ('storage', 'access_key_id'): 'id',
+                       ('storage', 'secret_access_key'): 'secret', ('storage', 'max_pool_connections'): 32}
+        patch = mock.patch.object(storage.config.config, 'get',
+                                  side_effect=lambda key, default=None: self.values.get(key, default))
+        patch.start()
+        self.addCleanup(patch.stop)
+        storage.reset_client()
+        self.addCleanup(storage.reset_client)
+
+    def test_client_is_shared_and_tuned(self):
+        client = storage._get_s3_client()
+        self.assertIs(storage._get_s3_client(), client)
+        self.assertEqual(client.meta.config.max_pool_connections, 32)
+        self.assertEqual(client.meta.config.retries['mode'], 'standard')
+        self.assertEqual(client.meta.endpoint_url, 'https://r2.example.com')
+
+    def test_client_is_rebuilt_when_config_changes(self):
+        client = storage._get_s3_client()
+        self.values[('storage', 'endpoint_url')] = 'https://other.example.com'
+        rebuilt = storage._get_s3_client()
+        self.assertIsNot(rebuilt, client)
+        self.assertEqual(rebuilt.meta.endpoint_url, 'https://other.example.com')
+
+    def test_threads_share_one_client(self):
+        clients = []
+        with mock.patch.object(storage, 'create_s3_client', wraps=storage.create_s3_client) as create:
+            threads = [threading.Thread(target=lambda: clients.append(storage._get_s3_client())) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(len({id(c) for c in clients}), 1)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import downloader
+import validation
+
+
+def _pdf(body=b'', startxref=None):
+    head = b'%PDF-1.7\n' + body
+    offset = len(head) if startxref is None else startxref
+    return head + b'xref\n0 1\n0000000000 65535 f \ntrailer\n<< /Size 1 >>\nstartxref\n%d\n%%%%EOF\n' % offset
+
+
+def _html(body='', charset='utf-8'):
+    return (f'<!DOCTYPE html><html><head><meta charset="{charset}"></head><body>'
+            + body + 'x' * 4096 + '</body></html>')
+
+
+def _feed(validator, data, chunk=7):
+    for i in range(0, len(data), chunk):
+        validator.feed(data[i:i + chunk])
+
+
+class TestPdfValidator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'edition.pdf')
+
+    def _check(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        validation.PdfValidator().check_file(self.path, chunk_size=7)
+
+    def test_well_formed_pdf_passes(self):
+        self._check(_pdf(b'1 0 obj\n<< >>\nendobj\n' * 500))
+
+    def test_html_body_fails_on_first_chunk(self):
+        validator = validation.PdfValidator()
+        with self.assertRaises(validation.ValidationError) as ctx:
+            validator.feed(b'<!DOCTYPE html><html><body>Please log in</body></html>')
+        self.assertIn('HTML', str(ctx.exception))
+        self.assertFalse(ctx.exception.resumable)
+
+    def test_truncated_pdf_fails(self):
+        with self.assertRaises(validation.ValidationError) as ctx:
+            self._check(_pdf(b'x' * 5000)[:-200])
+        self.assertIn('%%EOF', str(ctx.exception))
+
+    def test_startxref_must_point_at_xref(self):
+        with self.assertRaises(validation.ValidationError):
+            self._check(_pdf(b'x' * 5000, startxref=100))
+
+
+class TestHtmlValidator(unittest.TestCase):
+    def _run(self, data, content_type=None, min_size=validation.DEFAULT_MIN_HTML_BYTES):
+        validator = validation.HtmlValidator(content_type, min_size)
+        _feed(validator, data)
+        validator.finish(None)
+
+    def test_well_formed_html_passes(self):
+        self._run(_html('Zeitung für Sie').encode('utf-8'))
+
+    def test_undersized_page_fails(self):
+        with self.assertRaises(validation.ValidationError):
+            self._run(b'<html><body>Error</body></html>')
+
+    def test_wrong_charset_fails(self):
+        with self.assertRaises(validation.ValidationError) as ctx:
+            self._run(_html('Zeitung für Sie').encode('latin-1'), content_type='text/html; charset=utf-8')
+        self.assertIn('utf-8', str(ctx.exception))
+
+    def test_meta_charset_is_used_without_header(self):
+        self._run(_html('Zeitung für Sie', charset='iso-8859-1').encode('latin-1'))
+
+    def test_pdf_body_fails(self):
+        with self.assertRaises(validation.ValidationError):
+            self._run(_pdf(b'x' * 5000))
+
+
+class TestStreamingValidation(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.final = os.path.join(self.tmp.name, 'edition.pdf')
+
+    def test_bad_payload_never_reaches_final_path(self):
+        writer = downloader.AtomicFileWriter(self.final, validator=validation.PdfValidator())
+        with self.assertRaises(validation.ValidationError):
+            with writer:
+                writer.write(_pdf(b'x' * 5000)[:-200])
+                writer.commit()
+        self.assertFalse(os.path.exists(self.final))
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_validate_file(self):
+        with open(self.final, 'wb') as f:
+            f.write(b'<html></html>')
+        ok, reason = validation.validate_file(self.final, 'pdf')
+        self.assertFalse(ok)
+        self.assertTrue(reason)
+        with mock.patch.object(validation.config.config, 'get', side_effect=lambda key, default=None: False):
+            self.assertEqual(validation.validate_file(self.final, 'pdf'), (True, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,475 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from unittest import mock
+import website
+
+
+def _pdf(body=b''):
+    """A minimal well-formed PDF: header, body, xref table, startxref and %%EOF."""
+    head = b'%PDF-1.4\n' + body
+    return head + b'xref\n0 1\n0000000000 65535 f \ntrailer\n<< /Size 1 >>\nstartxref\n%d\n%%%%EOF\n' % len(head)
+
+
+class TestAcquireEdition(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.save_path = os.path.join(self.tmp.name, '2024-01-01_newspaper')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _config(self, format_urls=None):
+        def get(key, default=None):
+            if key == ('newspaper', 'format_urls'):
+                return format_urls
+            return default
+        return mock.patch.object(website.config.config, 'get', side_effect=get)
+
+    def test_logs_in_once_and_falls_through_ordered_probes(self):
+        outcomes = iter([(False, 'Error 404: not found'), (True, 'html')])
+        with self._config({'pdf': 'e/{date}.pdf', 'html': 'e/{date}.html'}), \
+                mock.patch.object(website, 'login', return_value=[{'name': 'sid'}]) as login, \
+                mock.patch.object(website, 'download_edition', side_effect=lambda *a, **k: next(outcomes)) as download:
+            result = website.acquire_edition('https://example.com/', 'u', 'p', self.save_path, target_date='2024-01-01')
+        self.assertEqual(login.call_count, 1)
+        self.assertTrue(result['success'])
+        self.assertEqual(result['format'], 'html')
+        self.assertEqual(result['path'], f"{self.save_path}.html")
+        self.assertEqual([p['formats'] for p in result['probes']], [['pdf'], ['html']])
+        self.assertTrue(all('seconds' in p for p in result['probes']))
+        self.assertEqual(download.call_args_list[0].kwargs['download_url'], 'https://example.com/e/2024-01-01.pdf')
+
+    def test_single_negotiated_probe_by_default(self):
+        with self._config(), \
+                mock.patch.object(website, 'login', return_value=[{'name': 'sid'}]), \
+                mock.patch.object(website, 'download_edition', return_value=(True, 'pdf')) as download:
+            result = website.acquire_edition('https://example.com/', 'u', 'p', self.save_path, target_date='2024-01-01')
+        self.assertEqual(download.call_count, 1)
+        self.assertEqual(download.call_args.kwargs['accept_formats'], ('pdf', 'html'))
+        self.assertEqual(result['format'], 'pdf')
+
+    def test_existing_file_skips_login(self):
+        with open(f"{self.save_path}.pdf", 'wb') as f:
+            f.write(_pdf())
+        with mock.patch.object(website, 'login') as login:
+            result = website.acquire_edition('https://example.com/', 'u', 'p', self.save_path, target_date='2024-01-01')
+        login.assert_not_called()
+        self.assertEqual(result['format'], 'pdf')
+
+    def test_invalid_local_copy_is_downloaded_again(self):
+        with open(f"{self.save_path}.pdf", 'wb') as f:
+            f.write(b'<html>Session expired</html>')
+        with self._config(), \
+                mock.patch.object(website, 'login', return_value=[{'name': 'sid'}]) as login, \
+                mock.patch.object(website, 'download_edition', return_value=(True, 'pdf')):
+            result = website.acquire_edition('https://example.com/', 'u', 'p', self.save_path, target_date='2024-01-01')
+        login.assert_called_once()
+        self.assertTrue(result['success'])
+        self.assertFalse(os.path.exists(f"{self.save_path}.pdf"))
+
+    def test_accept_header_orders_preferences(self):
+        self.assertEqual(website._accept_header(('pdf', 'html')), 'application/pdf, text/html;q=0.9')
+
+
+class _FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = ''
+
+    def close(self):
+        pass
+
+
+class TestConditionalDownload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.save_path = os.path.join(self.tmp.name, '2024-01-01_newspaper')
+        with open(f"{self.save_path}.pdf", 'wb') as f:
+            f.write(b'%PDF-1.7 edition')
+        website.downloader.save_meta(f"{self.save_path}.pdf", etag='"v1"')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_not_modified_keeps_existing_copy(self):
+        session = mock.Mock()
+        session.get.return_value = _FakeResponse(304)
+        with mock.patch.object(website.http_session, 'get_session', return_value=session):
+            success, fmt = website.download_edition('https://example.com/', [], self.save_path,
+                                                    target_date='2024-01-01', force_download=True)
+        self.assertTrue(success)
+        self.assertEqual(fmt, 'pdf')
+        self.assertEqual(session.get.call_args.kwargs['headers']['If-None-Match'], '"v1"')
+
+    def test_http_date_retry_after_is_honoured(self):
+        website.rate_limit.reset()
+        self.addCleanup(website.rate_limit.reset)
+        session = mock.Mock()
+        session.get.side_effect = [_FakeResponse(429, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}), _FakeResponse(304)]
+        with mock.patch.object(website.http_session, 'get_session', return_value=session), \
+                mock.patch.object(website.time, 'sleep') as sleep:
+            success, fmt = website.download_edition('https://example.com/', [], self.save_path,
+                                                    target_date='2024-01-01', force_download=True)
+        self.assertTrue(success)
+        self.assertEqual(session.get.call_count, 2)
+        sleep.assert_not_called()  # The date is already in the past
+
+    def test_zero_max_retries_still_makes_one_attempt(self):
+        session = mock.Mock()
+        session.get.return_value = _FakeResponse(304)
+        get = website.config.config.get
+        with mock.patch.object(website.http_session, 'get_session', return_value=session), \
+                mock.patch.object(website.config.config, 'get',
+                                  side_effect=lambda key, default=None: 0 if key == ('rate_limit', 'max_retries') else get(key, default)):
+            success, fmt = website.download_edition('https://example.com/', [], self.save_path,
+                                                    target_date='2024-01-01', force_download=True)
+        self.assertEqual((success, fmt), (True, 'pdf'))
+        self.assertEqual(session.get.call_count, 1)
+
+    def test_refused_download_falls_back_to_the_browser(self):
+        session = mock.Mock()
+        session.get.return_value = _FakeResponse(403)
+        with mock.patch.object(website.http_session, 'get_session', return_value=session), \
+                mock.patch.object(website.browser_pool, 'PLAYWRIGHT_AVAILABLE', True), \
+                mock.patch.object(website, '_download_with_playwright', return_value=(True, 'pdf')) as fallback:
+            success, fmt = website.download_edition('https://example.com/', [{'name': 'sid', 'value': 'x'}], self.save_path,
+                                                    target_date='2024-01-01', force_download=True)
+        self.assertEqual((success, fmt), (True, 'pdf'))
+        self.assertEqual(session.get.call_count, 1)
+        self.assertEqual(fallback.call_args.args[:3], (session.get.call_args.args[0], self.save_path, [{'name': 'sid', 'value': 'x'}]))
+
+    def test_refused_download_without_a_browser_fails(self):
+        session = mock.Mock()
+        session.get.return_value = _FakeResponse(403)
+        with mock.patch.object(website.http_session, 'get_session', return_value=session), \
+                mock.patch.object(website.browser_pool, 'PLAYWRIGHT_AVAILABLE', False), \
+                mock.patch.object(website, '_download_with_playwright') as fallback:
+            success, detail = website.download_edition('https://example.com/', [], self.save_path,
+                                                       target_date='2024-01-01', force_download=True)
+        self.assertFalse(success)
+        self.assertIn('403', detail)
+        fallback.assert_not_called()
+
+    def test_unchanged_published_content_is_not_changed(self):
+        website.downloader.mark_published(f"{self.save_path}.pdf")
+        session = mock.Mock()
+        session.get.return_value = _FakeResponse(304)
+        with mock.patch.object(website.http_session, 'get_session', return_value=session):
+            result = website.acquire_edition('https://example.com/', 'u', 'p', self.save_path, target_date='2024-01-01',
+                                             force_download=True, cookies=[])
+        self.assertTrue(result['success'])
+        self.assertFalse(result['changed'])
+
+
+LOGIN_PAGE = b"""<html><head><meta name="csrf-token" content="tok123"></head><body>
+<form action="/session" method="post">
+  <input type="hidden" name="csrf" value="tok123">
+  <input id="username" name="user" type="text">
+  <input id="password" name="pass" type="password">
+  <input type="checkbox" name="remember" value="1" checked>
+  <button id="login-btn" type="submit" name="go" value="in">Log in</button>
+</form></body></html>"""
+
+
+class _LoginHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.split('?')[0] == '/login':
+            self._send(200, LOGIN_PAGE)
+        elif self.path == '/expired':
+            self._send(302, b'', [('Location', '/login?next=/expired')])
+        elif self.path == '/account':
+            self._send(200, b'<a id="user-profile-link">Me</a>')
+        else:
+            self._send(404, b'')
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        ok = (form.get('user') == ['alice'] and form.get('pass') == ['secret'] and form.get('csrf') == ['tok123']
+              and form.get('remember') == ['1'] and self.headers.get('X-CSRF-Token') == 'tok123')
+        if ok:
+            self._send(303, b'', [('Location', '/account'), ('Set-Cookie', 'sid=abc; Path=/; HttpOnly')])
+        else:
+            self._send(200, b'<div class="login-error">Bad credentials</div>' + LOGIN_PAGE)
+
+
+class TestRequestsLogin(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _LoginHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.login_url = f"http://127.0.0.1:{cls.server.server_port}/login"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.site = website.publications.Publication(
+            'test', self.login_url, login_strategy='auto',
+            selectors={'username': '#username', 'password': '#password', 'submit': '#login-btn',
+                       'login_success': '#user-profile-link', 'login_success_url': ''})
+
+    def test_form_post_returns_cookies(self):
+        cookies = website._login_with_requests(self.login_url, 'alice', 'secret', publication=self.site)
+        self.assertEqual([(c['name'], c['value'], c['path']) for c in cookies], [('sid', 'abc', '/')])
+        self.assertTrue(cookies[0]['httpOnly'])
+
+    def test_rejected_credentials_return_none(self):
+        self.assertIsNone(website._login_with_requests(self.login_url, 'alice', 'wrong', publication=self.site))
+
+    def test_escalates_to_playwright_and_reports_strategy(self):
+        report = {}
+        with mock.patch.object(website.session_cache, 'load_cookies', return_value=None), \
+                mock.patch.object(website.session_cache, 'save_cookies'), \
+                mock.patch.dict(website.LOGIN_STRATEGIES, playwright=mock.Mock(return_value=[{'name': 'sid'}])):
+            cookies = website._get_authenticated_cookies(self.login_url, 'alice', 'wrong', report=report,
+                                                        publication=self.site)
+        self.assertEqual(cookies, [{'name': 'sid'}])
+        self.assertEqual(report['strategy'], 'playwright')
+        self.assertEqual([(a['strategy'], a['success']) for a in report['attempts']], [('requests', False), ('playwright', True)])
+
+    def test_requests_success_skips_browser(self):
+        report = {}
+        browser = mock.Mock()
+        with mock.patch.object(website.session_cache, 'load_cookies', return_value=None), \
+                mock.patch.object(website.session_cache, 'save_cookies'), \
+                mock.patch.dict(website.LOGIN_STRATEGIES, playwright=browser):
+            cookies = website._get_authenticated_cookies(self.login_url, 'alice', 'secret', report=report,
+                                                        publication=self.site)
+        browser.assert_not_called()
+        self.assertEqual(report['strategy'], 'requests')
+        self.assertEqual(cookies[0]['name'], 'sid')
+
+    def test_bounce_to_login_with_next_parameter_is_an_expired_session(self):
+        site = website.publications.Publication('test', self.login_url, login_url=self.login_url,
+                                                selectors={'login_success': '', 'login_success_url': ''})
+        base = self.login_url[:-len('/login')]
+        self.assertTrue(website._probe_session([], base + '/account', publication=site))
+        self.assertFalse(website._probe_session([], base + '/expired', publication=site))
+
+    def test_password_outside_the_form_is_not_a_plain_form(self):
+        # Split layout: the password input belongs to the form only through its form= attribute
+        page = """<html><body><form id="login" action="/login" method="post">
+          <input id="username" name="user"><button id="login-btn" type="submit">Log in</button>
+        </form><input id="password" name="pass" type="password" form="login"></body></html>"""
+        self.assertIsNone(website._prepare_form_login(page, self.login_url, 'alice', 'secret', self.site))
+
+
+class TestReleaseWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history = os.path.join(self.tmp.name, 'release_history.json')
+        values = {('release_watch', 'history_path'): self.history, ('release_watch', 'give_up_at'): '07:00'}
+        patch = mock.patch.object(website.config.config, 'get', side_effect=lambda key, default=None: values.get(key, default))
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def _clock(self, start):
+        self.clock = start
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.clock += timedelta(seconds=seconds)
+        self.sleeps = []
+        return sleep, lambda: self.clock
+
+    def test_poll_interval_is_fastest_near_typical_release(self):
+        typical = 330
+        self.assertEqual(website.poll_interval(325, typical, 30, 900, 20), 30)
+        self.assertGreater(website.poll_interval(420, typical, 30, 900, 20), website.poll_interval(360, typical, 30, 900, 20))
+        self.assertEqual(website.poll_interval(900, typical, 30, 900, 20), 900)
+        self.assertEqual(website.poll_interval(290, typical, 30, 900, 20), 60)
+
+    def test_typical_release_is_median_of_history(self):
+        day = datetime(2024, 1, 1).date()
+        for minutes in (300, 310, 400):
+            day += timedelta(days=1)
+            website.record_release(day, datetime.combine(day, datetime.min.time()) + timedelta(minutes=minutes))
+        self.assertEqual(website.typical_release_minutes(), 310)
+        self.assertEqual(website.typical_release_minutes([]), 330)
+
+    def test_watch_polls_until_edition_appears(self):
+        sleep, now = self._clock(datetime(2024, 1, 2, 5, 0))
+        outcomes = iter([{'available': False, 'status': 404, 'auth_failed': False}] * 3
+                        + [{'available': True, 'status': 200, 'auth_failed': False}])
+        with mock.patch.object(website, 'login', return_value=[{'name': 'sid'}]) as login, \
+                mock.patch.object(website, 'probe_release', side_effect=lambda *a, **k: next(outcomes)):
+            result = website.watch_for_release('https://example.com/', 'u', 'p', target_date='2024-01-02',
+                                               sleep=sleep, now=now)
+        self.assertTrue(result['available'])
+        self.assertEqual(result['polls'], 4)
+        self.assertEqual(login.call_count, 1)
+        self.assertEqual(len(self.sleeps), 3)
+        self.assertEqual(website.load_release_history()[-1]['date'], '2024-01-02')
+
+    def test_watch_relogs_once_and_gives_up_at_deadline(self):
+        sleep, now = self._clock(datetime(2024, 1, 2, 6, 50))
+        refused = {'available': False, 'status': 403, 'auth_failed': True}
+        with mock.patch.object(website, 'login', return_value=[{'name': 'sid'}]) as login, \
+                mock.patch.object(website.session_cache, 'clear'), \
+                mock.patch.object(website, 'probe_release', return_value=refused):
+            result = website.watch_for_release('https://example.com/', 'u', 'p', target_date='2024-01-02',
+                                               sleep=sleep, now=now)
+        self.assertFalse(result['available'])
+        self.assertIn('07:00', result['error'])
+        self.assertEqual(login.call_count, 2)
+        self.assertEqual(self.clock, datetime(2024, 1, 2, 7, 0))
+
+    def test_watch_stops_after_max_watch_minutes(self):
+        sleep, now = self._clock(datetime(2024, 1, 2, 5, 0))
+        missing = {'available': False, 'status': 404, 'auth_failed': False}
+        values = {('release_watch', 'history_path'): self.history, ('release_watch', 'give_up_at'): '12:00',
+                  ('release_watch', 'max_watch_minutes'): 45}
+        with mock.patch.object(website.config.config, 'get', side_effect=lambda key, default=None: values.get(key, default)), \
+                mock.patch.object(website, 'login', return_value=[{'name': 'sid'}]), \
+                mock.patch.object(website, 'probe_release', return_value=missing):
+            result = website.watch_for_release('https://example.com/', 'u', 'p', target_date='2024-01-02',
+                                               sleep=sleep, now=now)
+        self.assertFalse(result['available'])
+        self.assertIn('05:45', result['error'])
+        self.assertEqual(self.clock, datetime(2024, 1, 2, 5, 45))
+
+    def test_probe_falls_back_to_ranged_get(self):
+        session = mock.Mock()
+        session.head.return_value = mock.Mock(status_code=405, headers={}, url='https://example.com/e')
+        session.get.return_value = mock.Mock(status_code=206, headers={'Content-Type': 'application/pdf'}, url='https://example.com/e')
+        probe = website.probe_release('https://example.com/e', [], ('pdf',), session=session)
+        self.assertTrue(probe['available'])
+        self.assertEqual(session.get.call_args.kwargs['headers']['Range'], 'bytes=0-0')
+
+
+EDITION = _pdf(bytes(range(256)) * 4096) # ~1 MiB
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    ranges = []
+    in_flight = 0
+    peak = 0
+    failing = False # Answer range requests with 503
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        try:
+            self._get()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _get(self):
+        headers = {'Content-Type': 'application/pdf', 'Accept-Ranges': 'bytes', 'ETag': '"v1"'}
+        body, status = EDITION, 200
+        spec = self.headers.get('Range')
+        if spec and self.headers.get('If-Range') == '"v1"':
+            start, end = (int(v) for v in spec.split('=')[1].split('-'))
+            self.ranges.append((start, end))
+            if self.failing:
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body, status = EDITION[start:end + 1], 206
+            headers['Content-Range'] = f"bytes {start}-{end}/{len(EDITION)}"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass # The client stops reading after the first segment
+
+
+class TestSegmentedDownload(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _RangeHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        _RangeHandler.ranges = []
+        _RangeHandler.peak = 0
+        _RangeHandler.failing = False
+        self.values = values = {('download', 'segments'): 4, ('download', 'segment_min_mb'): 0.5,
+                                ('rate_limit', 'requests_per_second'): 0, ('rate_limit', 'max_concurrent'): 4}
+        patch = mock.patch.object(website.config.config, 'get', side_effect=lambda key, default=None: values.get(key, default))
+        patch.start()
+        self.addCleanup(patch.stop)
+        website.rate_limit.reset()
+        self.addCleanup(website.rate_limit.reset)
+
+    def _download(self, stats):
+        save_path = os.path.join(self.tmp.name, '2024-01-01_newspaper')
+        url = f"http://127.0.0.1:{self.server.server_port}/edition"
+        success, fmt = website.download_edition(url, [], save_path, target_date='2024-01-01', download_url=url,
+                                                accept_formats=('pdf',), stats=stats)
+        return success, save_path
+
+    def test_large_edition_is_fetched_in_segments(self):
+        stats = {}
+        success, save_path = self._download(stats)
+        self.assertTrue(success)
+        with open(f"{save_path}.pdf", 'rb') as f:
+            self.assertEqual(f.read(), EDITION)
+        self.assertEqual(stats['segments'], 4)
+        self.assertEqual(len(_RangeHandler.ranges), 3)
+        self.assertEqual(website.downloader.load_meta(f"{save_path}.pdf")['size'], len(EDITION))
+
+    def test_segments_stay_within_the_host_concurrency_cap(self):
+        self.values[('rate_limit', 'max_concurrent')] = 2
+        stats = {}
+        success, save_path = self._download(stats)
+        self.assertTrue(success)
+        self.assertEqual(stats['segments'], 2)
+        self.assertLessEqual(_RangeHandler.peak, 2)
+        # Every slot is handed back
+        policy = website.rate_limit.for_url(f"http://127.0.0.1:{self.server.server_port}/")
+        self.assertTrue(policy.try_acquire() and policy.try_acquire())
+
+    def test_single_slot_host_gets_one_stream(self):
+        self.values[('rate_limit', 'max_concurrent')] = 1
+        stats = {}
+        success, save_path = self._download(stats)
+        self.assertTrue(success)
+        self.assertEqual(stats['segments'], 1)
+        self.assertEqual(_RangeHandler.ranges, [])
+
+    def test_segment_server_errors_reach_the_circuit_breaker(self):
+        _RangeHandler.failing = True
+        record = mock.patch.object(website.rate_limit.HostPolicy, 'record', autospec=True,
+                                   side_effect=website.rate_limit.HostPolicy.record)
+        with record as recorded:
+            self._download({})
+        statuses = [call.args[1] for call in recorded.call_args_list]
+        self.assertGreater(len(_RangeHandler.ranges), 0)
+        self.assertEqual(statuses.count(503), len(_RangeHandler.ranges))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,4 @@
-the #!/usr/bin/env python3
+#!/usr/bin/env python3
 """
 Thumbnail generation module
 Uses pdf2image (requires poppler) to create a PNG thumbnail from the first page of a PDF.
@@ -136,12 +136,13 @@ def generate_thumbnail(input_path, output_path, file_format="pdf", dry_run=False
         elif file_format.lower() == 'html':
             # For HTML files, use Playwright to take a screenshot
             try:
-                from playwright.sync_api import sync_playwright
+                import browser_pool
+                if not browser_pool.PLAYWRIGHT_AVAILABLE:
+                    raise ImportError("playwright")
                 logger.info("Using Playwright to generate thumbnail from HTML file")
                 
-                with sync_playwright() as p:
-                    browser = p.chromium.launch(headless=True)
-                    page = browser.new_page(viewport={"width": 1280, "height": 1600})
+                with browser_pool.get_pool().context(viewport={"width": 1280, "height": 1600}) as context:
+                    page = context.new_page()
                     
                     # Load the HTML file using file:// protocol
                     absolute_path = os.path.abspath(input_path)
@@ -155,7 +156,6 @@ def generate_thumbnail(input_path, output_path, file_format="pdf", dry_run=False
                     
                     # Take screenshot and save as thumbnail
                     page.screenshot(path=output_path, full_page=False)
-                    browser.close()
                     
                     logger.info("Successfully created HTML thumbnail: %s", output_path)
                     return True
@@ -175,4 +175,4 @@ def generate_thumbnail(input_path, output_path, file_format="pdf", dry_run=False
     except Exception as e:
         # Using logger.exception to include traceback
         logger.exception("Unexpected error generating thumbnail: %s", e)
-        return False
\ No newline at end of file
+        return False
\ No newline at end of file
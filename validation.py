@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Edition validation module
+Checks a downloaded edition while it streams in, so an HTML error page
+served as a PDF, a truncated PDF or an undersized/mis-encoded HTML page is
+rejected before it is committed, uploaded, thumbnailed or emailed.
+"""
+
+import re
+import codecs
+import logging
+import config
+import downloader
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MIN_HTML_BYTES = 2048 # Smaller pages are error or login pages, not editions
+HEADER_WINDOW = 1024 # The PDF header must start within this many bytes
+TAIL_WINDOW = 2048 # Bytes kept from the end to find startxref and %%EOF
+XREF_PROBE = 64 # Bytes read at the startxref offset
+
+STARTXREF_RE = re.compile(rb'startxref\s+(\d+)\s+%%EOF')
+XREF_RE = re.compile(rb'\s*(xref\b|\d+\s+\d+\s+obj\b)')
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+HTML_MARKER_RE = re.compile(rb'<\s*(!doctype\s+html|html|head|body)\b', re.IGNORECASE)
+
+
+class ValidationError(downloader.DownloadError):
+    """The payload is not a usable edition; the partial file is never kept for a resume."""
+
+    def __init__(self, message):
+        super().__init__(message, resumable=False)
+
+
+class _Validator:
+    """Fed every chunk in order through `feed()`; `finish()` runs the end-of-file checks."""
+
+    def __init__(self):
+        self.size = 0
+        self._head = b''
+
+    def feed(self, chunk):
+        if len(self._head) < HEADER_WINDOW:
+            self._head += chunk[:HEADER_WINDOW - len(self._head)]
+        self.size += len(chunk)
+
+    def finish(self, path):
+        pass
+
+    def check_file(self, path, chunk_size=downloader.DEFAULT_CHUNK_SIZE):
+        """Validate a file already on disk (e.g. assembled from segments)."""
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                self.feed(chunk)
+        self.finish(path)
+
+
+class PdfValidator(_Validator):
+    """
+    `%PDF-` header near the start (failing fast on an HTML body), an `%%EOF`
+    trailer, and a startxref offset that lands on a cross-reference table
+    or stream inside the file.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._tail = b''
+        self._header_seen = False
+
+    def _check_header(self, final=False):
+        if self._header_seen:
+            return
+        if b'%PDF-' in self._head:
+            self._header_seen = True
+        elif self._head.lstrip()[:1] == b'<':
+            raise ValidationError("Expected a PDF but received an HTML/XML document")
+        elif final or len(self._head) >= HEADER_WINDOW:
+            raise ValidationError("Missing %PDF- header")
+
+    def feed(self, chunk):
+        super().feed(chunk)
+        self._check_header()
+        self._tail = (self._tail + chunk[-TAIL_WINDOW:])[-TAIL_WINDOW:]
+
+    def finish(self, path):
+        self._check_header(final=True)
+        if b'%%EOF' not in self._tail:
+            raise ValidationError(f"Missing %%EOF trailer after {self.size} bytes (truncated PDF?)")
+        matches = STARTXREF_RE.findall(self._tail)
+        if not matches:
+            raise ValidationError("Missing startxref before the %%EOF trailer")
+        offset = int(matches[-1])
+        # Offsets count from the header, which may follow a few bytes of junk
+        header_at = self._head.find(b'%PDF-')
+        with open(path, 'rb') as f:
+            for start in sorted({offset, offset + header_at}):
+                if start < self.size:
+                    f.seek(start)
+                    if XREF_RE.match(f.read(XREF_PROBE)):
+                        return
+        raise ValidationError(f"startxref offset {offset} does not point at a cross-reference section")
+
+
+class HtmlValidator(_Validator):
+    """
+    Minimum size, an HTML document marker, no PDF body, and bytes that decode
+    in the declared charset (Content-Type or `<meta charset>`); without a
+    declaration the encoding isn't checked.
+    """
+
+    def __init__(self, content_type=None, min_size=DEFAULT_MIN_HTML_BYTES):
+        super().__init__()
+        self.min_size = min_size
+        match = re.search(r'charset\s*=\s*"?([A-Za-z0-9_.:-]+)', content_type or '', re.IGNORECASE)
+        self.charset = match.group(1) if match else None
+        self._pending = b''
+        self._decoder = None
+        self._started = False
+
+    def _start(self):
+        self._started = True
+        if self._head.startswith(b'%PDF-'):
+            raise ValidationError("Expected HTML but received a PDF")
+        if self.charset is None:
+            match = META_CHARSET_RE.search(self._head)
+            self.charset = match.group(1).decode('ascii') if match else None
+        if self.charset is None:
+            logger.debug("No charset declared for the HTML edition; skipping the encoding check.")
+            return
+        try:
+            self._decoder = codecs.getincrementaldecoder(self.charset)(errors='strict')
+        except LookupError:
+            raise ValidationError(f"Unknown charset {self.charset!r}")
+
+    def _decode(self, data, final=False):
+        if self._decoder is None:
+            return
+        try:
+            self._decoder.decode(data, final=final)
+        except UnicodeDecodeError as e:
+            raise ValidationError(f"HTML is not valid {self.charset}: {e.reason} near byte {e.start}")
+
+    def feed(self, chunk):
+        super().feed(chunk)
+        if not self._started:
+            # Wait for the head, which may declare the charset, before decoding
+            self._pending += chunk
+            if len(self._head) < HEADER_WINDOW:
+                return
+            self._start()
+            chunk, self._pending = self._pending, b''
+        self._decode(chunk)
+
+    def finish(self, path):
+        if not self._started:
+            self._start()
+            self._decode(self._pending)
+            self._pending = b''
+        self._decode(b'', final=True)
+        if self.size < self.min_size:
+            raise ValidationError(f"HTML edition is only {self.size} bytes (minimum {self.min_size})")
+        if not HTML_MARKER_RE.search(self._head):
+            raise ValidationError("Body does not look like an HTML document")
+
+
+def validator_for(file_format, content_type=None):
+    """A fresh validator for an edition in `file_format`, or None when `download.validate` is off."""
+    if config.config.get(('download', 'validate'), True) in (False, 0, '0', 'false', 'False'):
+        return None
+    if file_format == 'pdf':
+        return PdfValidator()
+    if file_format == 'html':
+        return HtmlValidator(content_type, int(config.config.get(('download', 'min_html_bytes'), DEFAULT_MIN_HTML_BYTES)))
+    return None
+
+
+def validate_file(path, file_format):
+    """
+    Validate an edition already on disk.
+
+    Returns:
+        tuple: (True, None) if it passes (or validation is off), else (False, reason).
+    """
+    validator = validator_for(file_format)
+    if validator is None:
+        return True, None
+    try:
+        validator.check_file(path)
+    except ValidationError as e:
+        return False, str(e)
+    return True, None
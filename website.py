@@ -5,76 +5,101 @@ Handles login to newspaper website and downloading the daily newspaper.
 """
 
 import os
+import time
+import fnmatch
+import json
 import logging
+import statistics
+from datetime import datetime, timedelta
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 import config
+import browser_pool
+import session_cache
+import downloader
+import http_session
+import rate_limit
+import publications
+import validation
+import packager
 
-# Playwright imports (optional dependency)
-try:
-    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
-    class PlaywrightTimeoutError(Exception):
-        pass
-    class PlaywrightError(Exception):
-        pass
+# Playwright (optional dependency); browser_pool loads the driver on first use
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# --- Configuration from centralized config module ---
-WEBSITE_URL = config.config.get(('newspaper', 'url'))
-LOGIN_URL = config.config.get(('newspaper', 'login_url'), WEBSITE_URL) # Often the same as WEBSITE_URL
-USERNAME = config.config.get(('newspaper', 'username'))
-PASSWORD = config.config.get(('newspaper', 'password'))
-DOWNLOAD_DIR = config.config.get(('paths', 'download_dir'), 'downloads') # Local directory to save files
-USER_AGENT = config.config.get(('newspaper', 'user_agent'), 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-
-# --- Website Selectors (Configurable) ---
-USERNAME_SELECTOR = config.config.get(('newspaper', 'selectors', 'username'), 'input[name="username"]')
-PASSWORD_SELECTOR = config.config.get(('newspaper', 'selectors', 'password'), 'input[name="password"]')
-SUBMIT_BUTTON_SELECTOR = config.config.get(('newspaper', 'selectors', 'submit'), 'button[type="submit"]')
-LOGIN_SUCCESS_SELECTOR = config.config.get(('newspaper', 'selectors', 'login_success'), '#user-profile-link')
-LOGIN_SUCCESS_URL_PATTERN = config.config.get(('newspaper', 'selectors', 'login_success_url'), '')
+# --- Site Settings ---
+# URLs, credentials and selectors belong to a publications.Publication and are
+# read from config when needed (see _site), not frozen at import time.
+LOGIN_ERROR_SELECTOR = '.login-error, .error-message, .alert-danger'
+
+# --- Edition Formats ---
+EDITION_FORMATS = ('pdf', 'html') # Preferred first
+FORMAT_MIME_TYPES = {'pdf': 'application/pdf', 'html': 'text/html'}
+
+# Release watch: poll for the edition around its usual publication time
+DEFAULT_RELEASE_TIME = '05:30' # Assumed until releases have been observed
+DEFAULT_GIVE_UP_AT = '12:00'
+DEFAULT_MAX_WATCH_MINUTES = None # No cap beyond give_up_at
+DEFAULT_WATCH_MIN_INTERVAL = 30 # Seconds between probes around the typical release time
+DEFAULT_WATCH_MAX_INTERVAL = 900 # Slowest polling, far from it
+DEFAULT_WATCH_WINDOW_MINUTES = 20 # Poll fastest within this many minutes of the typical time
+DEFAULT_RELEASE_HISTORY_PATH = 'release_history.json'
+RELEASE_HISTORY_SIZE = 14 # Observations kept to learn the typical release time
 
 # --- Helper Functions ---
-def _get_session_cookies(login_url, username, password):
-    """Uses Playwright to log in and extract session cookies."""
+def _site(publication=None):
+    """The publication being worked on; by default the single `newspaper:` block."""
+    return publication if publication is not None else publications.legacy_publication()
+
+def _get_session_cookies(login_url, username, password, stats=None, publication=None):
+    """
+    Uses Playwright to log in and extract session cookies.
+    Requests the site profile doesn't need (ads, analytics, images, fonts) are
+    aborted, and the page is waited on by selector rather than network idle.
+    `stats`, if given, receives the blocked/allowed request counts.
+    """
+    site = _site(publication)
     logger.info("Attempting to log in via Playwright to get session cookies.")
+    if not browser_pool.PLAYWRIGHT_AVAILABLE:
+        logger.error("Playwright not available for login. Install with: pip install playwright")
+        return None
+    stats = stats if stats is not None else {}
+    profile = browser_pool.site_profile(login_url)
+    blocker = browser_pool.RequestBlocker.from_profile(profile)
+    timeout = int(profile['selector_timeout_ms'])
     cookies = None
-    browser = None # Initialize browser variable
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True) # Run headless
-            page = browser.new_page()
+        with browser_pool.get_pool().context() as context:
+            blocker.install(context)
+            page = context.new_page()
             logger.debug("Navigating to login page: %s", login_url)
-            page.goto(login_url, wait_until='networkidle')
+            page.goto(login_url, wait_until=profile['wait_until'])
 
             # --- Configurable Login Logic ---
             # Uses environment variables or defaults for selectors
             logger.debug("Attempting to fill login form using selectors: [Username: %s, Password: %s, Submit: %s]", 
-                         USERNAME_SELECTOR, PASSWORD_SELECTOR, SUBMIT_BUTTON_SELECTOR)
+                         site.username_selector, site.password_selector, site.submit_selector)
             
-            # Check if selectors exist before attempting to interact with them
-            if page.locator(USERNAME_SELECTOR).count() > 0:
-                page.fill(USERNAME_SELECTOR, username)
-            else:
-                logger.error("Username field not found with selector: %s", USERNAME_SELECTOR)
+            # Wait for the form itself rather than for every tracker on the page
+            try:
+                page.wait_for_selector(site.username_selector, state='visible', timeout=timeout)
+            except browser_pool.PlaywrightTimeoutError:
+                logger.error("Username field not found with selector: %s", site.username_selector)
                 return None
+            page.fill(site.username_selector, username)
                 
-            if page.locator(PASSWORD_SELECTOR).count() > 0:
-                page.fill(PASSWORD_SELECTOR, password)
+            if page.locator(site.password_selector).count() > 0:
+                page.fill(site.password_selector, password)
             else:
-                logger.error("Password field not found with selector: %s", PASSWORD_SELECTOR)
+                logger.error("Password field not found with selector: %s", site.password_selector)
                 return None
                 
-            if page.locator(SUBMIT_BUTTON_SELECTOR).count() > 0:
-                page.click(SUBMIT_BUTTON_SELECTOR)
+            if page.locator(site.submit_selector).count() > 0:
+                page.click(site.submit_selector)
             else:
-                logger.error("Submit button not found with selector: %s", SUBMIT_BUTTON_SELECTOR)
+                logger.error("Submit button not found with selector: %s", site.submit_selector)
                 return None
             # --- End Configurable Login Logic ---
 
@@ -82,37 +107,43 @@ def _get_session_cookies(login_url, username, password):
             login_success = False
             
             # Method 1: Check for success element if configured
-            if LOGIN_SUCCESS_SELECTOR:
+            if site.login_success_selector:
                 try:
-                    logger.debug("Waiting for login success element: %s", LOGIN_SUCCESS_SELECTOR)
-                    page.wait_for_selector(LOGIN_SUCCESS_SELECTOR, timeout=30000)
+                    logger.debug("Waiting for login success element: %s", site.login_success_selector)
+                    page.wait_for_selector(site.login_success_selector, timeout=30000)
                     login_success = True
-                    logger.info("Login successful (based on element presence: %s).", LOGIN_SUCCESS_SELECTOR)
-                except PlaywrightTimeoutError:
-                    logger.warning("Login success element not found: %s", LOGIN_SUCCESS_SELECTOR)
+                    logger.info("Login successful (based on element presence: %s).", site.login_success_selector)
+                except browser_pool.PlaywrightTimeoutError:
+                    logger.warning("Login success element not found: %s", site.login_success_selector)
             
             # Method 2: Check for URL pattern if configured
-            if not login_success and LOGIN_SUCCESS_URL_PATTERN:
+            if not login_success and site.login_success_url:
                 try:
-                    logger.debug("Waiting for login success URL pattern: %s", LOGIN_SUCCESS_URL_PATTERN)
-                    page.wait_for_url(LOGIN_SUCCESS_URL_PATTERN, timeout=30000)
+                    logger.debug("Waiting for login success URL pattern: %s", site.login_success_url)
+                    page.wait_for_url(site.login_success_url, timeout=30000)
                     login_success = True
-                    logger.info("Login successful (based on URL pattern: %s).", LOGIN_SUCCESS_URL_PATTERN)
-                except PlaywrightTimeoutError:
-                    logger.warning("Login success URL pattern not matched: %s", LOGIN_SUCCESS_URL_PATTERN)
+                    logger.info("Login successful (based on URL pattern: %s).", site.login_success_url)
+                except browser_pool.PlaywrightTimeoutError:
+                    logger.warning("Login success URL pattern not matched: %s", site.login_success_url)
                     
-            # Method 3: Wait for network idle as last resort
+            # Method 3: Wait for the login form to go away as last resort
             if not login_success:
-                logger.debug("Using fallback method: waiting for network idle state")
-                page.wait_for_load_state('networkidle')
+                logger.debug("Using fallback method: waiting for the password field to detach")
+                try:
+                    page.wait_for_selector(site.password_selector, state='detached', timeout=timeout)
+                except browser_pool.PlaywrightTimeoutError:
+                    logger.warning("Login form still present after %d ms.", timeout)
                 # Check for login failure indicators (like error messages)
-                error_messages = page.locator('.login-error, .error-message, .alert-danger').count()
+                error_messages = page.locator(LOGIN_ERROR_SELECTOR).count()
                 if error_messages > 0:
-                    error_text = page.locator('.login-error, .error-message, .alert-danger').text_content()
+                    error_text = page.locator(LOGIN_ERROR_SELECTOR).first.text_content()
                     logger.error("Login error detected: %s", error_text)
                     return None
+                if page.locator(site.password_selector).count() > 0:
+                    logger.error("Login form is still shown; login could not be confirmed.")
+                    return None
                 login_success = True
-                logger.info("Login appears successful (based on network idle state and no error messages).")
+                logger.info("Login appears successful (login form gone and no error messages).")
             
             if not login_success:
                 logger.error("Login could not be confirmed through any verification method.")
@@ -121,39 +152,250 @@ def _get_session_cookies(login_url, username, password):
             # Extract cookies
             cookies = page.context.cookies()
             logger.info("Successfully extracted %d cookies.", len(cookies))
-            # browser.close() # Context manager handles closing
-    except PlaywrightTimeoutError:
+    except browser_pool.PlaywrightTimeoutError:
         logger.error("Playwright timed out during login process. Check selectors and network conditions.")
-    except PlaywrightError as e:
+    except browser_pool.PlaywrightError as e:
         logger.error("A Playwright error occurred during login: %s", e)
     except Exception as e: # Catch unexpected errors
         # Using logger.exception to include traceback
         logger.exception("An unexpected error occurred during Playwright login: %s", e)
-    # finally:
-        # Ensure browser is closed even if errors occur before context manager exit
-        # This finally block might be redundant due to the 'with' statement,
-        # but kept for explicit safety, especially if errors happen during launch.
-        # if browser and browser.is_connected():
-        #     logger.debug("Ensuring browser is closed in finally block.")
-        #     browser.close()
-        # The 'with sync_playwright() as p:' handles browser cleanup.
-        # The 'browser' variable might not be assigned if launch fails.
+    finally:
+        stats.update(blocking=blocker.enabled, blocked_requests=blocker.blocked, allowed_requests=blocker.allowed)
+        if blocker.enabled:
+            logger.info("Login page: blocked %d of %d requests.", blocker.blocked, blocker.blocked + blocker.allowed)
     return cookies
 
-def _download_with_playwright(download_url, save_path, cookies, dry_run=False):
+def _cookies_for_requests(cookies):
+    """Convert Playwright-style cookie dicts into a requests cookie jar."""
+    jar = requests.cookies.RequestsCookieJar()
+    for cookie in cookies or []:
+        jar.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+    return jar
+
+def _bounced_to_login(requested_url, final_url, site):
+    """Whether a request for `requested_url` ended on the login page, ignoring query strings (`/login?next=...`)."""
+    def page(url):
+        parts = urlsplit(url or '')
+        return (parts.scheme, parts.netloc, parts.path.rstrip('/'))
+    return bool(site.login_url) and page(requested_url) != page(site.login_url) and page(final_url) == page(site.login_url)
+
+def _probe_session(cookies, probe_url, publication=None):
+    """
+    Cheap authenticated request to check whether cached cookies are still accepted.
+    Fails if the server errors, bounces us to the login page, or (when configured)
+    the login success element is missing from the page.
+    """
+    site = _site(publication)
+    if not probe_url:
+        return False
+    try:
+        response = site.http().get(
+            probe_url,
+            cookies=_cookies_for_requests(cookies),
+            headers={'User-Agent': site.user_agent},
+            timeout=(5, 15)
+        )
+    except requests.exceptions.RequestException as e:
+        logger.warning("Session probe request to %s failed: %s", probe_url, e)
+        return False
+    if response.status_code >= 400:
+        logger.info("Session probe returned status %d.", response.status_code)
+        return False
+    if _bounced_to_login(probe_url, response.url, site):
+        logger.info("Session probe was redirected to the login page.")
+        return False
+    if site.login_success_selector and 'html' in response.headers.get('Content-Type', '').lower():
+        if BeautifulSoup(response.text, 'html.parser').select_one(site.login_success_selector) is None:
+            logger.info("Session probe page lacks login success element: %s", site.login_success_selector)
+            return False
+    return True
+
+def _cookies_from_jar(jar):
+    """Convert a requests cookie jar into Playwright-style cookie dicts."""
+    return [{
+        'name': c.name,
+        'value': c.value,
+        'domain': c.domain,
+        'path': c.path or '/',
+        'expires': c.expires if c.expires is not None else -1,
+        'secure': bool(c.secure),
+        'httpOnly': bool(c.has_nonstandard_attr('HttpOnly')),
+    } for c in jar]
+
+def _login_form_data(form, username, password, site):
+    """Collect the form's own fields (hidden CSRF tokens included) and fill in the credentials."""
+    data = {}
+    for field in form.find_all(['input', 'select', 'textarea']):
+        name = field.get('name')
+        field_type = (field.get('type') or '').lower()
+        if not name or field_type in ('submit', 'button', 'image', 'reset', 'file'):
+            continue
+        if field_type in ('checkbox', 'radio') and not field.has_attr('checked'):
+            continue
+        if field.name == 'select':
+            option = field.find('option', selected=True) or field.find('option')
+            data[name] = option.get('value', option.get_text()) if option else ''
+        elif field.name == 'textarea':
+            data[name] = field.get_text()
+        else:
+            data[name] = field.get('value', '')
+    data[form.select_one(site.username_selector)['name']] = username
+    data[form.select_one(site.password_selector)['name']] = password
+    submit = form.select_one(site.submit_selector)
+    if submit is not None and submit.get('name'):
+        data[submit['name']] = submit.get('value', '')
+    return data
+
+def _prepare_form_login(html, page_url, username, password, site):
+    """
+    Find the login form on a fetched login page and build its submission.
+
+    Returns:
+        tuple: (method, action_url, form_data, extra_headers), or None when the page
+        has no plain form (its fields may be rendered by JavaScript).
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    username_field = soup.select_one(site.username_selector)
+    form = username_field.find_parent('form') if username_field is not None else None
+    # Only fields inside the username's form are posted with it
+    password_field = form.select_one(site.password_selector) if form is not None else None
+    if form is None or password_field is None or not username_field.get('name') or not password_field.get('name'):
+        logger.info("No plain login form found (fields may be rendered by JavaScript).")
+        return None
+    data = _login_form_data(form, username, password, site)
+    headers = {'User-Agent': site.user_agent, 'Referer': page_url}
+    csrf_meta = soup.find('meta', attrs={'name': lambda v: v and v.lower() in ('csrf-token', '_csrf', 'csrf_token')})
+    if csrf_meta is not None and csrf_meta.get('content'):
+        headers['X-CSRF-Token'] = csrf_meta['content']
+    action = urljoin(page_url, form.get('action') or page_url)
+    return (form.get('method') or 'post').lower(), action, data, headers
+
+def _form_login_confirmed(html, final_url, site):
+    """Whether the page a form login landed on shows no login error and the configured success marker."""
+    result = BeautifulSoup(html, 'html.parser')
+    if result.select_one(LOGIN_ERROR_SELECTOR) is not None:
+        logger.info("Form login rejected: %s", result.select_one(LOGIN_ERROR_SELECTOR).get_text(strip=True))
+        return False
+    confirmed = False
+    if site.login_success_url and (fnmatch.fnmatch(final_url, site.login_success_url) or site.login_success_url in final_url):
+        confirmed = True
+    if site.login_success_selector and result.select_one(site.login_success_selector) is not None:
+        confirmed = True
+    if not confirmed and not (site.login_success_selector or site.login_success_url):
+        # Nothing configured to look for: accept if the login form is gone
+        confirmed = result.select_one(site.password_selector) is None
+    if not confirmed:
+        logger.info("Form login could not be confirmed.")
+    return confirmed
+
+def _login_with_requests(login_url, username, password, stats=None, publication=None):
+    """
+    Lightweight login: fetch the login page, post its form with the credentials
+    and any hidden/CSRF fields, and confirm success without a browser.
+    Returns Playwright-style cookies, or None if this site needs the browser.
+    (`stats` is accepted for the common strategy signature; nothing to report.)
+    """
+    logger.info("Attempting form-POST login without a browser.")
+    site = _site(publication)
+    session = http_session.isolated_session()
+    try:
+        page = session.get(login_url, headers={'User-Agent': site.user_agent}, timeout=(10, 30))
+        page.raise_for_status()
+        submission = _prepare_form_login(page.text, page.url, username, password, site)
+        if submission is None:
+            return None
+        method, action, data, headers = submission
+        if method == 'get':
+            response = session.get(action, params=data, headers=headers, timeout=(10, 30))
+        else:
+            response = session.post(action, data=data, headers=headers, timeout=(10, 30))
+        if response.status_code >= 400:
+            logger.info("Form login returned status %d.", response.status_code)
+            return None
+        if not _form_login_confirmed(response.text, response.url, site):
+            return None
+        cookies = _cookies_from_jar(session.cookies)
+        if not cookies:
+            logger.info("Form login set no cookies.")
+            return None
+        logger.info("Form login successful; extracted %d cookies.", len(cookies))
+        return cookies
+    except requests.exceptions.RequestException as e:
+        logger.warning("Form login request failed: %s", e)
+        return None
+    # The session is not closed: its adapters are shared with the pooled session
+
+def _login_strategies(site):
+    if site.login_strategy == 'requests':
+        return ['requests']
+    if site.login_strategy == 'playwright':
+        return ['playwright']
+    return ['requests', 'playwright']
+
+def _get_authenticated_cookies(login_url, username, password, probe_url=None, report=None, publication=None):
+    """
+    Return session cookies, reusing the on-disk session cache when the probe
+    accepts it, then trying a plain form POST, and only launching the
+    Playwright login if that fails.
+
+    `report`, if given, is filled with the winning 'strategy' and every
+    attempt's outcome and duration (plus request-blocking counts for the
+    browser login, so the saving shows up next to the latency).
+    """
+    site = _site(publication)
+    report = report if report is not None else {}
+    report.setdefault('strategy', None)
+    report.setdefault('attempts', [])
+    probe_url = probe_url or site.session_probe_url
+    start = time.monotonic()
+    cookies = session_cache.load_cookies(username, password, login_url, path=site.session_cache_path)
+    if cookies:
+        accepted = _probe_session(cookies, probe_url, publication=site)
+        report['attempts'].append({'strategy': 'cache', 'success': accepted, 'seconds': round(time.monotonic() - start, 3)})
+        if accepted:
+            logger.info("Reusing cached session cookies; skipping browser login.")
+            report['strategy'] = 'cache'
+            return cookies
+        logger.info("Cached session was rejected; logging in again.")
+        session_cache.clear(path=site.session_cache_path)
+    strategies = _login_strategies(site)
+    for strategy in strategies:
+        attempt = {'strategy': strategy}
+        start = time.monotonic()
+        cookies = LOGIN_STRATEGIES[strategy](login_url, username, password, stats=attempt, publication=site)
+        attempt.update(success=bool(cookies), seconds=round(time.monotonic() - start, 3))
+        report['attempts'].append(attempt)
+        if cookies:
+            logger.info("Logged in using the %s strategy in %.2fs.", strategy, report['attempts'][-1]['seconds'])
+            report['strategy'] = strategy
+            session_cache.save_cookies(cookies, username, password, login_url, path=site.session_cache_path)
+            return cookies
+        logger.info("Login strategy %s failed; %s", strategy, "escalating." if strategy != strategies[-1] else "giving up.")
+    return None
+
+# Login strategies in escalation order of cost
+LOGIN_STRATEGIES = {
+    'requests': _login_with_requests,
+    'playwright': _get_session_cookies,
+}
+
+def _download_with_playwright(download_url, save_path, cookies, dry_run=False, publication=None):
     """
-    Fallback method to download using Playwright when the requests method fails.
+    Fallback method to download using Playwright when the requests method is
+    refused (a 403, e.g. from a JavaScript challenge a real browser can pass).
     
     Args:
         download_url: URL to download the newspaper from
         save_path: Path where the downloaded file should be saved
         cookies: Session cookies for authentication
         dry_run: If True, simulate the operation without actually downloading
+        publication: The title being downloaded; defaults to the `newspaper:` config
         
     Returns:
         tuple: (success_flag, file_format_or_error_message)
     """
-    if not PLAYWRIGHT_AVAILABLE:
+    site = _site(publication)
+    if not browser_pool.PLAYWRIGHT_AVAILABLE:
         logger.error("Playwright not available for fallback download. Install with: pip install playwright")
         return False, "Playwright not available"
     
@@ -162,11 +404,10 @@ def _download_with_playwright(download_url, save_path, cookies, dry_run=False):
         return True, "pdf"  # Assume PDF format in dry run
         
     logger.info("Attempting fallback download using Playwright from: %s", download_url)
+    profile = browser_pool.site_profile(download_url)
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context()
-            
+        with browser_pool.get_pool().context() as context:
+            browser_pool.RequestBlocker.from_profile(profile).install(context)
             # Set cookies if available
             if cookies:
                 for cookie in cookies:
@@ -197,7 +438,7 @@ def _download_with_playwright(download_url, save_path, cookies, dry_run=False):
             
             # Navigate to the download URL
             logger.debug("Navigating to download URL: %s", download_url)
-            response = page.goto(download_url, wait_until='networkidle')
+            response = page.goto(download_url, wait_until=profile['wait_until'])
             
             if not response:
                 logger.error("Failed to navigate to download URL")
@@ -210,7 +451,7 @@ def _download_with_playwright(download_url, save_path, cookies, dry_run=False):
             # Method 1: Try to find and click a download button if the URL didn't trigger download
             try:
                 download = download_promise.wait_for(timeout=5000)
-            except PlaywrightTimeoutError:
+            except browser_pool.PlaywrightTimeoutError:
                 # No automatic download, look for download buttons
                 download_selectors = [
                     'a[download]', 
@@ -237,11 +478,23 @@ def _download_with_playwright(download_url, save_path, cookies, dry_run=False):
                         inner_file_format = 'pdf'
                         save_path_with_ext = f"{save_path}.{inner_file_format}"
                         try:
-                            # Using response.body() instead of page.content() for binary content
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.body())
-                            logger.info("Saved page content as PDF: %s", save_path_with_ext)
+                            # response.body() would buffer the whole PDF; re-fetch it as a
+                            # stream using the browser context's cookies instead
+                            stream_response = site.http().get(
+                                response.url,
+                                cookies=_cookies_for_requests(context.cookies()),
+                                headers={'User-Agent': site.user_agent},
+                                timeout=(10, 30),
+                                stream=True
+                            )
+                            stream_response.raise_for_status()
+                            size, sha256 = downloader.stream_response_to_file(stream_response, save_path_with_ext,
+                                                                              validator=validation.validator_for('pdf'))
+                            logger.info("Saved page content as PDF: %s (%d bytes, sha256 %s)", save_path_with_ext, size, sha256)
                             return True, inner_file_format
+                        except downloader.DownloadError as e:
+                            logger.error("Incomplete PDF download: %s", e)
+                            return False, f"Failed to save PDF: {str(e)}"
                         except OSError as e: # More specific exception for file I/O
                             logger.error("Failed to save PDF content: %s", e)
                             return False, f"Failed to save PDF: {str(e)}"
@@ -251,10 +504,14 @@ def _download_with_playwright(download_url, save_path, cookies, dry_run=False):
                         save_path_with_ext = f"{save_path}.{inner_file_format}"
                         try:
                             # For HTML, page.content() is appropriate
-                            with open(save_path_with_ext, 'w', encoding='utf-8') as file:
-                                file.write(page.content())
+                            with downloader.AtomicFileWriter(save_path_with_ext, validator=validation.validator_for('html', 'text/html; charset=utf-8')) as writer:
+                                writer.write(page.content().encode('utf-8'))
+                                writer.commit()
                             logger.info("Saved page content as HTML: %s", save_path_with_ext)
                             return True, inner_file_format
+                        except downloader.DownloadError as e:
+                            logger.error("Page content is not a usable edition: %s", e)
+                            return False, f"Failed to save HTML: {str(e)}"
                         except OSError as e: # More specific exception for file I/O
                             logger.error("Failed to save HTML content: %s", e)
                             return False, f"Failed to save HTML: {str(e)}"
@@ -270,16 +527,23 @@ def _download_with_playwright(download_url, save_path, cookies, dry_run=False):
                     downloaded_file_format = 'pdf'  # Default to PDF
                 
                 save_path_with_ext = f"{save_path}.{downloaded_file_format}"
-                download.save_as(save_path_with_ext)
+                # Playwright streams the download to disk; commit it atomically
+                download.save_as(downloader.part_path(save_path_with_ext))
+                valid, reason = validation.validate_file(downloader.part_path(save_path_with_ext), downloaded_file_format)
+                if not valid:
+                    downloader.discard_partial(downloader.part_path(save_path_with_ext))
+                    logger.error("Playwright download is not a usable edition: %s", reason)
+                    return False, reason
+                os.replace(downloader.part_path(save_path_with_ext), save_path_with_ext)
                 logger.info("Playwright successfully downloaded file to: %s", save_path_with_ext)
                 return True, downloaded_file_format
                 
             return False, "No download occurred"
             
-    except PlaywrightTimeoutError as e:
+    except browser_pool.PlaywrightTimeoutError as e:
         logger.error("Playwright timeout during download: %s", e)
         return False, f"Playwright timeout: {str(e)}"
-    except PlaywrightError as e:
+    except browser_pool.PlaywrightError as e:
         logger.error("Playwright error during download: %s", e)
         return False, f"Playwright error: {str(e)}"
     except requests.exceptions.RequestException as e: # Catch specific requests errors
@@ -290,10 +554,12 @@ def _download_with_playwright(download_url, save_path, cookies, dry_run=False):
         return False, f"OS error: {str(e)}" # Fail fast on OS errors
     except Exception as e: # General fallback
         # Using logger.exception to include traceback
-        logger.exception("Unexpected error during Playwright download: %s", e)
+        logger.exception("Unexpected error during browser fallback download: %s", e)
         return False, f"Unexpected error: {str(e)}"
 
-def download_newspaper(url, session):
+def download_newspaper(url, session=None):
+    """Fetch `url` into memory over `session` (the shared pooled session by default)."""
+    session = session or http_session.get_session()
     try:
         response = session.get(url, timeout=10)
         response.raise_for_status()
@@ -301,47 +567,22 @@ def download_newspaper(url, session):
         return response.content
     except requests.exceptions.RequestException as e:
         logger.error("Failed to download newspaper from %s: %s", url, e)
-        return None
+        raise
     except Exception as e:
         logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        return None
+        raise
 
 # --- Main Orchestration Function ---
+def login(base_url, username, password, report=None, publication=None):
+    """Logs in once and returns the session cookies (reusing the session cache when still valid), or None.
+    If `report` is a dict it receives the login strategy used and per-attempt timings."""
+    site = _site(publication)
+    logger.info("Step 1: Logging in to get session cookies.")
+    return _get_authenticated_cookies(site.login_url, username, password, probe_url=site.session_probe_url or base_url,
+                                      report=report, publication=site)
 
-if __name__ == '__main__':
-    from dotenv import load_dotenv
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    load_dotenv()
-
-    test_date = '2023-10-26'
-    logger.info("--- Running website.py standalone test ---")
-
-    WEBSITE_URL_TEST = os.environ.get('WEBSITE_URL')
-    USERNAME_TEST = os.environ.get('WEBSITE_USERNAME')
-    PASSWORD_TEST = os.environ.get('WEBSITE_PASSWORD')
-    SAVE_PATH_BASE = os.path.join(os.environ.get('DOWNLOAD_DIR', 'downloads'), f"{test_date}_test_download")
-
-    if not all([WEBSITE_URL_TEST, USERNAME_TEST, PASSWORD_TEST]):
-        logger.error("Required environment variables (WEBSITE_URL, WEBSITE_USERNAME, WEBSITE_PASSWORD) not set for standalone test.")
-    else:
-        success, file_format = login_and_download(
-            base_url=WEBSITE_URL_TEST,
-            username=USERNAME_TEST,
-            password=PASSWORD_TEST,
-            save_path=SAVE_PATH_BASE,
-            target_date=test_date,
-            dry_run=False,
-            force_download=False
-        )
-
-        if success:
-            logger.info("Standalone test successful. File format: %s", file_format)
-            final_path = f"{SAVE_PATH_BASE}.{file_format}"
-            logger.info("Expected file path: %s (check if exists)", final_path)
-        else:
-            logger.error("Standalone test failed.")
-    logger.info("--- End website.py standalone test ---")
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
+def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False,
+                       publication=None):
     """Logs in to the website and downloads the newspaper for the given date.
 
     Args:
@@ -352,159 +593,189 @@ def login_and_download(base_url, username, password, save_path, target_date=None
         target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
         dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
         force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
+        publication (Publication, optional): The title to fetch; defaults to the `newspaper:` config.
 
     Returns:
         tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
     """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
     # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    # Step 1: Get session cookies (cached if still valid, otherwise by logging in)
+    cookies = login(base_url, username, password, publication=publication)
     if not cookies:
         return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
+    return download_edition(base_url, cookies, save_path, target_date=target_date, dry_run=dry_run, force_download=force_download,
+                            publication=publication)
 
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
+def _range_fetcher(site, url, cookies, headers, validator, policy):
+    """
+    fetch_range(start, end) for downloader.download_segmented, on this title's
+    session. Every range request is paced by the host's policy and its outcome
+    fed to the circuit breaker; the caller holds a host slot per segment.
+    """
+    jar = _cookies_for_requests(cookies)
+    def fetch_range(start, end):
+        policy.wait_turn()
+        try:
+            response = site.http().get(url, cookies=jar, timeout=(10, 30), stream=True,
+                                       headers={**headers, 'Range': f"bytes={start}-{end}", 'If-Range': validator})
+        except requests.exceptions.RequestException:
+            policy.record_error()
+            raise
+        policy.record(response.status_code)
+        return response
+    return fetch_range
+
+def _extra_segment_slots(policy, wanted):
+    """Take up to `wanted` host slots that are free right now (never waiting, so two downloads can't deadlock)."""
+    taken = 0
+    while taken < wanted and policy.try_acquire():
+        taken += 1
+    return taken
+
+def _accept_header(formats):
+    """Accept header asking for `formats` in order of preference."""
+    parts = []
+    for i, fmt in enumerate(formats):
+        q = max(0.1, 1.0 - i * 0.1)
+        parts.append(FORMAT_MIME_TYPES[fmt] if i == 0 else f"{FORMAT_MIME_TYPES[fmt]};q={q:.1f}")
+    return ', '.join(parts)
+
+def _edition_probes(base_url, target_date, formats, publication=None):
+    """
+    Ordered (formats, url) probes for an edition. With `format_urls`
+    configured each format has its own URL and is probed in turn; otherwise a
+    single negotiated request to the shared download endpoint is made.
+    """
+    site = _site(publication)
+    format_urls = site.format_urls
+    if isinstance(format_urls, dict) and format_urls:
+        return [((fmt,), urljoin(base_url, format_urls[fmt].format(date=target_date))) for fmt in formats if fmt in format_urls]
+    return [(tuple(formats), urljoin(base_url, site.download_path.format(date=target_date)))]
 
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
+def acquire_edition(base_url, username, password, save_path, target_date=None, formats=EDITION_FORMATS,
+                    dry_run=False, force_download=False, cookies=None, publication=None):
+    """Authenticates once and fetches the edition in the first available format.
 
     Args:
         base_url (str): The base URL of the newspaper website.
         username (str): The username for logging in.
         password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
+        save_path (str): The local path (without extension) where the newspaper should be saved.
+        target_date (str, optional): The date to download, in 'YYYY-MM-DD' format. Defaults to today.
+        formats (tuple, optional): Acceptable formats in order of preference.
+        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
+        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
+        cookies (list, optional): Existing session cookies; skips the login when given.
+        publication (Publication, optional): The title to fetch; defaults to the `newspaper:` config.
+
+    Returns:
+        dict: 'success', 'format', 'path', 'error', 'login_seconds', 'login' (strategy
+        used and per-attempt timings), 'probes'
+        (one entry per request with its formats, url, outcome, seconds and, once
+        bytes were fetched, 'transfer' throughput stats),
+        'sha256' and 'changed' (False when this content was already published)
+        and, for a downloaded HTML edition, 'packaged_path' (gzip single-file copy)
+        and 'package' stats.
+    """
+    site = _site(publication)
+    if target_date is None:
+        target_date = datetime.now().strftime('%Y-%m-%d')
+    result = {'success': False, 'format': None, 'path': None, 'error': None, 'login_seconds': 0.0, 'probes': [],
+              'sha256': None, 'changed': True, 'login': {}}
+
+    # A local copy needs neither a login nor a request, unless it fails validation
+    if not force_download:
+        for fmt in formats:
+            if os.path.exists(f"{save_path}.{fmt}"):
+                valid, reason = validation.validate_file(f"{save_path}.{fmt}", fmt)
+                if not valid:
+                    logger.warning("Discarding invalid local copy %s.%s: %s", save_path, fmt, reason)
+                    os.remove(f"{save_path}.{fmt}")
+                    continue
+                logger.info("Newspaper file already exists: %s.%s", save_path, fmt)
+                result.update(success=True, format=fmt, path=f"{save_path}.{fmt}")
+                return _with_content_state(result)
+
+    if cookies is None:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        start = time.monotonic()
+        cookies = login(base_url, username, password, report=result['login'], publication=site)
+        result['login_seconds'] = round(time.monotonic() - start, 3)
+        if not cookies:
+            result['error'] = "Failed to obtain cookies."
+            return result
+
+    for probe_formats, url in _edition_probes(base_url, target_date, formats, publication=site):
+        start = time.monotonic()
+        transfer = {}
+        success, detail = download_edition(base_url, cookies, save_path, target_date=target_date, dry_run=dry_run,
+                                           force_download=force_download, download_url=url, accept_formats=probe_formats,
+                                           publication=site, stats=transfer)
+        probe = {'formats': list(probe_formats), 'url': url, 'success': success,
+                 'seconds': round(time.monotonic() - start, 3)}
+        if transfer:
+            probe['transfer'] = transfer
+        if not success:
+            probe['error'] = detail
+        result['probes'].append(probe)
+        logger.info("Probe for %s at %s: %s in %.2fs", '/'.join(probe_formats), url,
+                    f"got {detail}" if success else f"failed ({detail})", probe['seconds'])
+        if success:
+            result.update(success=True, format=detail, path=f"{save_path}.{detail}")
+            if detail == 'html' and not dry_run and os.path.exists(result['path']):
+                _package(result, url, cookies, site)
+            return _with_content_state(result)
+        result['error'] = detail
+    return result
+
+def _package(result, page_url, cookies, site):
+    """Turn an HTML edition into a single file with its assets inlined (see packager.py)."""
+    package = {}
+    result['packaged_path'] = packager.package_edition(result['path'], page_url, cookies=_cookies_for_requests(cookies),
+                                                       session=site.http(), stats=package)
+    if package:
+        result['package'] = package
+
+def _with_content_state(result):
+    """Fill in the edition's content hash and whether it differs from what was last published."""
+    if os.path.exists(result['path']):
+        result['sha256'] = downloader.content_sha256(result['path'])
+        result['changed'] = not downloader.is_published(result['path'])
+    return result
+
+def download_edition(base_url, cookies, save_path, target_date=None, dry_run=False, force_download=False,
+                     download_url=None, accept_formats=None, publication=None, stats=None):
+    """Downloads the newspaper for the given date with an already logged-in session.
+
+    Args:
+        base_url (str): The base URL of the newspaper website.
+        cookies (list): Session cookies returned by `login`.
+        save_path (str): The local path (without extension) where the newspaper should be saved.
+        target_date (str, optional): The date to download, in 'YYYY-MM-DD' format. Defaults to today.
         dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
         force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
+        download_url (str, optional): Edition URL; defaults to the shared download endpoint for target_date.
+        accept_formats (tuple, optional): Formats to ask for (sent as an Accept header); a response in
+            any other format is rejected without saving.
+        publication (Publication, optional): The title to fetch; defaults to the `newspaper:` config.
+        stats (dict, optional): Receives the transfer's 'bytes', 'seconds', 'mb_per_second' and, for a
+            segmented download, 'segments', 'stream_mb_per_second' and 'speedup'.
 
     Returns:
         tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
     """
+    site = _site(publication)
+    stats = stats if stats is not None else {}
     if target_date is None:
         target_date = datetime.now().strftime('%Y-%m-%d')
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
 
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
     # Step 2: Check if newspaper already exists (if not force_download)
     file_exists = False
     if not force_download:
         # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
+        for ext in (accept_formats or EDITION_FORMATS):
             potential_file = f"{save_path}.{ext}"
             if os.path.exists(potential_file):
                 file_exists = True
@@ -516,75 +787,186 @@ def login_and_download(base_url, username, password, save_path, target_date=None
         logger.info("Step 2: Downloading the newspaper for date: %s%s", 
                    target_date, 
                    " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
+        if download_url is None:
+            download_url = urljoin(base_url, site.download_path.format(date=target_date))
+        request_headers = {'User-Agent': site.user_agent}
+        if accept_formats:
+            request_headers['Accept'] = _accept_header(accept_formats)
+        # On a forced re-download, ask the server whether our copy is still current
+        existing_format = next((ext for ext in (accept_formats or EDITION_FORMATS) if os.path.exists(f"{save_path}.{ext}")), None)
+        validator_headers = downloader.conditional_headers(f"{save_path}.{existing_format}") if existing_format else {}
+        
+        # Retry transient errors; pacing, backoff and the circuit breaker are shared per host
+        max_retries = max(1, int(config.config.get(('rate_limit', 'max_retries'), 3))) # At least the first attempt
+        policy = rate_limit.for_url(download_url)
+        retry_delay = 0
+        
+        # Partial transfers are kept here (with their ETag/Last-Modified) and resumed
+        partial_path = downloader.part_path(save_path)
+        # Large files from servers that accept ranges are fetched as concurrent segments
+        allow_segments = not dry_run
         
         for attempt in range(max_retries):
+            # Back off outside the host slot so other callers can use it meanwhile
+            if retry_delay:
+                time.sleep(retry_delay)
+                retry_delay = 0
             try:
+                policy.acquire()
+            except rate_limit.CircuitOpenError as e:
+                logger.error("Not requesting the newspaper: %s", e)
+                return False, str(e)
+            try:
+                resume_state = None if dry_run else downloader.load_resume_state(partial_path, download_url)
+                if resume_state:
+                    logger.info("Found %d bytes of an earlier partial download; requesting the rest.", resume_state['offset'])
                 # Add timeout to prevent hanging indefinitely
-                response = requests.get(
+                response = site.http().get(
                     download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
+                    cookies=_cookies_for_requests(cookies), 
+                    headers={**request_headers, **(downloader.resume_headers(resume_state) if resume_state else validator_headers)},
+                    timeout=(10, 30),  # (connect timeout, read timeout) in seconds
+                    stream=True  # Body is streamed to disk below, never held in memory
                 )
-                
-                # Handle successful response
-                if response.status_code == 200:
+                policy.record(response.status_code)
+                
+                # Not modified: the copy we already have is current
+                if response.status_code == 304 and existing_format and not resume_state:
+                    response.close()
+                    logger.info("Newspaper unchanged on server (304); keeping %s.%s", save_path, existing_format)
+                    return True, existing_format
+                
+                # Handle successful response (206 when resuming a partial download)
+                if response.status_code in (200, 206):
+                    # Determine file format from Content-Type header
+                    content_type = response.headers.get('Content-Type') or (resume_state or {}).get('content_type') or ''
+                    response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
+                    if accept_formats and response_file_format not in accept_formats:
+                        response.close()
+                        logger.info("Edition is only available as %s, not %s.", response_file_format, '/'.join(accept_formats))
+                        return False, f"Format not available: got {response_file_format}"
                     if dry_run:
+                        response.close()
                         logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
+                        return True, response_file_format
                     else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
                         # Ensure the save path has the correct extension
                         save_path_with_ext = f"{save_path}.{response_file_format}"
                         
+                        total = downloader.expected_length(response)
+                        extra_slots = 0
+                        if allow_segments and response.status_code == 200 and downloader.supports_segments(response):
+                            # The first segment streams on our slot; the others each need a free one
+                            extra_slots = _extra_segment_slots(policy, downloader.segment_count(total) - 1)
+                        if extra_slots:
+                            segments = extra_slots + 1
+                            try:
+                                size, sha256, transfer = downloader.download_segmented(
+                                    _range_fetcher(site, download_url, cookies, request_headers,
+                                                   downloader.range_validator(response), policy),
+                                    save_path_with_ext, total, first_response=response, segments=segments,
+                                    temp_path=partial_path,
+                                    validator=validation.validator_for(response_file_format, content_type)
+                                )
+                            except downloader.DownloadError as e:
+                                allow_segments = False
+                                if attempt < max_retries - 1:
+                                    logger.warning("Segmented download failed (%s); retrying as a single stream.", e)
+                                    continue
+                                logger.error("Download failed after %d attempts: %s", max_retries, e)
+                                return False, str(e)
+                            finally:
+                                for _ in range(extra_slots):
+                                    policy.release()
+                            stats.update(transfer, bytes=size)
+                            logger.info("Newspaper downloaded successfully: %s (%d bytes in %d segments, sha256 %s)",
+                                        save_path_with_ext, size, transfer['segments'], sha256)
+                            downloader.record_download(save_path_with_ext, response, download_url, size, sha256)
+                            return True, response_file_format
                         try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
+                            started = time.monotonic()
+                            # The body is checked as it streams; a bad payload never reaches the final path
+                            size, sha256 = downloader.stream_response_to_file(
+                                response, save_path_with_ext,
+                                temp_path=partial_path, resume_state=resume_state, url=download_url,
+                                validator=validation.validator_for(response_file_format, content_type)
+                            )
+                            seconds = max(time.monotonic() - started, 1e-6)
+                            stats.update(bytes=size, seconds=round(seconds, 3), mb_per_second=round(size / seconds / 1e6, 2), segments=1)
+                            logger.info("Newspaper downloaded successfully: %s (%d bytes, sha256 %s)", save_path_with_ext, size, sha256)
+                            downloader.record_download(save_path_with_ext, response, download_url, size, sha256)
                             return True, response_file_format
+                        except downloader.DownloadError as e:
+                            # Incomplete transfer; nothing was left at the final path. If the
+                            # partial file was kept, the next attempt resumes from it, so
+                            # there is no need for the long back-off.
+                            if attempt < max_retries - 1:
+                                retry_delay = policy.backoff(0 if e.resumable else attempt)
+                                logger.warning(
+                                    "%s. Retrying in %.1f seconds (attempt %d of %d)...",
+                                    e, retry_delay, attempt + 1, max_retries
+                                )
+                                continue
+                            logger.error("Download failed after %d attempts: %s", max_retries, e)
+                            return False, str(e)
                         except OSError as e: # More specific exception for file I/O
                             logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
                             return False, f"Failed to save file: {str(e)}"
                 
+                # Range not satisfiable: the partial file doesn't match the server copy any more
+                elif response.status_code == 416 and resume_state:
+                    response.close()
+                    logger.warning("Server rejected the resume range; discarding the partial download.")
+                    downloader.discard_partial(partial_path)
+                    if attempt < max_retries - 1:
+                        continue
+                
                 # Handle common HTTP errors with potentially different retry strategies
                 elif response.status_code in (429, 503, 502, 504):
                     # Too Many Requests or Service Unavailable - worth retrying
                     if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
+                        # Honours Retry-After (seconds or HTTP-date) and pauses the host for other callers too
+                        retry_delay = policy.retry_delay(response, attempt)
+                        response.close()
                         logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
+                            "Received status code %d. Retrying in %.1f seconds (attempt %d of %d)...",
+                            response.status_code, retry_delay, attempt + 1, max_retries
                         )
-                        time.sleep(retry_after)
                         continue
                 
+                # Refused, e.g. by a JavaScript challenge that only a real browser passes
+                elif response.status_code == 403 and browser_pool.PLAYWRIGHT_AVAILABLE:
+                    response.close()
+                    logger.warning("Download refused (403); retrying through the pooled browser.")
+                    success, detail = _download_with_playwright(download_url, save_path, cookies, dry_run=dry_run, publication=site)
+                    if success and accept_formats and detail not in accept_formats:
+                        logger.info("Edition is only available as %s, not %s.", detail, '/'.join(accept_formats))
+                        if os.path.exists(f"{save_path}.{detail}"):
+                            os.remove(f"{save_path}.{detail}")
+                        return False, f"Format not available: got {detail}"
+                    return success, detail
+                
                 # For other HTTP errors, fail immediately
                 logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
+                error_text = response.text
+                response.close()
+                return False, f"Error {response.status_code}: {error_text}"
                 
             except requests.exceptions.Timeout:
                 # Handle request timeouts
+                policy.record_error()
                 if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
+                    retry_delay = policy.backoff(attempt)
                     logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
+                        "Request timed out. Retrying in %.1f seconds (attempt %d of %d)...",
                         retry_delay, attempt + 1, max_retries
                     )
-                    time.sleep(retry_delay)
                 else:
                     logger.error("Download failed after %d attempts due to timeout", max_retries)
                     return False, "Request timed out repeatedly"
                     
             except requests.exceptions.RequestException as e: # Catch specific requests errors
+                policy.record_error()
                 logger.error("Request error during download attempt: %s", e)
                 return False, f"Request error: {str(e)}" # Fail fast on request errors
             except OSError as e: # Catch specific OS errors
@@ -592,4129 +974,202 @@ def login_and_download(base_url, username, password, save_path, target_date=None
                 return False, f"OS error: {str(e)}" # Fail fast on OS errors
             except Exception as e: # General fallback
                 # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
+                logger.exception("Unexpected error during edition download: %s", e)
                 return False, f"Unexpected error: {str(e)}"
+            finally:
+                policy.release()
 
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
+# --- Release Watch ---
+def _minutes_after_midnight(moment, target_date):
+    """Minutes from midnight of the edition's date to `moment` (negative for the evening before)."""
+    midnight = datetime.combine(target_date, datetime.min.time())
+    return (moment - midnight).total_seconds() / 60
 
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
+def _parse_clock(value, default):
+    try:
+        hours, minutes = str(value or default).split(':')
+        return int(hours) * 60 + int(minutes)
+    except ValueError:
+        logger.warning("Invalid time of day %r in release_watch config; using %s.", value, default)
+        return _parse_clock(default, default)
+
+def _release_history_path():
+    return config.config.get(('release_watch', 'history_path'), DEFAULT_RELEASE_HISTORY_PATH)
+
+def load_release_history(path=None):
+    """Observed releases, oldest first, as [{'date': 'YYYY-MM-DD', 'minutes': float}, ...]."""
+    path = path or _release_history_path()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+        return [h for h in history if isinstance(h, dict) and 'minutes' in h]
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read release history %s: %s", path, e)
+        return []
+
+def record_release(target_date, released_at, path=None):
+    """Remember when an edition appeared, keeping the last RELEASE_HISTORY_SIZE observations."""
+    path = path or _release_history_path()
+    history = [h for h in load_release_history(path) if h.get('date') != target_date.isoformat()]
+    history.append({'date': target_date.isoformat(), 'minutes': round(_minutes_after_midnight(released_at, target_date), 1)})
+    history = history[-RELEASE_HISTORY_SIZE:]
+    try:
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        logger.warning("Could not write release history %s: %s", path, e)
+    return history
+
+def typical_release_minutes(history=None):
+    """Median observed release time in minutes after midnight, or the configured expected time."""
+    history = load_release_history() if history is None else history
+    if history:
+        return statistics.median(h['minutes'] for h in history)
+    return _parse_clock(config.config.get(('release_watch', 'expected_time'), DEFAULT_RELEASE_TIME), DEFAULT_RELEASE_TIME)
+
+def poll_interval(now_minutes, typical_minutes, min_interval=DEFAULT_WATCH_MIN_INTERVAL,
+                  max_interval=DEFAULT_WATCH_MAX_INTERVAL, window=DEFAULT_WATCH_WINDOW_MINUTES):
+    """
+    Seconds to wait before the next probe. Within `window` minutes of the
+    typical release time probes are `min_interval` apart; outside it the
+    interval doubles with every further window-width, up to `max_interval`.
+    """
+    distance = abs(now_minutes - typical_minutes)
+    if distance <= window:
+        return float(min_interval)
+    return min(float(max_interval), min_interval * 2 ** ((distance - window) / window))
 
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
+def probe_release(url, cookies, formats=EDITION_FORMATS, session=None, publication=None):
+    """
+    Cheap check for whether an edition URL is live: a HEAD request, or a
+    one-byte ranged GET where the server doesn't allow HEAD.
 
     Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
+        dict: 'available', 'status', and 'auth_failed' (the session was refused
+        or bounced to the login page).
     """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
+    site = _site(publication)
+    session = session or site.http()
+    headers = {'User-Agent': site.user_agent, 'Accept': _accept_header(formats)}
+    jar = _cookies_for_requests(cookies)
+    policy = rate_limit.for_url(url)
+    with policy.slot():
+        response = session.head(url, headers=headers, cookies=jar, allow_redirects=True, timeout=(10, 30))
+    if response.status_code in (405, 501):
+        with policy.slot():
+            response = session.get(url, headers=dict(headers, Range='bytes=0-0'), cookies=jar, stream=True, timeout=(10, 30))
+            response.close()
+    policy.record(response.status_code)
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    auth_failed = response.status_code in (401, 403) or _bounced_to_login(url, response.url, site)
+    available = (response.status_code in (200, 206) and not auth_failed
+                 and (not content_type or content_type in [FORMAT_MIME_TYPES[f] for f in formats]))
+    return {'available': available, 'status': response.status_code, 'auth_failed': auth_failed}
+
+def watch_for_release(base_url, username, password, target_date=None, formats=EDITION_FORMATS,
+                      cookies=None, give_up_at=None, sleep=time.sleep, now=datetime.now, publication=None):
+    """
+    Poll the edition endpoint until the edition for `target_date` is published,
+    so the pipeline can run minutes after release instead of at a fixed hour.
 
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
+    Polling is fastest around the typical release time learned from previous
+    days (see `poll_interval`) and stops at `give_up_at` ('HH:MM' on the
+    edition's date) or after `release_watch.max_watch_minutes`, whichever
+    comes first. A refused session triggers one fresh login.
+
+    Returns:
+        dict: 'available', 'url', 'polls', 'waited_seconds', 'released_at'
+        (ISO timestamp), 'typical_release' ('HH:MM') and 'error'.
+    """
+    site = _site(publication)
+    target = datetime.strptime(target_date, '%Y-%m-%d').date() if target_date else now().date()
+    min_interval = float(config.config.get(('release_watch', 'min_interval_seconds'), DEFAULT_WATCH_MIN_INTERVAL))
+    max_interval = float(config.config.get(('release_watch', 'max_interval_seconds'), DEFAULT_WATCH_MAX_INTERVAL))
+    window = float(config.config.get(('release_watch', 'window_minutes'), DEFAULT_WATCH_WINDOW_MINUTES))
+    give_up_minutes = _parse_clock(give_up_at or config.config.get(('release_watch', 'give_up_at'), DEFAULT_GIVE_UP_AT), DEFAULT_GIVE_UP_AT)
+    deadline = datetime.combine(target, datetime.min.time()) + timedelta(minutes=give_up_minutes)
+    max_watch = config.config.get(('release_watch', 'max_watch_minutes'), DEFAULT_MAX_WATCH_MINUTES)
+    started = now()
+    if max_watch:
+        deadline = min(deadline, started + timedelta(minutes=float(max_watch)))
+    typical = typical_release_minutes(load_release_history(site.release_history_path))
+    result = {'available': False, 'url': None, 'polls': 0, 'waited_seconds': 0.0, 'released_at': None,
+              'typical_release': f"{int(typical // 60) % 24:02d}:{int(typical % 60):02d}", 'error': None}
+    logger.info("Watching for the %s edition (typical release %s, giving up at %s).",
+                target.isoformat(), result['typical_release'], deadline.strftime('%H:%M'))
+
+    cookies = cookies or login(base_url, username, password, publication=site)
     if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
+        result['error'] = "Failed to obtain cookies."
+        return result
+    relogged = False
+    probes = _edition_probes(base_url, target.isoformat(), formats, publication=site)
+    while True:
+        for probe_formats, url in probes:
+            result['polls'] += 1
             try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return```python
-True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target```python
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
-
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
-
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
-
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
-
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
-
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...",
-                            response.status_code, retry_after, attempt + 1, max_retries
-                        )
-                        time.sleep(retry_after)
-                        continue
-                
-                # For other HTTP errors, fail immediately
-                logger.error("Failed to download newspaper. Status code: %d", response.status_code)
-                return False, f"Error {response.status_code}: {response.text}"
-                
-            except requests.exceptions.Timeout:
-                # Handle request timeouts
-                if attempt < max_retries - 1:
-                    retry_delay = retry_delays[attempt]
-                    logger.warning(
-                        "Request timed out. Retrying in %d seconds (attempt %d of %d)...",
-                        retry_delay, attempt + 1, max_retries
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error("Download failed after %d attempts due to timeout", max_retries)
-                    return False, "Request timed out repeatedly"
-                    
-            except requests.exceptions.RequestException as e: # Catch specific requests errors
-                logger.error("Request error during download attempt: %s", e)
-                return False, f"Request error: {str(e)}" # Fail fast on request errors
-            except OSError as e: # Catch specific OS errors
-                logger.error("OS error during download attempt: %s", e)
-                return False, f"OS error: {str(e)}" # Fail fast on OS errors
-            except Exception as e: # General fallback
-                # Using logger.exception to include traceback
-                logger.exception("Unexpected error during Playwright download: %s", e)
-                return False, f"Unexpected error: {str(e)}"
+                probe = probe_release(url, cookies, probe_formats, publication=site)
+            except (requests.exceptions.RequestException, rate_limit.CircuitOpenError) as e:
+                logger.warning("Release probe of %s failed: %s", url, e)
+                continue
+            if probe['auth_failed'] and not relogged:
+                logger.info("Session refused while watching (status %s); logging in again.", probe['status'])
+                session_cache.clear(path=site.session_cache_path)
+                relogged = True
+                cookies = login(base_url, username, password, publication=site) or cookies
+                continue
+            if probe['available']:
+                released = now()
+                result.update(available=True, url=url, released_at=released.isoformat(timespec='seconds'),
+                              waited_seconds=round((released - started).total_seconds(), 1))
+                record_release(target, released, path=site.release_history_path)
+                logger.info("Edition for %s is out at %s (after %d probes).", target.isoformat(), released.strftime('%H:%M:%S'), result['polls'])
+                return result
+            logger.debug("Edition not yet available at %s (status %s).", url, probe['status'])
+        current = now()
+        if current >= deadline:
+            result['waited_seconds'] = round((current - started).total_seconds(), 1)
+            result['error'] = f"Edition for {target.isoformat()} was not published by {deadline.strftime('%H:%M')}."
+            logger.warning(result['error'])
+            return result
+        interval = poll_interval(_minutes_after_midnight(current, target), typical, min_interval, max_interval, window)
+        interval = min(interval, (deadline - current).total_seconds())
+        logger.debug("Next release probe in %.0fs.", interval)
+        sleep(interval)
 
-def download_newspaper(url, session):
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        logger.info("Successfully downloaded newspaper from %s", url)
-        return response.content
-    except RequestException as e:
-        logger.error("Failed to download newspaper from %s: %s", url, e)
-        raise
-    except Exception as e:
-        logger.exception("Unexpected error during newspaper download from %s: %s", url, e)
-        raise
+if __name__ == '__main__':
+    from dotenv import load_dotenv
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    load_dotenv()
 
-# --- Main Orchestration Function ---
-def login_and_download(base_url, username, password, save_path, target_date=None, dry_run=False, force_download=False):
-    """Logs in to the website and downloads the newspaper for the given date.
+    test_date = '2023-10-26'
+    logger.info("--- Running website.py standalone test ---")
 
-    Args:
-        base_url (str): The base URL of the newspaper website.
-        username (str): The username for logging in.
-        password (str): The password for logging in.
-        save_path (str): The local path where the downloaded newspaper should be saved.
-        target_date (str, optional): The date for which the newspaper should be downloaded, in 'YYYY-MM-DD' format. Defaults to today.
-        dry_run (bool, optional): If True, performs a trial run without downloading. Defaults to False.
-        force_download (bool, optional): If True, forces download even if file seems to exist. Defaults to False.
+    WEBSITE_URL_TEST = os.environ.get('WEBSITE_URL')
+    USERNAME_TEST = os.environ.get('WEBSITE_USERNAME')
+    PASSWORD_TEST = os.environ.get('WEBSITE_PASSWORD')
+    SAVE_PATH_BASE = os.path.join(os.environ.get('DOWNLOAD_DIR', 'downloads'), f"{test_date}_test_download")
 
-    Returns:
-        tuple: A tuple containing a success flag (bool) and the file format (str) or error message (str).
-    """
-    if target_date is None:
-        target_date = datetime.now().strftime('%Y-%m-%d')
+    if not all([WEBSITE_URL_TEST, USERNAME_TEST, PASSWORD_TEST]):
+        logger.error("Required environment variables (WEBSITE_URL, WEBSITE_USERNAME, WEBSITE_PASSWORD) not set for standalone test.")
+    else:
+        success, file_format = login_and_download(
+            base_url=WEBSITE_URL_TEST,
+            username=USERNAME_TEST,
+            password=PASSWORD_TEST,
+            save_path=SAVE_PATH_BASE,
+            target_date=test_date,
+            dry_run=False,
+            force_download=False
+        )
 
-    # Ensure the download directory exists
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)    # Step 1: Get session cookies by logging in
-    logger.info("Step 1: Logging in to get session cookies.")
-    cookies = _get_session_cookies(LOGIN_URL, username, password)
-    if not cookies:
-        return False, "Failed to obtain cookies."
-        
-    # Step 2: Check if newspaper already exists (if not force_download)
-    file_exists = False
-    if not force_download:
-        # Check if any common file extensions exist for this save_path
-        for ext in ['pdf', 'html']:
-            potential_file = f"{save_path}.{ext}"
-            if os.path.exists(potential_file):
-                file_exists = True
-                logger.info("Newspaper file already exists: %s", potential_file)
-                return True, ext  # Return success and the existing file extension
-                
-    if force_download or not file_exists:
-        # Proceed with download
-        logger.info("Step 2: Downloading the newspaper for date: %s%s", 
-                   target_date, 
-                   " (force download)" if force_download and file_exists else "")
-        download_url = urljoin(base_url, f"newspaper/download/{target_date}")  # Example endpoint
-        
-        # Add retry mechanism for transient errors
-        max_retries = 3
-        retry_delays = [5, 15, 30]  # Increasing delays between retries (in seconds)
-        
-        for attempt in range(max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.get(
-                    download_url, 
-                    cookies=cookies, 
-                    headers={'User-Agent': USER_AGENT},
-                    timeout=(10, 30)  # (connect timeout, read timeout) in seconds
-                )
-                
-                # Handle successful response
-                if response.status_code == 200:
-                    if dry_run:
-                        logger.info("Dry run enabled. File would be saved to: %s", save_path)
-                        return True, response.headers.get('Content-Type', '').split('/')[-1]  # Return the file format
-                    else:
-                        # Determine file format from Content-Type header
-                        content_type = response.headers.get('Content-Type', '')
-                        # Rename inner variable
-                        response_file_format = 'pdf' if 'pdf' in content_type.lower() else 'html'
-                        
-                        # Ensure the save path has the correct extension
-                        save_path_with_ext = f"{save_path}.{response_file_format}"
-                        
-                        try:
-                            with open(save_path_with_ext, 'wb') as file:
-                                file.write(response.content)
-                            logger.info("Newspaper downloaded successfully: %s", save_path_with_ext)
-                            return True, response_file_format
-                        except OSError as e: # More specific exception for file I/O
-                            logger.error("Failed to save downloaded file %s: %s", save_path_with_ext, e)
-                            return False, f"Failed to save file: {str(e)}"
-                
-                # Handle common HTTP errors with potentially different retry strategies
-                elif response.status_code in (429, 503, 502, 504):
-                    # Too Many Requests or Service Unavailable - worth retrying
-                    if attempt < max_retries - 1:
-                        retry_after = int(response.headers.get('Retry-After', retry_delays[attempt]))
-                        logger.warning(
-                            "Received status code %d. Retrying in %d seconds (attempt %d of %d)...
\ No newline at end of file
+        if success:
+            logger.info("Standalone test successful. File format: %s", file_format)
+            final_path = f"{SAVE_PATH_BASE}.{file_format}"
+            logger.info("Expected file path: %s (check if exists)", final_path)
+        else:
+            logger.error("Standalone test failed.")
+    logger.info("--- End website.py standalone test ---")